@@ -0,0 +1,21 @@
+"""
+Backfill script for achievements
+Awards every achievement a user qualifies for but doesn't have yet, and
+refreshes the postCount counters the achievement engine relies on.
+Run this after changing a rule in utils/achievement_engine.ACHIEVEMENTS.
+    python backfill_achievements.py              # award and notify
+    python backfill_achievements.py --no-notify  # award silently
+"""
+
+import sys
+import logging
+from utils.achievement_engine import backfill_achievements
+
+logging.basicConfig(level=logging.INFO)
+
+if __name__ == "__main__":
+    print("Backfilling achievements...")
+    result = backfill_achievements(notify="--no-notify" not in sys.argv)
+    rate = result["users"] / result["seconds"] if result["seconds"] else result["users"]
+    print(f"✅ Awarded {result['awarded']} achievements to {result['users']} users "
+          f"in {result['seconds']:.1f}s ({rate:.0f} users/s)")
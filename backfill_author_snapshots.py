@@ -0,0 +1,17 @@
+"""
+Backfill script for the denormalized author snapshot on posts
+Copies each user's current name and profile picture onto all of their posts.
+Run this once after deploying, and again after any bulk user import.
+"""
+
+import time
+from utils.author_snapshot import refresh_all_author_snapshots
+
+def backfill_author_snapshots():
+    print("Refreshing author snapshots on posts...")
+    started = time.time()
+    updated = refresh_all_author_snapshots()
+    print(f"✅ Updated {updated} posts in {time.time() - started:.1f}s")
+
+if __name__ == "__main__":
+    backfill_author_snapshots()
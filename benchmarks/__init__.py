@@ -0,0 +1 @@
+# Benchmark and load-test tooling (not imported by the API)
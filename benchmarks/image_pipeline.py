@@ -0,0 +1,214 @@
+"""
+Micro-benchmark for the image verification stack (CPU only)
+
+Generates a fixed synthetic image corpus locally, then times each stage of the
+pipeline used by ImageVerificationService:
+    - ImageAnalyzer.analyze_image
+    - ImageAnalyzer.check_duplicate against 10k / 100k / 1M stored hashes
+    - FaceVerifier.detect_faces / compare_faces (utils/face_verifier_opencv.py)
+    - YOLODetector.detect_objects / verify_category
+
+Each stage runs in a fresh subprocess so its peak RSS is reported on its own.
+Run from the repository root:
+    python -m benchmarks.image_pipeline --images 40 --output bench_image_pipeline.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import time
+
+from benchmarks.common import percentile, write_report
+
+DUPLICATE_INDEX_SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+CORPUS_SIZES = [(320, 240), (640, 480), (1080, 1080), (1920, 1080)]
+CATEGORIES = ["plantation", "recycling", "transportation", "energy_conservation", "waste_management"]
+STAGES = [
+    "analyze_image",
+    *[f"check_duplicate_{label}" for label in DUPLICATE_INDEX_SIZES],
+    "face_detect",
+    "face_compare",
+    "yolo_detect_objects",
+    "yolo_verify_category",
+]
+
+
+def generate_corpus(directory: str, count: int, seed: int) -> list:
+    """Write `count` deterministic JPEGs (gradients, shapes, noise, blur, low light)"""
+    import cv2
+    import numpy as np
+
+    manifest_path = os.path.join(directory, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get("seed") == seed and manifest.get("count") == count:
+            return manifest["images"]
+
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    images = []
+    for i in range(count):
+        width, height = CORPUS_SIZES[i % len(CORPUS_SIZES)]
+        gradient = np.linspace(0, 255, width, dtype=np.float32)
+        img = np.stack([np.tile(gradient, (height, 1))] * 3, axis=-1)
+        img += rng.normal(0, 25, img.shape)
+        img = np.clip(img, 0, 255).astype(np.uint8)
+
+        for _ in range(int(rng.integers(3, 12))):
+            color = tuple(int(c) for c in rng.integers(0, 256, 3))
+            center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+            if rng.random() < 0.5:
+                cv2.circle(img, center, int(rng.integers(10, max(11, height // 4))), color, -1)
+            else:
+                size = (int(rng.integers(10, width // 3)), int(rng.integers(10, height // 3)))
+                cv2.rectangle(img, center, (center[0] + size[0], center[1] + size[1]), color, -1)
+
+        # A share of the corpus exercises the blur / brightness rejection paths
+        if i % 5 == 1:
+            img = cv2.GaussianBlur(img, (15, 15), 0)
+        elif i % 5 == 2:
+            img = (img * 0.1).astype(np.uint8)
+
+        path = os.path.join(directory, f"synthetic_{i:04d}.jpg")
+        cv2.imwrite(path, img, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        images.append(path)
+
+    with open(manifest_path, "w") as f:
+        json.dump({"seed": seed, "count": count, "images": images}, f, indent=2)
+    return images
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _random_hash_index(size: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [{"hash": f"{rng.getrandbits(64):016x}", "post_id": str(i)} for i in range(size)]
+
+
+def _time_calls(func, items: list) -> list:
+    latencies = []
+    for item in items:
+        started = time.perf_counter()
+        func(item)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def run_stage(stage: str, images: list, seed: int, duplicate_queries: int) -> dict:
+    """Executed inside a fresh subprocess; setup (model load, index build) is timed separately"""
+    setup_started = time.perf_counter()
+
+    if stage == "analyze_image":
+        from utils.image_analyzer import ImageAnalyzer
+        analyzer = ImageAnalyzer()
+        work = (analyzer.analyze_image, images)
+
+    elif stage.startswith("check_duplicate_"):
+        from utils.image_analyzer import ImageAnalyzer
+        analyzer = ImageAnalyzer()
+        size = DUPLICATE_INDEX_SIZES[stage.rsplit("_", 1)[1]]
+        index = _random_hash_index(size, seed)
+        query_hashes = [analyzer.analyze_image(path)["image_hash"] for path in images[:duplicate_queries]]
+        work = (lambda image_hash: analyzer.check_duplicate(image_hash, index), query_hashes)
+
+    elif stage in ("face_detect", "face_compare"):
+        import numpy as np
+        from utils.face_verifier_opencv import FaceVerifier
+        verifier = FaceVerifier()
+        if stage == "face_detect":
+            work = (verifier.detect_faces, images)
+        else:
+            # Same length as the 100x100 face ROI encoding stored on user profiles
+            profile_encoding = np.random.default_rng(seed).integers(0, 256, 100 * 100).tolist()
+            work = (lambda path: verifier.compare_faces(profile_encoding, path), images)
+
+    elif stage in ("yolo_detect_objects", "yolo_verify_category"):
+        from utils.yolo_detector import YOLODetector
+        detector = YOLODetector()
+        if stage == "yolo_detect_objects":
+            work = (detector.detect_objects, images)
+        else:
+            pairs = [(path, CATEGORIES[i % len(CATEGORIES)]) for i, path in enumerate(images)]
+            work = (lambda pair: detector.verify_category(*pair), pairs)
+
+    else:
+        raise ValueError(f"Unknown stage: {stage}")
+
+    setup_seconds = time.perf_counter() - setup_started
+    func, items = work
+
+    # One untimed call so lazy initialisation does not land in the first sample
+    if items:
+        func(items[0])
+
+    wall_started = time.perf_counter()
+    latencies = _time_calls(func, items)
+    wall_seconds = time.perf_counter() - wall_started
+    latencies.sort()
+
+    return {
+        "stage": stage,
+        "items": len(items),
+        "setup_seconds": round(setup_seconds, 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "images_per_sec": round(len(items) / wall_seconds, 2) if wall_seconds else 0.0,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def _stage_worker(args):
+    return run_stage(*args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the image verification pipeline on CPU")
+    parser.add_argument("--images", type=int, default=40, help="Size of the synthetic corpus")
+    parser.add_argument("--corpus-dir", default="bench_corpus")
+    parser.add_argument("--duplicate-queries", type=int, default=20, help="Lookups per duplicate-index size")
+    parser.add_argument("--stage", action="append", choices=STAGES, default=None, help="Run only these stages")
+    parser.add_argument("--threads", type=int, default=None, help="Pin OpenMP/BLAS/torch thread counts")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="bench_image_pipeline.json")
+    args = parser.parse_args()
+
+    # CPU only, and optionally a fixed thread count so runs compare across commits
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    if args.threads:
+        for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+            os.environ[var] = str(args.threads)
+
+    images = generate_corpus(args.corpus_dir, args.images, args.seed)
+    print(f"Using {len(images)} synthetic images from {args.corpus_dir}")
+
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for stage in args.stage or STAGES:
+        with context.Pool(1) as pool:
+            result = pool.apply(_stage_worker, ((stage, images, args.seed, args.duplicate_queries),))
+        results.append(result)
+        print(f"{stage:<24} p50={result['p50_ms']:>9.2f}ms p95={result['p95_ms']:>9.2f}ms "
+              f"{result['images_per_sec']:>8.2f} img/s peak_rss={result['peak_rss_mb']:>7.1f}MB")
+
+    write_report(args.output, {
+        "images": len(images),
+        "duplicate_queries": args.duplicate_queries,
+        "duplicate_index_sizes": DUPLICATE_INDEX_SIZES,
+        "threads": args.threads,
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+    }, results)
+
+
+if __name__ == "__main__":
+    main()
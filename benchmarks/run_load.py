@@ -0,0 +1,175 @@
+"""
+Fixed-concurrency load test for the hot API endpoints
+
+Seed the database first (python -m benchmarks.seed_load_data), then run:
+    python -m benchmarks.run_load --concurrency 32 --requests 2000 --output bench_results.json
+
+Without --base-url the API is started in-process on a local port with
+Cloudinary, Twilio and FCM replaced by benchmarks/stubs.py. Results
+(p50/p95/p99 latency in ms and req/s per endpoint) are written as JSON.
+"""
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.common import percentile, write_report
+from benchmarks.stubs import install_stubs
+from benchmarks.seed_load_data import DEFAULT_VOLUMES, user_identifier
+
+
+def start_local_server(port: int):
+    """Run main:app in a background thread with external services stubbed"""
+    install_stubs()
+
+    import uvicorn
+    from main import app
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    deadline = time.time() + 60
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("API server did not start within 60s")
+        time.sleep(0.1)
+    return server, thread
+
+
+def build_scenarios(users: int, post_ids: list, admin_token: str, rng: random.Random) -> list:
+    """Each scenario is (name, method, path_factory, kwargs_factory)"""
+    admin_headers = {"Authorization": f"Bearer {admin_token}"}
+
+    def random_user():
+        return user_identifier(rng.randrange(users))
+
+    def like_form():
+        identifier = random_user()
+        return {"data": {"email": identifier} if "@" in identifier else {"mobile": identifier}}
+
+    return [
+        ("GET /posts", "GET", lambda: "/posts",
+         lambda: {"params": {"skip": rng.randrange(0, 200), "limit": 20, "userId": random_user()}}),
+        ("POST /posts/{id}/like", "POST", lambda: f"/posts/{rng.choice(post_ids)}/like", like_form),
+        ("GET /leaderboard", "GET", lambda: "/leaderboard",
+         lambda: {"params": {"period": rng.choice(["all", "week", "month"])}}),
+        ("GET /notifications/{id}", "GET", lambda: f"/notifications/{random_user()}", lambda: {}),
+        ("GET /challenges/daily-checkin", "GET", lambda: "/challenges/daily-checkin",
+         lambda: {"params": {"user_id": random_user()}}),
+        ("GET /admin/stats", "GET", lambda: "/admin/stats", lambda: {"headers": admin_headers}),
+        ("GET /admin/growth-data", "GET", lambda: "/admin/growth-data", lambda: {"headers": admin_headers}),
+        ("GET /admin/challenges/analytics", "GET", lambda: "/admin/challenges/analytics",
+         lambda: {"headers": admin_headers}),
+    ]
+
+
+def run_scenario(base_url: str, scenario, total_requests: int, concurrency: int, warmup: int) -> dict:
+    name, method, path_factory, kwargs_factory = scenario
+    local = threading.local()
+    lock = threading.Lock()
+    latencies = []
+    errors = 0
+
+    def one_request(record: bool):
+        nonlocal errors
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        with lock:
+            # rng is shared between workers, so build the request under the lock
+            path = path_factory()
+            kwargs = kwargs_factory()
+        started = time.perf_counter()
+        try:
+            response = local.session.request(method, base_url + path, timeout=60, **kwargs)
+            failed = response.status_code >= 400
+        except requests.RequestException:
+            failed = True
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if record:
+            with lock:
+                latencies.append(elapsed_ms)
+                errors += failed
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda _: one_request(False), range(warmup)))
+
+        wall_started = time.perf_counter()
+        list(pool.map(lambda _: one_request(True), range(total_requests)))
+        wall_seconds = time.perf_counter() - wall_started
+
+    latencies.sort()
+    return {
+        "endpoint": name,
+        "requests": total_requests,
+        "errors": errors,
+        "concurrency": concurrency,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        "req_per_sec": round(total_requests / wall_seconds, 1) if wall_seconds else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the SafaStep hot endpoints")
+    parser.add_argument("--base-url", default=None, help="Target an already running API instead of starting one")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured requests per endpoint")
+    parser.add_argument("--users", type=int, default=DEFAULT_VOLUMES["users"], help="User count used when seeding")
+    parser.add_argument("--only", action="append", default=None, help="Run only endpoints whose name contains this text")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    if args.base_url:
+        base_url = args.base_url.rstrip("/")
+        server = None
+    else:
+        server, _ = start_local_server(args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    from database import posts_collection
+    from routes.admin_auth import create_access_token
+
+    post_ids = [str(post["_id"]) for post in posts_collection.find(
+        {"verificationStatus": "approved"}, {"_id": 1}
+    ).sort("createdAt", -1).limit(10_000)]
+    if not post_ids:
+        raise SystemExit("No approved posts found - run python -m benchmarks.seed_load_data first")
+
+    admin_token = create_access_token({"sub": "admin", "role": "super_admin"})
+    scenarios = build_scenarios(args.users, post_ids, admin_token, rng)
+    if args.only:
+        scenarios = [s for s in scenarios if any(text in s[0] for text in args.only)]
+
+    results = []
+    for scenario in scenarios:
+        result = run_scenario(base_url, scenario, args.requests, args.concurrency, args.warmup)
+        results.append(result)
+        print(f"{result['endpoint']:<34} p50={result['p50_ms']:>8.2f}ms p95={result['p95_ms']:>8.2f}ms "
+              f"p99={result['p99_ms']:>8.2f}ms {result['req_per_sec']:>8.1f} req/s errors={result['errors']}")
+
+    write_report(args.output, {
+        "concurrency": args.concurrency,
+        "requests_per_endpoint": args.requests,
+        "warmup_per_endpoint": args.warmup,
+        "seed": args.seed,
+        "base_url": base_url,
+    }, results)
+
+    if server is not None:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Seed a local MongoDB with benchmark-sized data
+Default volumes: 100k users, 1M posts, 5M likes, 2M notifications
+
+Run from the repository root:
+    python -m benchmarks.seed_load_data [--scale 0.1] [--yes]
+
+WARNING: clears the users, posts, likes, notifications, challenges,
+user_challenges and eco_locations collections of the configured database.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytz
+from bson import ObjectId
+from bson.int64 import Int64
+
+from database import (
+    user_db,
+    users_collection,
+    posts_collection,
+    likes_collection,
+    notifications_collection,
+    eco_locations_collection,
+)
+from seed_challenges import challenges as sample_challenges
+from seed_eco_locations import build_sample_locations
+from setup_indexes import apply_indexes
+from utils.checkins import new_checkin_fields, mask_value, is_checked, checkin_event, WORD_BITS
+
+challenges_collection = user_db["challenges"]
+user_challenges_collection = user_db["user_challenges"]
+challenge_checkins_collection = user_db["challenge_checkins"]
+
+DEFAULT_VOLUMES = {
+    "users": 100_000,
+    "posts": 1_000_000,
+    "likes": 5_000_000,
+    "notifications": 2_000_000,
+    "user_challenges": 50_000,
+}
+
+FIRST_NAMES = ["Ram", "Sita", "Hari", "Gita", "Bikash", "Anjali", "Suman", "Pooja", "Rajesh", "Nisha"]
+LAST_NAMES = ["Shrestha", "Thapa", "Gurung", "Tamang", "Rai", "Karki", "Adhikari", "Maharjan"]
+CATEGORIES = [
+    ("plantation", "1"),
+    ("recycling", "2"),
+    ("transportation", "3"),
+    ("energy_conservation", "4"),
+    ("waste_management", "5"),
+]
+NOTIFICATION_TYPES = ["post_liked", "post_approved", "announcement", "achievement", "challenge_completed"]
+
+# Every fifth benchmark user signs up with email, the rest with mobile
+EMAIL_USER_EVERY = 5
+HISTORY_DAYS = 180
+
+
+def user_identifier(index: int) -> str:
+    """Deterministic identifier for the index-th seeded user (shared with run_load)"""
+    if index % EMAIL_USER_EVERY == 0:
+        return f"bench.user{index}@safastep.test"
+    return f"98{index:08d}"
+
+
+def _insert_batches(collection, docs, batch_size: int) -> int:
+    inserted = 0
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            collection.insert_many(batch, ordered=False)
+            inserted += len(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+        inserted += len(batch)
+    return inserted
+
+
+def _generate_users(rng: random.Random, count: int, now: float):
+    for i in range(count):
+        identifier = user_identifier(i)
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        created_at = now - rng.uniform(0, HISTORY_DAYS * 86400)
+        user = {
+            "identifier": identifier,
+            "firstName": first_name,
+            "lastName": last_name,
+            "dateOfBirth": {"year": rng.randint(1970, 2008), "month": rng.randint(1, 12), "day": rng.randint(1, 28)},
+            "profilePicture": f"https://res.cloudinary.invalid/safastep/profiles/profile_{i}.jpg" if rng.random() < 0.6 else None,
+            "ecoPoints": int(rng.paretovariate(1.3) * 40),
+            "totalCO2Offset": round(rng.uniform(0, 400), 2),
+            "carbonFootprint": 0,
+            "stepsCount": rng.randint(0, 500_000),
+            "verified": True,
+            "createdAt": created_at,
+            "updatedAt": created_at,
+        }
+        if "@" in identifier:
+            user["email"] = identifier
+            user["authMethod"] = "email"
+        else:
+            user["mobile"] = identifier
+        yield user
+
+
+def _generate_posts(rng: random.Random, post_ids, like_counts, users: int, now: float):
+    for post_id, likes_count in zip(post_ids, like_counts):
+        owner = rng.randrange(users)
+        identifier = user_identifier(owner)
+        category, category_id = rng.choice(CATEGORIES)
+        status = rng.choices(["approved", "pending_review", "rejected"], weights=[85, 12, 3])[0]
+        created_at = now - rng.uniform(0, HISTORY_DAYS * 86400)
+        eco_points = rng.choice([30, 40, 50, 60, 100]) if status == "approved" else 0
+        yield {
+            "_id": post_id,
+            "mobile": None if "@" in identifier else identifier,
+            "email": identifier if "@" in identifier else None,
+            "identifier": identifier,
+            "userName": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "userProfilePicture": None,
+            "caption": f"Benchmark post {post_id}",
+            "category": category,
+            "categoryId": category_id,
+            "imageUrl": f"https://res.cloudinary.invalid/safastep/posts/{post_id}.jpg",
+            "imageFilename": f"post_{post_id}.jpg",
+            "cloudinaryPublicId": f"safastep/posts/{post_id}",
+            "imageHash": f"{rng.getrandbits(64):016x}",
+            "verificationScore": rng.randint(50, 100),
+            "verificationStatus": status,
+            "detectedObjects": [],
+            "matchedObjects": [],
+            "aiVerification": {},
+            "ecoPoints": eco_points,
+            "co2Offset": round(eco_points / 20, 2),
+            "likesCount": likes_count,
+            "comments": [],
+            "commentsCount": 0,
+            "createdAt": created_at,
+            "updatedAt": created_at,
+        }
+
+
+def _generate_likes(rng: random.Random, post_ids, like_counts, users: int, now: float):
+    for post_id, likes_count in zip(post_ids, like_counts):
+        if not likes_count:
+            continue
+        post_key = str(post_id)
+        for liker in rng.sample(range(users), likes_count):
+            yield {
+                "postId": post_key,
+                "userId": user_identifier(liker),
+                "createdAt": now - rng.uniform(0, HISTORY_DAYS * 86400),
+            }
+
+
+def _generate_notifications(rng: random.Random, count: int, users: int, now: float):
+    for _ in range(count):
+        notification_type = rng.choice(NOTIFICATION_TYPES)
+        yield {
+            "userId": user_identifier(rng.randrange(users)),
+            "type": notification_type,
+            "title": notification_type.replace("_", " ").title(),
+            "message": "Benchmark notification",
+            "data": {},
+            "read": rng.random() < 0.7,
+            "createdAt": now - rng.uniform(0, HISTORY_DAYS * 86400),
+        }
+
+
+def _generate_user_challenges(rng: random.Random, count: int, users: int):
+    today = datetime.now(pytz.UTC).date()
+    for _ in range(count):
+        challenge = rng.choice(sample_challenges)
+        started = today - timedelta(days=rng.randint(0, 60))
+        checkin_fields = new_checkin_fields(started, challenge["duration_days"])
+        mask = 0
+        checked = 0
+        for day in range(challenge["duration_days"]):
+            if started + timedelta(days=day) <= today and rng.random() < 0.8:
+                mask |= 1 << day
+                checked += 1
+                checkin_fields["checkin_details"][str(day + 1)] = {"timestamp": datetime.now(pytz.UTC)}
+        checkin_fields["checkin_mask"] = [
+            Int64(mask >> (word * WORD_BITS) & ((1 << WORD_BITS) - 1))
+            for word in range(len(checkin_fields["checkin_mask"]))
+        ]
+        completed = checked == challenge["duration_days"]
+        status = "completed" if completed else rng.choice(["in_progress", "failed"])
+        yield {
+            "user_id": user_identifier(rng.randrange(users)),
+            "challenge_id": challenge["challenge_id"],
+            "challenge_title": challenge["title"],
+            "challenge_icon": challenge.get("icon", "🎯"),
+            "challenge_category": challenge.get("category", "general"),
+            "status": status,
+            "started_at": datetime.combine(started, datetime.min.time()).replace(tzinfo=pytz.UTC),
+            "target_days": challenge["duration_days"],
+            "current_streak": checked,
+            **checkin_fields,
+            "completed": completed,
+            "completed_at": datetime.now(pytz.UTC) if completed else None,
+            "reward_points": challenge["reward_points"],
+            "reward_claimed": False,
+            "missed_days": 0,
+            "allow_one_skip": challenge.get("allow_one_skip", False)
+        }
+
+
+def _generate_checkin_events():
+    """Event log entries for every checked-in day of the seeded user challenges"""
+    for user_challenge in user_challenges_collection.find({}, {"check_ins": 0}):
+        mask = mask_value(user_challenge)
+        details = user_challenge.get("checkin_details", {})
+        for index in range(user_challenge["target_days"]):
+            if is_checked(mask, index):
+                yield checkin_event(user_challenge, index, details.get(str(index + 1), {}))
+
+
+def _like_counts(rng: random.Random, posts: int, likes: int, users: int) -> list:
+    """Long-tailed likes-per-post distribution whose total is exactly `likes`"""
+    weights = [rng.paretovariate(1.1) for _ in range(posts)]
+    scale = likes / sum(weights)
+    counts = [min(users, int(w * scale)) for w in weights]
+    # Hand out the rounding remainder one like at a time
+    shortfall = likes - sum(counts)
+    index = 0
+    while shortfall > 0 and posts:
+        if counts[index % posts] < users:
+            counts[index % posts] += 1
+            shortfall -= 1
+        index += 1
+    return counts
+
+
+def seed_load_data(volumes: dict, batch_size: int = 10_000, seed: int = 42):
+    """Clear the benchmark collections and insert reproducible data"""
+    rng = random.Random(seed)
+    now = time.time()
+
+    for collection in (users_collection, posts_collection, likes_collection, notifications_collection,
+                       challenges_collection, user_challenges_collection, challenge_checkins_collection,
+                       eco_locations_collection):
+        collection.delete_many({})
+    print("Cleared existing data.")
+
+    started = time.perf_counter()
+    count = _insert_batches(users_collection, _generate_users(rng, volumes["users"], now), batch_size)
+    print(f"✓ Inserted {count} users")
+
+    post_ids = [ObjectId() for _ in range(volumes["posts"])]
+    like_counts = _like_counts(rng, volumes["posts"], volumes["likes"], volumes["users"])
+    count = _insert_batches(posts_collection, _generate_posts(rng, post_ids, like_counts, volumes["users"], now), batch_size)
+    print(f"✓ Inserted {count} posts")
+
+    count = _insert_batches(likes_collection, _generate_likes(rng, post_ids, like_counts, volumes["users"], now), batch_size)
+    print(f"✓ Inserted {count} likes")
+
+    count = _insert_batches(notifications_collection, _generate_notifications(rng, volumes["notifications"], volumes["users"], now), batch_size)
+    print(f"✓ Inserted {count} notifications")
+
+    challenges_collection.insert_many([dict(challenge) for challenge in sample_challenges])
+    count = _insert_batches(user_challenges_collection, _generate_user_challenges(rng, volumes["user_challenges"], volumes["users"]), batch_size)
+    print(f"✓ Inserted {len(sample_challenges)} challenges and {count} user challenges")
+    count = _insert_batches(challenge_checkins_collection, _generate_checkin_events(), batch_size)
+    print(f"✓ Inserted {count} check-in events")
+
+    kathmandu, bhaktapur, lalitpur = build_sample_locations(int(now))
+    eco_locations_collection.insert_many(kathmandu + bhaktapur + lalitpur)
+    print(f"✓ Inserted {len(kathmandu) + len(bhaktapur) + len(lalitpur)} eco-locations")
+
+    result = apply_indexes()
+    print(f"✓ Ensured {result['created']} indexes ({len(result['failed'])} failed)")
+
+    print(f"\n✅ Benchmark data seeded in {time.perf_counter() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed MongoDB with benchmark-sized SafaStep data")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every default volume (e.g. 0.01 for a smoke run)")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42, help="RNG seed; the same seed always produces the same data")
+    parser.add_argument("--yes", action="store_true", help="Do not ask before clearing collections")
+    args = parser.parse_args()
+
+    volumes = {name: max(1, int(value * args.scale)) for name, value in DEFAULT_VOLUMES.items()}
+    print("Seeding volumes: " + ", ".join(f"{name}={value}" for name, value in volumes.items()))
+
+    if not args.yes:
+        response = input("This clears the existing collections. Continue? (yes/no): ")
+        if response.lower() != "yes":
+            print("Keeping existing data. Exiting.")
+            return
+
+    seed_load_data(volumes, batch_size=args.batch_size, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
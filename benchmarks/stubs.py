@@ -0,0 +1,73 @@
+"""
+Local stand-ins for the external services used by the API (Cloudinary, Twilio, FCM)
+
+Call install_stubs() BEFORE importing main / routes so that module-level clients
+(e.g. the Twilio client in routes/auth.py) are built from the stubs and no
+network calls are made while benchmarking.
+"""
+import itertools
+import logging
+
+logger = logging.getLogger(__name__)
+
+_counter = itertools.count(1)
+
+
+class _StubTwilioMessage:
+    def __init__(self, to: str, body: str):
+        self.sid = f"SMstub{next(_counter):012d}"
+        self.status = "queued"
+        self.to = to
+        self.body = body
+
+
+class _StubTwilioMessages:
+    def create(self, body: str = "", from_: str = None, to: str = None, **kwargs):
+        return _StubTwilioMessage(to, body)
+
+
+class StubTwilioClient:
+    """Drop-in replacement for twilio.rest.Client that never leaves the process"""
+
+    def __init__(self, *args, **kwargs):
+        self.messages = _StubTwilioMessages()
+
+
+def stub_cloudinary_upload(file_path, folder: str = "safastep", public_id: str = None, **kwargs):
+    """Mimics the subset of cloudinary.uploader.upload's response the API reads"""
+    public_id = f"{folder}/{public_id or f'stub_{next(_counter)}'}"
+    return {
+        "secure_url": f"https://res.cloudinary.invalid/{public_id}.jpg",
+        "public_id": public_id,
+        "format": "jpg",
+        "width": 1080,
+        "height": 1080
+    }
+
+
+def stub_cloudinary_destroy(public_id: str, **kwargs):
+    return {"result": "ok"}
+
+
+def stub_fcm_send(message, dry_run: bool = False, app=None):
+    return f"projects/stub/messages/{next(_counter)}"
+
+
+def install_stubs():
+    """Patch Cloudinary, Twilio and Firebase Cloud Messaging with local stubs"""
+    import cloudinary.uploader
+    import twilio.rest
+    import firebase_admin
+    from firebase_admin import credentials, messaging
+
+    cloudinary.uploader.upload = stub_cloudinary_upload
+    cloudinary.uploader.destroy = stub_cloudinary_destroy
+
+    twilio.rest.Client = StubTwilioClient
+
+    # utils/push_notifications.py initialises the SDK from a credentials file at import
+    credentials.Certificate = lambda *args, **kwargs: None
+    firebase_admin.initialize_app = lambda *args, **kwargs: None
+    messaging.send = stub_fcm_send
+
+    logger.info("Installed Cloudinary, Twilio and FCM stubs")
@@ -24,3 +24,47 @@ if not os.path.exists(UPLOAD_DIR):
 CLOUDINARY_CLOUD_NAME = os.getenv("CLOUDINARY_CLOUD_NAME")
 CLOUDINARY_API_KEY = os.getenv("CLOUDINARY_API_KEY")
 CLOUDINARY_API_SECRET = os.getenv("CLOUDINARY_API_SECRET")
+
+# Write-behind like counters: buffer like/unlike deltas in memory and flush
+# coalesced $inc updates to posts.likesCount every LIKE_COUNTER_FLUSH_MS
+LIKE_COUNTER_WRITE_BEHIND = os.getenv("LIKE_COUNTER_WRITE_BEHIND", "false").lower() == "true"
+LIKE_COUNTER_FLUSH_MS = int(os.getenv("LIKE_COUNTER_FLUSH_MS", "500"))
+
+# Like notifications for the same post are merged into one document per window
+LIKE_NOTIFICATION_WINDOW_SECONDS = int(os.getenv("LIKE_NOTIFICATION_WINDOW_SECONDS", "3600"))
+
+# Notification retention: read notifications expire after NOTIFICATION_READ_TTL_DAYS,
+# users keep at most NOTIFICATION_MAX_PER_USER, and unread broadcast copies older
+# than BROADCAST_COMPACT_AFTER_DAYS are folded into one digest per user
+NOTIFICATION_READ_TTL_DAYS = int(os.getenv("NOTIFICATION_READ_TTL_DAYS", "30"))
+NOTIFICATION_MAX_PER_USER = int(os.getenv("NOTIFICATION_MAX_PER_USER", "500"))
+BROADCAST_COMPACT_AFTER_DAYS = int(os.getenv("BROADCAST_COMPACT_AFTER_DAYS", "7"))
+NOTIFICATION_RETENTION_INTERVAL_MINUTES = int(os.getenv("NOTIFICATION_RETENTION_INTERVAL_MINUTES", "60"))
+
+# Seconds to cache per-user unread notification counts in process (0 disables the cache)
+NOTIFICATION_UNREAD_CACHE_SECONDS = float(os.getenv("NOTIFICATION_UNREAD_CACHE_SECONDS", "0"))
+
+# Where streaming clients get notification events from: "local" publishes in the
+# writing process (single worker), "changestream" tails MongoDB (multiple workers, needs a replica set)
+NOTIFICATION_STREAM_SOURCE = os.getenv("NOTIFICATION_STREAM_SOURCE", "local").lower()
+
+# Seconds between full rebuilds of the in-memory leaderboard rank index
+# (slides the week/month windows and picks up other workers' point changes)
+LEADERBOARD_RANK_REBUILD_SECONDS = int(os.getenv("LEADERBOARD_RANK_REBUILD_SECONDS", "300"))
+
+# UTC hour at which the admin stats rollups are rebuilt from users and posts
+STATS_RECONCILE_HOUR_UTC = int(os.getenv("STATS_RECONCILE_HOUR_UTC", "2"))
+
+# Seconds to cache /eco-locations/nearby candidates per map tile (cleared on admin edits)
+ECO_LOCATIONS_NEARBY_CACHE_SECONDS = int(os.getenv("ECO_LOCATIONS_NEARBY_CACHE_SECONDS", "300"))
+
+# Answer eco-location map queries from an in-process grid index (false: query MongoDB with $near),
+# fully reloaded every ECO_LOCATION_INDEX_REBUILD_SECONDS to pick up other workers' admin edits
+ECO_LOCATION_INDEX_ENABLED = os.getenv("ECO_LOCATION_INDEX_ENABLED", "true").lower() == "true"
+ECO_LOCATION_INDEX_REBUILD_SECONDS = int(os.getenv("ECO_LOCATION_INDEX_REBUILD_SECONDS", "300"))
+
+# Minutes between runs of the plantation event lifecycle job (upcoming -> ongoing -> completed)
+ECO_EVENT_LIFECYCLE_INTERVAL_MINUTES = int(os.getenv("ECO_EVENT_LIFECYCLE_INTERVAL_MINUTES", "15"))
+
+# Create any missing indexes from setup_indexes.INDEX_MANIFEST when the API starts
+ENSURE_INDEXES_ON_STARTUP = os.getenv("ENSURE_INDEXES_ON_STARTUP", "true").lower() == "true"
@@ -22,6 +22,11 @@ eco_locations_collection = user_db["eco_locations"]
 notifications_collection = user_db["notifications"]
 achievements_collection = user_db["achievements"]
 user_achievements_collection = user_db["user_achievements"]
+notification_counters_collection = user_db["notification_counters"]
+daily_stats_collection = user_db["daily_stats"]
+user_challenges_collection = user_db["user_challenges"]
+challenge_checkins_collection = user_db["challenge_checkins"]
+job_locks_collection = user_db["job_locks"]
 
 def close_mongo_connection():
     """Close MongoDB connection properly"""
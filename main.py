@@ -4,7 +4,11 @@ from fastapi.staticfiles import StaticFiles
 import logging
 import asyncio
 from datetime import datetime, timedelta
-from config import UPLOAD_DIR
+from config import (
+    UPLOAD_DIR, ENSURE_INDEXES_ON_STARTUP, NOTIFICATION_RETENTION_INTERVAL_MINUTES,
+    NOTIFICATION_STREAM_SOURCE, LEADERBOARD_RANK_REBUILD_SECONDS, STATS_RECONCILE_HOUR_UTC,
+    ECO_LOCATION_INDEX_ENABLED, ECO_LOCATION_INDEX_REBUILD_SECONDS, ECO_EVENT_LIFECYCLE_INTERVAL_MINUTES
+)
 from routes.auth import router as auth_router
 from routes.user import router as user_router
 from routes.posts import router as posts_router
@@ -50,18 +54,130 @@ async def check_missed_challenges_task():
         # Wait for 1 hour before next check
         await asyncio.sleep(3600)
 
+# Background task for notification retention
+async def notification_retention_task():
+    """Background task that compacts and caps notifications every NOTIFICATION_RETENTION_INTERVAL_MINUTES"""
+    from utils.notification_retention import run_retention
+    while True:
+        try:
+            await asyncio.to_thread(run_retention)
+        except Exception as e:
+            logger.error(f"Error running notification retention: {str(e)}")
+        
+        await asyncio.sleep(NOTIFICATION_RETENTION_INTERVAL_MINUTES * 60)
+
+# Background task to rebuild the leaderboard rank index
+async def rebuild_rank_index_task():
+    """Background task that reloads leaderboard ranks every LEADERBOARD_RANK_REBUILD_SECONDS"""
+    from utils.rank_index import rebuild_rank_indexes
+    while True:
+        try:
+            await asyncio.to_thread(rebuild_rank_indexes)
+        except Exception as e:
+            logger.error(f"Error rebuilding leaderboard rank index: {str(e)}")
+        
+        await asyncio.sleep(LEADERBOARD_RANK_REBUILD_SECONDS)
+
+# Background task to rebuild the eco-location spatial index
+async def rebuild_location_index_task():
+    """Background task that reloads the eco-location index every ECO_LOCATION_INDEX_REBUILD_SECONDS"""
+    from utils.nearby_locations import rebuild_location_index
+    while True:
+        try:
+            await asyncio.to_thread(rebuild_location_index)
+        except Exception as e:
+            logger.error(f"Error rebuilding eco-location index: {str(e)}")
+        
+        await asyncio.sleep(ECO_LOCATION_INDEX_REBUILD_SECONDS)
+
+# Background task to advance plantation event statuses
+async def event_lifecycle_task():
+    """Background task that moves plantation events to ongoing/completed every ECO_EVENT_LIFECYCLE_INTERVAL_MINUTES"""
+    from utils.event_lifecycle import advance_event_statuses
+    while True:
+        try:
+            await asyncio.to_thread(advance_event_statuses)
+        except Exception as e:
+            logger.error(f"Error advancing event statuses: {str(e)}")
+        
+        await asyncio.sleep(ECO_EVENT_LIFECYCLE_INTERVAL_MINUTES * 60)
+
+# Background task to reconcile admin stats rollups nightly
+async def reconcile_stats_task():
+    """Background task that rebuilds the daily stats rollups every day at STATS_RECONCILE_HOUR_UTC"""
+    from utils.stats_rollup import reconcile_stats
+    while True:
+        now = datetime.utcnow()
+        next_run = now.replace(hour=STATS_RECONCILE_HOUR_UTC, minute=0, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        await asyncio.sleep((next_run - now).total_seconds())
+        
+        try:
+            await asyncio.to_thread(reconcile_stats)
+        except Exception as e:
+            logger.error(f"Error reconciling stats rollups: {str(e)}")
+
+# Background task to flush write-behind like counters
+async def flush_like_counters_task():
+    """Background task that writes buffered like deltas every LIKE_COUNTER_FLUSH_MS"""
+    from utils.like_counter import like_counter
+    while True:
+        await asyncio.sleep(like_counter.flush_interval)
+        try:
+            await asyncio.to_thread(like_counter.flush)
+        except Exception as e:
+            logger.error(f"Error flushing like counters: {str(e)}")
+
 # Start background task
 @app.on_event("startup")
 async def startup_event():
+    # Create missing indexes off the event loop so startup is not blocked by index builds
+    if ENSURE_INDEXES_ON_STARTUP:
+        from setup_indexes import apply_indexes
+        asyncio.create_task(asyncio.to_thread(apply_indexes))
+        logger.info("Ensuring MongoDB indexes in the background")
+    
     # Start the background task
     asyncio.create_task(check_missed_challenges_task())
     logger.info("Started missed challenges checker")
+    
+    asyncio.create_task(notification_retention_task())
+    logger.info("Started notification retention job")
+    
+    asyncio.create_task(rebuild_rank_index_task())
+    logger.info("Started leaderboard rank index")
+    
+    if ECO_LOCATION_INDEX_ENABLED:
+        asyncio.create_task(rebuild_location_index_task())
+        logger.info("Started eco-location spatial index")
+    
+    asyncio.create_task(event_lifecycle_task())
+    logger.info("Started plantation event lifecycle job")
+    
+    asyncio.create_task(reconcile_stats_task())
+    logger.info(f"Scheduled stats rollup reconcile at {STATS_RECONCILE_HOUR_UTC:02d}:00 UTC")
+    
+    if NOTIFICATION_STREAM_SOURCE == "changestream":
+        from utils.notification_hub import start_change_stream_listener
+        start_change_stream_listener()
+        logger.info("Started notification change stream listener")
+    
+    from utils.like_counter import like_counter
+    if like_counter.enabled:
+        asyncio.create_task(flush_like_counters_task())
+        logger.info(f"Started write-behind like counter (flush every {like_counter.flush_interval * 1000:.0f}ms)")
 
 # Shutdown event to clean up resources
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up resources on shutdown"""
     try:
+        from utils.like_counter import like_counter
+        if like_counter.enabled:
+            flushed = like_counter.flush()
+            logger.info(f"Flushed like counters for {flushed} posts")
+        
         from database import close_mongo_connection
         close_mongo_connection()
         logger.info("Cleaned up resources on shutdown")
@@ -0,0 +1,160 @@
+"""
+Script to convert user challenges from the per-day check_ins array to the
+compact check-in bitset (start_date / end_date, checkin_mask, checkin_details)
+and to fill the challenge_checkins event log from it
+Routes convert legacy documents lazily as they touch them; run this once after
+deploying so analytics, which read the event log, see every check-in.
+Safe to run repeatedly; converted documents and logged events are skipped.
+    python migrate_checkins.py              # convert, then backfill the event log
+    python migrate_checkins.py --rebuild    # recompute every bitset from the event log
+"""
+import sys
+import logging
+from datetime import datetime
+from pymongo import UpdateOne
+from database import user_challenges_collection, challenge_checkins_collection
+from setup_indexes import apply_indexes
+from utils.checkins import compact_fields, checkin_event_operations, rebuild_from_events, mask_value, checkin_progress
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+def backfill_checkin_events() -> int:
+    """Log every checked-in day of every user challenge that isn't in challenge_checkins yet"""
+    logged = 0
+    operations = []
+    user_challenges = user_challenges_collection.find(
+        {"checkin_mask": {"$exists": True}},
+        {"user_id": 1, "challenge_id": 1, "start_date": 1, "target_days": 1, "checkin_mask": 1, "checkin_details": 1}
+    ).batch_size(BATCH_SIZE)
+
+    for user_challenge in user_challenges:
+        operations.extend(checkin_event_operations(user_challenge))
+
+        if len(operations) >= BATCH_SIZE:
+            logged += challenge_checkins_collection.bulk_write(operations, ordered=False).upserted_count
+            operations = []
+
+    if operations:
+        logged += challenge_checkins_collection.bulk_write(operations, ordered=False).upserted_count
+
+    logger.info(f"Logged {logged} missing check-in events")
+    return logged
+
+
+def _rebuilt_update(user_challenge: dict, events: list, now: datetime) -> dict:
+    """Update setting the check-in fields from the events plus the progress and status they imply"""
+    fields = rebuild_from_events(user_challenge, events)
+    progress = checkin_progress({**user_challenge, **fields}, mask_value(fields), now.date())
+    fields.update(progress)
+
+    # A claimed reward has been paid out; everything else follows the mask like the check-in route and missed sweep
+    if user_challenge.get("status") != "claimed":
+        max_allowed_misses = 1 if user_challenge.get("allow_one_skip", False) else 0
+        if progress["completed"]:
+            fields["status"] = "completed"
+            fields["completed_at"] = user_challenge.get("completed_at") or now
+        elif progress["missed_days"] > max_allowed_misses:
+            fields["status"] = "failed"
+            fields["failed_at"] = user_challenge.get("failed_at") or now
+            fields["failure_reason"] = f"Missed {progress['missed_days']} days"
+        else:
+            fields["status"] = "in_progress"
+
+    update = {"$set": fields}
+    if fields.get("status") in ("completed", "in_progress"):
+        update["$unset"] = {"failed_at": "", "failure_reason": ""}
+    return update
+
+
+def _events_by_user_challenge():
+    """(user_challenge_id, events) for every user challenge in the log, in _id order, from one scan"""
+    return challenge_checkins_collection.aggregate([
+        {"$group": {
+            "_id": "$user_challenge_id",
+            "events": {"$push": {"day": "$day", "timestamp": "$timestamp", "note": "$note"}}
+        }},
+        {"$sort": {"_id": 1}}
+    ], allowDiskUse=True)
+
+
+def rebuild_checkins() -> int:
+    """
+    Overwrite the check-in bitset and details of every compact user challenge
+    with the ones recomputed from challenge_checkins, e.g. to repair documents
+    after a bad write, and recompute current_streak, missed_days, completed and
+    status from them. Days missing from the log are cleared, so only run this
+    when the log is complete.
+    """
+    rebuilt = 0
+    operations = []
+    now = datetime.utcnow()
+    user_challenges = user_challenges_collection.find(
+        {"checkin_mask": {"$exists": True}},
+        {"start_date": 1, "target_days": 1, "status": 1, "allow_one_skip": 1, "completed_at": 1, "failed_at": 1}
+    ).sort("_id", 1).batch_size(BATCH_SIZE)
+
+    # Merge-join the _id-ordered user challenges with the _id-ordered event groups
+    groups = _events_by_user_challenge()
+    group = next(groups, None)
+    for user_challenge in user_challenges:
+        while group is not None and group["_id"] < user_challenge["_id"]:
+            group = next(groups, None)
+        events = group["events"] if group is not None and group["_id"] == user_challenge["_id"] else []
+
+        operations.append(UpdateOne(
+            {"_id": user_challenge["_id"]},
+            _rebuilt_update(user_challenge, events, now)
+        ))
+
+        if len(operations) >= BATCH_SIZE:
+            rebuilt += user_challenges_collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+
+    if operations:
+        rebuilt += user_challenges_collection.bulk_write(operations, ordered=False).modified_count
+
+    logger.info(f"Rebuilt check-ins on {rebuilt} user challenges from the event log")
+    return rebuilt
+
+
+def migrate_checkins() -> int:
+    converted = 0
+    operations = []
+    user_challenges = user_challenges_collection.find(
+        {"checkin_mask": {"$exists": False}},
+        {"check_ins": 1, "started_at": 1, "target_days": 1}
+    ).batch_size(BATCH_SIZE)
+
+    for user_challenge in user_challenges:
+        if not user_challenge.get("target_days"):
+            logger.warning(f"User challenge {user_challenge['_id']} has no target_days, skipping")
+            continue
+        operations.append(UpdateOne(
+            {"_id": user_challenge["_id"], "checkin_mask": {"$exists": False}},
+            {"$set": compact_fields(user_challenge), "$unset": {"check_ins": ""}}
+        ))
+
+        if len(operations) >= BATCH_SIZE:
+            converted += user_challenges_collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+
+    if operations:
+        converted += user_challenges_collection.bulk_write(operations, ordered=False).modified_count
+
+    logger.info(f"Converted check-ins on {converted} user challenges")
+
+    # The event log's unique (user_challenge_id, day) index must exist before backfilling
+    apply_indexes(["user_challenges", "challenge_checkins"])
+    backfill_checkin_events()
+    return converted
+
+
+if __name__ == "__main__":
+    if "--rebuild" in sys.argv:
+        rebuild_checkins()
+    else:
+        migrate_checkins()
@@ -0,0 +1,54 @@
+"""
+Script to backfill the canonical `identifier` field and its indexes
+Users, posts and user achievements get identifier = mobile or email, so routes
+can look them up with a single indexed key instead of a mobile/email $or.
+Safe to run repeatedly; only documents missing the field are updated.
+"""
+import logging
+from pymongo import UpdateOne
+from database import users_collection, posts_collection, user_achievements_collection
+from setup_indexes import apply_indexes
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+def _backfill(collection, name: str) -> int:
+    """Set identifier = mobile or email on every document of the collection that lacks it"""
+    updated = 0
+    operations = []
+    documents = collection.find(
+        {"identifier": {"$exists": False}},
+        {"mobile": 1, "email": 1}
+    ).batch_size(BATCH_SIZE)
+
+    for document in documents:
+        identifier = document.get("mobile") or document.get("email")
+        if not identifier:
+            logger.warning(f"{name} {document['_id']} has neither mobile nor email, skipping")
+            continue
+        operations.append(UpdateOne({"_id": document["_id"]}, {"$set": {"identifier": identifier}}))
+
+        if len(operations) >= BATCH_SIZE:
+            updated += collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+
+    if operations:
+        updated += collection.bulk_write(operations, ordered=False).modified_count
+
+    logger.info(f"Backfilled identifier on {updated} {name}")
+    return updated
+
+
+def migrate_identifiers():
+    _backfill(users_collection, "users")
+    _backfill(posts_collection, "posts")
+    _backfill(user_achievements_collection, "user achievements")
+    # Identifier indexes are part of the index manifest
+    apply_indexes(["user_data", "posts", "user_achievements"])
+
+
+if __name__ == "__main__":
+    migrate_identifiers()
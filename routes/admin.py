@@ -5,6 +5,11 @@ from typing import Optional
 from database import users_collection, posts_collection, likes_collection, eco_locations_collection
 import logging
 from bson import ObjectId
+from pymongo import ReturnDocument
+from utils.post_enrichment import enrich_admin_posts
+from utils.identity import user_identifier
+from utils.nearby_locations import refresh_locations, index_location, remove_location
+from utils import rank_index, stats_rollup, achievement_engine
 import jwt
 import os
 
@@ -137,29 +142,13 @@ async def get_user_details(user_id: str):
         user["_id"] = str(user["_id"])
         
         # Get user identifier (mobile or email)
-        identifier = user.get("mobile") or user.get("email")
+        identifier = user_identifier(user)
         
         # Get user's posts count
-        posts_count = posts_collection.count_documents({
-            "$or": [
-                {"identifier": identifier},
-                {"mobile": identifier},
-                {"email": identifier}
-            ]
-        })
-        
-        # Get user's posts IDs
-        user_posts = list(posts_collection.find(
-            {
-                "$or": [
-                    {"identifier": identifier},
-                    {"mobile": identifier},
-                    {"email": identifier}
-                ]
-            },
-            {"_id": 1}
-        ))
+        # Get user's posts IDs (covered by the identifier index)
+        user_posts = list(posts_collection.find({"identifier": identifier}, {"_id": 1}))
         user_post_ids = [str(post["_id"]) for post in user_posts]
+        posts_count = len(user_post_ids)
         
         # Count total likes on user's posts
         likes_count = likes_collection.count_documents({
@@ -191,7 +180,8 @@ async def delete_user(user_id: str):
         mobile = user.get("mobile")
         email = user.get("email")
         
-        # Delete user's posts
+        # Delete user's posts, taking them out of the stats rollups first
+        stats_rollup.record_posts_deleted({"mobile": mobile})
         posts_deleted = posts_collection.delete_many({"mobile": mobile})
         
         # Delete user's likes
@@ -199,6 +189,8 @@ async def delete_user(user_id: str):
         
         # Delete user
         users_collection.delete_one({"_id": ObjectId(user_id)})
+        rank_index.remove_user(user_identifier(user))
+        stats_rollup.record_user(user.get("createdAt", 0), -1)
         
         logger.info(f"User {user_id} deleted. Posts: {posts_deleted.deleted_count}, Likes: {likes_deleted.deleted_count}")
         
@@ -228,22 +220,8 @@ async def get_all_posts(skip: int = Query(0, ge=0), limit: int = Query(10, ge=1,
         total = posts_collection.count_documents(filter_query)
         posts = list(posts_collection.find(filter_query).sort("_id", -1).skip(skip).limit(limit))
         
-        # Convert ObjectId to string and format data
-        for post in posts:
-            post_id = str(post["_id"])
-            post["_id"] = post_id
-            if "createdAt" in post:
-                post["createdAt"] = int(post["createdAt"])
-            
-            # Count actual likes from likes collection
-            likes_count = likes_collection.count_documents({"postId": post_id})
-            post["likesCount"] = likes_count
-            
-            # Extract firstName and lastName from userName if not present
-            if "userName" in post and "firstName" not in post:
-                name_parts = post["userName"].split(" ", 1)
-                post["firstName"] = name_parts[0]
-                post["lastName"] = name_parts[1] if len(name_parts) > 1 else ""
+        # Author fields and actual like counts for the whole page in two queries
+        enrich_admin_posts(posts)
         
         return {
             "success": True,
@@ -279,21 +257,8 @@ async def search_posts(query: str = Query(..., min_length=1), skip: int = Query(
         total = posts_collection.count_documents(search_filter)
         posts = list(posts_collection.find(search_filter).sort("_id", -1).skip(skip).limit(limit))
         
-        for post in posts:
-            post_id = str(post["_id"])
-            post["_id"] = post_id
-            if "createdAt" in post:
-                post["createdAt"] = int(post["createdAt"])
-            
-            # Count actual likes from likes collection
-            likes_count = likes_collection.count_documents({"postId": post_id})
-            post["likesCount"] = likes_count
-            
-            # Extract firstName and lastName from userName if not present
-            if "userName" in post and "firstName" not in post:
-                name_parts = post["userName"].split(" ", 1)
-                post["firstName"] = name_parts[0]
-                post["lastName"] = name_parts[1] if len(name_parts) > 1 else ""
+        # Author fields and actual like counts for the whole page in two queries
+        enrich_admin_posts(posts)
         
         return {
             "success": True,
@@ -320,23 +285,12 @@ async def get_pending_posts(skip: int = Query(0, ge=0), limit: int = Query(10, g
             {"verificationStatus": {"$in": ["pending_review", "error"]}}
         ).sort("createdAt", -1).skip(skip).limit(limit))
         
-        # Convert ObjectId to string and enrich with user data and AI analysis
+        # Author name and picture come from the snapshot kept on the post,
+        # with one batched users query for posts that predate it
+        enrich_admin_posts(posts, like_counts=False)
+        
+        # Add AI analysis
         for post in posts:
-            post["_id"] = str(post["_id"])
-            
-            # Get user's profile picture for comparison
-            identifier = post.get("identifier") or post.get("mobile") or post.get("email")
-            if identifier:
-                if '@' in identifier:
-                    user = users_collection.find_one({"email": identifier})
-                else:
-                    user = users_collection.find_one({"mobile": identifier})
-                
-                if user:
-                    post["userProfilePicture"] = user.get("profilePicture")
-                    post["firstName"] = user.get("firstName")
-                    post["lastName"] = user.get("lastName")
-            
             # Add AI analysis summary
             ai_verification = post.get("aiVerification", {})
             face_verification = post.get("faceVerification", {})
@@ -431,7 +385,7 @@ async def delete_post(post_id: str, request: DeletePostRequest):
             raise HTTPException(status_code=404, detail="Post not found")
         
         # Get user identifier before deleting
-        user_identifier = post.get("identifier") or post.get("mobile") or post.get("email")
+        owner_identifier = post.get("identifier") or post.get("mobile") or post.get("email")
         post_caption = post.get("caption", "your post")[:50]  # First 50 chars
         deletion_reason = request.reason or "Violated community guidelines"
         
@@ -440,11 +394,14 @@ async def delete_post(post_id: str, request: DeletePostRequest):
         
         # Delete post
         posts_collection.delete_one({"_id": ObjectId(post_id)})
+        rank_index.record_post_points(owner_identifier, -post.get("ecoPoints", 0), post.get("createdAt", 0))
+        stats_rollup.record_post_change(before=post)
+        achievement_engine.record_post_deleted(owner_identifier)
         
         # Send notification to user with reason
-        if user_identifier:
+        if owner_identifier:
             create_notification(
-                user_id=user_identifier,
+                user_id=owner_identifier,
                 notification_type="post_deleted",
                 title="Post Removed",
                 message=f"Your post \"{post_caption}...\" was removed.\n\nReason: {deletion_reason}",
@@ -455,7 +412,7 @@ async def delete_post(post_id: str, request: DeletePostRequest):
                 }
             )
         
-        logger.info(f"Post {post_id} deleted by admin. Reason: {deletion_reason}. Likes: {likes_deleted.deleted_count}. User notified: {user_identifier}")
+        logger.info(f"Post {post_id} deleted by admin. Reason: {deletion_reason}. Likes: {likes_deleted.deleted_count}. User notified: {owner_identifier}")
         
         return {
             "success": True,
@@ -534,17 +491,18 @@ async def create_eco_location(location: EcoLocation):
         location_data = location.dict()
         result = eco_locations_collection.insert_one(location_data)
         location_id = str(result.inserted_id)
+        refresh_locations({"_id": result.inserted_id})
         
         # Send notification to all users about the new eco-location
         try:
-            all_users = users_collection.find({}, {"mobile": 1, "email": 1})
+            all_users = users_collection.find({}, {"identifier": 1, "mobile": 1, "email": 1})
             notification_count = 0
             
             for user in all_users:
-                user_identifier = user.get("mobile") or user.get("email")
-                if user_identifier:
+                recipient_identifier = user_identifier(user)
+                if recipient_identifier:
                     create_notification(
-                        user_id=user_identifier,
+                        user_id=recipient_identifier,
                         notification_type="new_eco_location",
                         title=f"New Eco-Location: {location.name}",
                         message=f"Discover {location.name} - a new {location.category.replace('-', ' ')} added to the map! Check it out and plan your eco-friendly visit.",
@@ -601,13 +559,15 @@ async def update_eco_location(location_id: str, location: EcoLocationUpdate):
         if not update_data:
             raise HTTPException(status_code=400, detail="No fields to update")
         
-        result = eco_locations_collection.update_one(
+        updated = eco_locations_collection.find_one_and_update(
             {"_id": ObjectId(location_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.matched_count == 0:
+        if updated is None:
             raise HTTPException(status_code=404, detail="Eco-location not found")
+        index_location(updated)
         
         return {
             "success": True,
@@ -625,6 +585,7 @@ async def delete_eco_location(location_id: str):
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Eco-location not found")
+        remove_location(location_id)
         
         logger.info(f"Eco-location {location_id} deleted")
         
@@ -769,27 +730,27 @@ async def approve_post(post_id: str, request: ApprovePostRequest):
         
         # Award eco points to user
         identifier = post.get("identifier") or post.get("mobile") or post.get("email")
+        rank_index.record_post_points(identifier, eco_points - post.get("ecoPoints", 0), post.get("createdAt", 0))
+        stats_rollup.record_post_change(
+            before=post,
+            after={**post, "verificationStatus": "approved", "ecoPoints": eco_points, "co2Offset": co2_offset}
+        )
         if identifier:
-            if '@' in identifier:
-                users_collection.update_one(
-                    {"email": identifier},
-                    {
-                        "$inc": {
-                            "ecoPoints": eco_points,
-                            "totalCO2Offset": co2_offset
-                        }
+            rank_index.record_user_points(identifier, eco_points)
+            updated_user = users_collection.find_one_and_update(
+                {"email": identifier} if '@' in identifier else {"mobile": identifier},
+                {
+                    "$inc": {
+                        "ecoPoints": eco_points,
+                        "totalCO2Offset": co2_offset
                     }
-                )
-            else:
-                users_collection.update_one(
-                    {"mobile": identifier},
-                    {
-                        "$inc": {
-                            "ecoPoints": eco_points,
-                            "totalCO2Offset": co2_offset
-                        }
-                    }
-                )
+                },
+                projection={"ecoPoints": 1},
+                return_document=ReturnDocument.AFTER
+            )
+            # Achievements are evaluated in the background if a threshold was crossed
+            if updated_user:
+                achievement_engine.record_eco_points(identifier, updated_user.get("ecoPoints", 0), eco_points)
             
             # Create notification for user
             create_notification(
@@ -861,6 +822,9 @@ async def reject_post(post_id: str, request: RejectPostRequest):
         
         # Delete the post completely instead of marking as rejected
         posts_collection.delete_one({"_id": ObjectId(post_id)})
+        rank_index.record_post_points(identifier, -post.get("ecoPoints", 0), post.get("createdAt", 0))
+        stats_rollup.record_post_change(before=post)
+        achievement_engine.record_post_deleted(identifier)
         
         # Create notification for user
         if identifier:
@@ -889,30 +853,34 @@ async def reject_post(post_id: str, request: RejectPostRequest):
         raise HTTPException(status_code=500, detail="Failed to reject post")
 
 
+@router.get("/admin/notifications/stats")
+async def get_notification_stats(admin_data: dict = Depends(verify_admin_token)):
+    """Storage metrics for the notifications collection (see utils/notification_retention.py)"""
+    try:
+        from utils.notification_retention import notification_storage_stats
+        
+        return {
+            "success": True,
+            "stats": notification_storage_stats()
+        }
+    except Exception as e:
+        logger.error(f"Error fetching notification stats: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch notification stats")
+
 @router.get("/admin/stats")
 async def get_admin_stats(admin_data: dict = Depends(verify_admin_token)):
-    """Get admin dashboard statistics"""
+    """Get admin dashboard statistics from the pre-aggregated rollups (utils/stats_rollup.py)"""
     try:
-        total_users = users_collection.count_documents({})
-        total_posts = posts_collection.count_documents({})
-        pending_posts = posts_collection.count_documents({
-            "verificationStatus": {"$in": ["pending_review", "error"]}
-        })
-        approved_posts = posts_collection.count_documents({"verificationStatus": "approved"})
-        rejected_posts = posts_collection.count_documents({"verificationStatus": "rejected"})
-        
-        # Calculate total CO2 offset
-        pipeline = [
-            {"$match": {"verificationStatus": "approved"}},
-            {"$group": {
-                "_id": None,
-                "totalCO2": {"$sum": "$co2Offset"},
-                "totalPoints": {"$sum": "$ecoPoints"}
-            }}
-        ]
-        result = list(posts_collection.aggregate(pipeline))
-        total_co2 = result[0]["totalCO2"] if result else 0
-        total_points = result[0]["totalPoints"] if result else 0
+        totals = stats_rollup.get_totals()
+        by_status = totals.get("postsByStatus", {})
+        
+        total_users = totals.get("users", 0)
+        total_posts = totals.get("posts", 0)
+        pending_posts = by_status.get("pending_review", 0) + by_status.get("error", 0)
+        approved_posts = by_status.get("approved", 0)
+        rejected_posts = by_status.get("rejected", 0)
+        total_co2 = totals.get("co2Offset", 0)
+        total_points = totals.get("ecoPoints", 0)
         
         return {
             "success": True,
@@ -943,43 +911,14 @@ async def get_growth_data(months: int = Query(6, ge=1, le=12), admin_data: dict
         start_date = now - timedelta(days=months * 30)
         start_timestamp = start_date.timestamp()
         
-        # Get monthly user registrations
-        user_pipeline = [
-            {"$match": {"createdAt": {"$exists": True}}},
-            {"$project": {
-                "year": {"$year": {"$toDate": {"$multiply": ["$createdAt", 1000]}}},
-                "month": {"$month": {"$toDate": {"$multiply": ["$createdAt", 1000]}}}
-            }},
-            {"$group": {
-                "_id": {"year": "$year", "month": "$month"},
-                "count": {"$sum": 1}
-            }},
-            {"$sort": {"_id.year": 1, "_id.month": 1}}
-        ]
-        
-        # Get monthly post creations (approved posts only)
-        post_pipeline = [
-            {"$match": {
-                "createdAt": {"$exists": True},
-                "verificationStatus": "approved"
-            }},
-            {"$project": {
-                "year": {"$year": {"$toDate": {"$multiply": ["$createdAt", 1000]}}},
-                "month": {"$month": {"$toDate": {"$multiply": ["$createdAt", 1000]}}}
-            }},
-            {"$group": {
-                "_id": {"year": "$year", "month": "$month"},
-                "count": {"$sum": 1}
-            }},
-            {"$sort": {"_id.year": 1, "_id.month": 1}}
-        ]
-        
-        user_results = list(users_collection.aggregate(user_pipeline))
-        post_results = list(posts_collection.aggregate(post_pipeline))
-        
-        # Create a dictionary for easy lookup
-        user_by_month = {f"{r['_id']['year']}-{r['_id']['month']:02d}": r['count'] for r in user_results}
-        post_by_month = {f"{r['_id']['year']}-{r['_id']['month']:02d}": r['count'] for r in post_results}
+        # Sum the daily rollups into months (UTC), starting at the first month shown
+        first_month = now - timedelta(days=(months - 1) * 30)
+        user_by_month = {}
+        post_by_month = {}
+        for day in stats_rollup.get_daily(f"{first_month.year}-{first_month.month:02d}-01"):
+            month_key = day["_id"][:7]
+            user_by_month[month_key] = user_by_month.get(month_key, 0) + day.get("users", 0)
+            post_by_month[month_key] = post_by_month.get(month_key, 0) + day.get("postsByStatus", {}).get("approved", 0)
         
         # Generate data for the last X months
         growth_data = []
@@ -1098,19 +1037,20 @@ async def create_announcement(announcement: AnnouncementPost, admin_data: dict =
         
         result = posts_collection.insert_one(announcement_doc)
         announcement_id = str(result.inserted_id)
+        stats_rollup.record_post_change(after=announcement_doc)
         
         # Send notification to all users
         try:
             # Get all users
-            all_users = users_collection.find({}, {"mobile": 1, "email": 1})
+            all_users = users_collection.find({}, {"identifier": 1, "mobile": 1, "email": 1})
             notification_count = 0
             
             for user in all_users:
-                user_identifier = user.get("mobile") or user.get("email")
-                if user_identifier:
+                recipient_identifier = user_identifier(user)
+                if recipient_identifier:
                     # Create notification for each user
                     create_notification(
-                        user_id=user_identifier,
+                        user_id=recipient_identifier,
                         notification_type="announcement",
                         title=f" New {announcement.postType.title()}: {announcement.title}",
                         message=announcement.description[:100] + ("..." if len(announcement.description) > 100 else ""),
@@ -1254,14 +1194,16 @@ async def update_announcement(
 async def delete_announcement(announcement_id: str, admin_data: dict = Depends(verify_admin_token)):
     """Delete an announcement"""
     try:
-        result = posts_collection.delete_one({
-            "_id": ObjectId(announcement_id),
-            "isAdminPost": True
-        })
+        announcement = posts_collection.find_one_and_delete(
+            {"_id": ObjectId(announcement_id), "isAdminPost": True},
+            projection={"createdAt": 1, "verificationStatus": 1}
+        )
         
-        if result.deleted_count == 0:
+        if announcement is None:
             raise HTTPException(status_code=404, detail="Announcement not found")
         
+        stats_rollup.record_post_change(before=announcement)
+        
         logger.info(f"Announcement {announcement_id} deleted by {admin_data['username']}")
         
         return {
@@ -6,6 +6,7 @@ import logging
 from models import OTPRequest, VerifyOTP, SignupRequest, EmailSignupRequest, LoginRequest, VerifyPinResetOTP
 from database import users_collection, posts_collection, carbon_footprints_collection
 from config import TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE
+from utils import stats_rollup
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -62,6 +63,7 @@ async def signup(request: SignupRequest):
     if user_exists:
         raise HTTPException(status_code=400, detail="Mobile number already registered.")
 
+    user_data["identifier"] = user_data["mobile"]  # Canonical lookup key
     user_data["createdAt"] = time.time()
     user_data["updatedAt"] = time.time()
     user_data["verified"] = True
@@ -70,6 +72,7 @@ async def signup(request: SignupRequest):
 
     try:
         users_collection.insert_one(user_data)
+        stats_rollup.record_user(user_data["createdAt"])
         logger.info(f"User data saved for {user_data['mobile']}")
         return {"success": True, "message": "User registered successfully."}
     except Exception as e:
@@ -95,6 +98,7 @@ async def signup_email(request: EmailSignupRequest):
     if uid_exists:
         raise HTTPException(status_code=400, detail="User already registered.")
 
+    user_data["identifier"] = user_data["email"]  # Canonical lookup key
     user_data["createdAt"] = time.time()
     user_data["updatedAt"] = time.time()
     user_data["verified"] = True
@@ -104,6 +108,7 @@ async def signup_email(request: EmailSignupRequest):
 
     try:
         users_collection.insert_one(user_data)
+        stats_rollup.record_user(user_data["createdAt"])
         logger.info(f"Email user data saved for {user_data['email']}")
         return {"success": True, "message": "User registered successfully."}
     except Exception as e:
@@ -239,7 +244,12 @@ async def delete_account(request: dict):
         # Delete user from database
         users_collection.delete_one({"mobile": mobile})
         
-        # Also delete user's posts and carbon footprint data
+        from utils.rank_index import remove_user
+        remove_user(mobile)
+        stats_rollup.record_user(user.get("createdAt", 0), -1)
+        
+        # Also delete user's posts (out of the stats rollups first) and carbon footprint data
+        stats_rollup.record_posts_deleted({"mobile": mobile})
         posts_collection.delete_many({"mobile": mobile})
         carbon_footprints_collection.delete_many({"mobile": mobile})
         
@@ -1,10 +1,18 @@
 from fastapi import APIRouter, HTTPException, Form, Query, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from database import user_db
+from database import user_db, user_challenges_collection, challenge_checkins_collection
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 import pytz
 from bson import ObjectId
+from pymongo import ReturnDocument
+from utils.identity import find_user, user_identifier
+from utils.ttl_cache import TTLCache
+from utils.achievement_engine import record_eco_points
+from utils.checkins import (
+    new_checkin_fields, ensure_compact, mask_value, day_index, is_checked, checkin_bit,
+    checkin_progress, missed_days as count_missed_days, serialize_check_ins, record_checkin_event, DATE_FORMAT
+)
 from pydantic import BaseModel, Field
 from enum import Enum
 import jwt
@@ -29,7 +37,6 @@ def verify_admin_token(credentials: HTTPAuthorizationCredentials = Depends(secur
 
 # Get collections
 challenges_collection = user_db["challenges"]
-user_challenges_collection = user_db["user_challenges"]
 users_collection = user_db["user_data"]
 notifications_collection = user_db["notifications"]
 
@@ -97,19 +104,10 @@ async def check_and_deactivate_missed_challenges():
             try:
                 user_id = challenge["user_id"]
                 challenge_id = challenge["_id"]
-                check_ins = challenge.get("check_ins", [])
                 allow_one_skip = challenge.get("allow_one_skip", False)
-                missed_days = 0
                 
                 # Count missed days (past dates that weren't checked in)
-                for checkin in check_ins:
-                    try:
-                        checkin_date = datetime.strptime(checkin["date"], "%Y-%m-%d").date()
-                        if checkin_date < today and not checkin.get("checked_in", False):
-                            missed_days += 1
-                    except (ValueError, KeyError) as e:
-                        print(f"DEBUG: Error parsing checkin date: {str(e)}")
-                        continue
+                missed_days = count_missed_days(ensure_compact(challenge), today)
                 
                 # Deactivate if missed more than allowed
                 max_allowed_misses = 1 if allow_one_skip else 0
@@ -126,16 +124,14 @@ async def check_and_deactivate_missed_challenges():
                     
                     # Send notification to user
                     try:
-                        notification = {
-                            "user_id": user_id,
-                            "title": "Challenge Failed",
-                            "message": f"Your challenge '{challenge.get('challenge_title', 'Unknown')}' has been deactivated due to missing {missed_days} days.",
-                            "type": "challenge_failed",
-                            "challenge_id": str(challenge_id),
-                            "created_at": datetime.now(pytz.UTC),
-                            "read": False
-                        }
-                        notifications_collection.insert_one(notification)
+                        from routes.notifications import create_notification
+                        create_notification(
+                            user_id=user_id,
+                            notification_type="challenge_failed",
+                            title="Challenge Failed",
+                            message=f"Your challenge '{challenge.get('challenge_title', 'Unknown')}' has been deactivated due to missing {missed_days} days.",
+                            data={"challenge_id": str(challenge_id)}
+                        )
                     except Exception as e:
                         print(f"DEBUG: Error creating notification: {str(e)}")
                         
@@ -342,24 +338,9 @@ async def accept_challenge(
             print(f"DEBUG: Error checking recent completions: {str(e)}")
             # Continue anyway if there's an error checking completions
         
-        print("DEBUG: Creating check-ins array...")
-        
-        # Create check-ins array starting from today with real calendar dates
-        check_ins = []
+        # Check-ins start today: a bitset over the challenge days plus sparse notes
         start_date = datetime.now(pytz.UTC).date()
         
-        for day in range(challenge["duration_days"]):
-            current_date = start_date + timedelta(days=day)
-            check_ins.append({
-                "day": day + 1,
-                "date": current_date.strftime("%Y-%m-%d"),
-                "checked_in": False,
-                "timestamp": None,
-                "note": None
-            })
-        
-        print(f"DEBUG: Created {len(check_ins)} check-ins")
-        
         # Create user challenge
         user_challenge = {
             "user_id": user_id,
@@ -371,7 +352,7 @@ async def accept_challenge(
             "started_at": datetime.now(pytz.UTC),
             "target_days": challenge["duration_days"],
             "current_streak": 0,
-            "check_ins": check_ins,
+            **new_checkin_fields(start_date, challenge["duration_days"]),
             "completed": False,
             "completed_at": None,
             "reward_points": challenge["reward_points"],
@@ -390,7 +371,7 @@ async def accept_challenge(
         return {
             "success": True,
             "message": "Challenge accepted!",
-            "user_challenge": user_challenge
+            "user_challenge": serialize_check_ins(user_challenge)
         }
         
     except HTTPException:
@@ -429,50 +410,31 @@ async def daily_checkin(
         if user_challenge["status"] not in ["in_progress"]:
             return {"success": False, "message": "Challenge is not active"}
         
-        # Get today's date
-        today = datetime.now(pytz.UTC).date().strftime("%Y-%m-%d")
-        
-        # Find today's check-in
-        check_ins = user_challenge["check_ins"]
-        today_checkin = None
-        today_index = None
-        
-        for i, checkin in enumerate(check_ins):
-            if checkin["date"] == today:
-                today_checkin = checkin
-                today_index = i
-                break
+        # Find today's position in the check-in bitset
+        user_challenge = ensure_compact(user_challenge)
+        today_date = datetime.now(pytz.UTC).date()
+        today_index = day_index(user_challenge, today_date)
         
-        if not today_checkin:
+        if not 0 <= today_index < user_challenge["target_days"]:
             return {"success": False, "message": "No check-in available for today. You may have missed the window."}
         
-        if today_checkin["checked_in"]:
+        mask = mask_value(user_challenge)
+        if is_checked(mask, today_index):
             return {"success": False, "message": "Already checked in today"}
         
-        # Update check-in
-        check_ins[today_index]["checked_in"] = True
-        check_ins[today_index]["timestamp"] = datetime.now(pytz.UTC)
-        check_ins[today_index]["note"] = note if note and note.strip() else None
-        
-        # Calculate current streak and missed days
-        current_streak = 0
-        missed_days = 0
-        today_date = datetime.now(pytz.UTC).date()
-        
-        for checkin in check_ins:
-            checkin_date = datetime.strptime(checkin["date"], "%Y-%m-%d").date()
-            if checkin_date <= today_date:  # Only count up to today
-                if checkin["checked_in"]:
-                    current_streak += 1
-                elif checkin_date < today_date:  # Past dates that weren't checked in
-                    missed_days += 1
+        # Calculate current streak, missed days and completion with today's bit set
+        progress = checkin_progress(user_challenge, mask | (1 << today_index), today_date)
+        current_streak = progress["current_streak"]
+        missed_days = progress["missed_days"]
+        completed = progress["completed"]
         
-        # Check if challenge is completed
-        completed = all(c["checked_in"] for c in check_ins)
+        detail = {"timestamp": datetime.now(pytz.UTC)}
+        if note and note.strip():
+            detail["note"] = note
         
-        # Update user challenge
+        # Update user challenge: set today's bit and its details only
         update_data = {
-            "check_ins": check_ins,
+            f"checkin_details.{today_index + 1}": detail,
             "current_streak": current_streak,
             "completed": completed,
             "missed_days": missed_days
@@ -481,7 +443,18 @@ async def daily_checkin(
         if completed:
             update_data["completed_at"] = datetime.now(pytz.UTC)
             update_data["status"] = "completed"
-            
+        
+        # The bit filter makes a concurrent second check-in for today a no-op
+        mask_field, bit = checkin_bit(today_index)
+        result = user_challenges_collection.update_one(
+            {"_id": ObjectId(user_challenge_id), "status": "in_progress", mask_field: {"$bitsAllClear": bit}},
+            {"$bit": {mask_field: {"or": bit}}, "$set": update_data}
+        )
+        if result.modified_count == 0:
+            return {"success": False, "message": "Already checked in today"}
+        record_checkin_event(user_challenge, today_index, detail)
+        
+        if completed:
             # Send completion notification
             try:
                 from routes.notifications import create_notification
@@ -500,11 +473,6 @@ async def daily_checkin(
             except Exception as e:
                 print(f"Error sending completion notification: {e}")
         
-        user_challenges_collection.update_one(
-            {"_id": ObjectId(user_challenge_id)},
-            {"$set": update_data}
-        )
-        
         response = {
             "success": True,
             "message": "Checked in successfully! ",
@@ -548,6 +516,7 @@ async def get_my_challenges(user_id: str):
                 challenge["completed_at"] = challenge["completed_at"].isoformat()
             if "failed_at" in challenge and challenge["failed_at"]:
                 challenge["failed_at"] = challenge["failed_at"].isoformat()
+            serialize_check_ins(challenge)
             if "check_ins" in challenge:
                 for checkin in challenge["check_ins"]:
                     if checkin.get("timestamp") and checkin["timestamp"]:
@@ -597,7 +566,7 @@ async def claim_reward(
         print(f"DEBUG: Claiming reward for user_id={user_id}, reward_points={reward_points}")
         
         # Find the user first to check if ecoPoints field exists
-        user = users_collection.find_one({"$or": [{"mobile": user_id}, {"email": user_id}]})
+        user = find_user(user_id)
         
         if not user:
             print(f"DEBUG: User not found with identifier: {user_id}")
@@ -612,18 +581,20 @@ async def claim_reward(
             )
         
         # Now increment the points
-        user_update_result = users_collection.update_one(
+        updated_user = users_collection.find_one_and_update(
             {"_id": user["_id"]},
-            {"$inc": {"ecoPoints": reward_points}}
+            {"$inc": {"ecoPoints": reward_points}},
+            projection={"ecoPoints": 1},
+            return_document=ReturnDocument.AFTER
         )
         
-        # Debug: Log the update result
-        print(f"DEBUG: Update result - matched_count={user_update_result.matched_count}, modified_count={user_update_result.modified_count}")
-        
-        if user_update_result.matched_count == 0:
+        if updated_user is None:
             print(f"DEBUG: Failed to update user points")
             raise HTTPException(status_code=500, detail="Failed to update user points")
         
+        from utils.rank_index import record_user_points
+        record_user_points(user_identifier(user), reward_points)
+        
         # Mark reward as claimed
         user_challenges_collection.update_one(
             {"_id": ObjectId(user_challenge_id)},
@@ -634,13 +605,8 @@ async def claim_reward(
             }}
         )
         
-        # Check for new achievements after awarding points
-        try:
-            from routes.achievements import check_and_award_achievements
-            await check_and_award_achievements(user_id)
-            print(f"DEBUG: Checked achievements for user {user_id}")
-        except Exception as e:
-            print(f"WARNING: Failed to check achievements: {e}")
+        # Achievements are evaluated in the background if a threshold was crossed
+        record_eco_points(user_identifier(user), updated_user.get("ecoPoints", 0), reward_points)
         
         print(f"DEBUG: Successfully claimed reward - {reward_points} points added to user {user_id}")
         
@@ -749,13 +715,11 @@ async def list_challenges(
         challenges_cursor = challenges_collection.find(filter_query).sort(sort_field, sort_direction).skip(skip).limit(limit)
         challenges = list(challenges_cursor)
         
-        # Add statistics for each challenge
+        # Add participation statistics for the whole page at once
+        page_stats = get_challenges_statistics([c["challenge_id"] for c in challenges])
         for challenge in challenges:
             challenge["_id"] = str(challenge["_id"])
-            
-            # Get participation stats
-            stats = await get_challenge_statistics(challenge["challenge_id"])
-            challenge["stats"] = stats
+            challenge["stats"] = page_stats.get(challenge["challenge_id"], _empty_statistics())
         
         return {
             "success": True,
@@ -806,6 +770,7 @@ async def create_challenge(
         
         result = challenges_collection.insert_one(challenge_doc)
         challenge_doc["_id"] = str(result.inserted_id)
+        invalidate_challenge_catalog()
         
         # Notify all users about new challenge
         try:
@@ -884,29 +849,15 @@ async def get_challenge_analytics(admin_data: dict = Depends(verify_admin_token)
         
         challenge_performance = list(user_challenges_collection.aggregate(challenge_performance_pipeline))
         
-        # Add challenge titles
+        # Add challenge titles from the cached catalog
+        catalog = get_challenge_catalog()
         for perf in challenge_performance:
-            challenge = challenges_collection.find_one({"challenge_id": perf["_id"]}, {"title": 1, "icon": 1})
-            if challenge:
-                perf["title"] = challenge.get("title", perf["_id"])
-                perf["icon"] = challenge.get("icon", "🎯")
-            else:
-                perf["title"] = perf["_id"]
-                perf["icon"] = "🎯"
-        
-        # Daily activity (last 30 days)
-        daily_activity = {}
-        for i in range(30):
-            date = (datetime.now(pytz.UTC) - timedelta(days=i)).strftime("%Y-%m-%d")
-            checkins = user_challenges_collection.count_documents({
-                "check_ins": {
-                    "$elemMatch": {
-                        "date": date,
-                        "checked_in": True
-                    }
-                }
-            })
-            daily_activity[date] = checkins
+            entry = catalog.get(perf["_id"], {})
+            perf["title"] = entry.get("title", perf["_id"])
+            perf["icon"] = entry.get("icon", "🎯")
+        
+        # Daily activity (last 30 days) in a single pipeline
+        daily_activity = daily_checkin_counts(30)["all"]
         
         return {
             "success": True,
@@ -1054,6 +1005,7 @@ async def update_challenge(challenge_id: str, challenge_update: ChallengeUpdate)
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Challenge not found")
+        invalidate_challenge_catalog()
         
         # Get updated challenge
         updated_challenge = challenges_collection.find_one({"challenge_id": challenge_id})
@@ -1101,6 +1053,7 @@ async def delete_challenge(challenge_id: str):
             # Hard delete if no active participants
             challenges_collection.delete_one({"challenge_id": challenge_id})
             message = "Challenge deleted permanently"
+        invalidate_challenge_catalog()
         
         return {
             "success": True,
@@ -1128,6 +1081,7 @@ async def toggle_challenge_status(challenge_id: str, active: bool = Query(...)):
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Challenge not found")
+        invalidate_challenge_catalog()
         
         status_text = "activated" if active else "deactivated"
         return {
@@ -1140,79 +1094,123 @@ async def toggle_challenge_status(challenge_id: str, active: bool = Query(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error toggling challenge status: {str(e)}")
 
+# Challenge titles/icons for analytics, reloaded at most every 5 minutes or after admin edits
+_challenge_catalog_cache = TTLCache(maxsize=1, ttl=300)
+
+def get_challenge_catalog() -> Dict[str, Dict[str, str]]:
+    """challenge_id -> {title, icon} for every challenge"""
+    catalog = _challenge_catalog_cache.get("catalog")
+    if catalog is None:
+        catalog = {
+            c["challenge_id"]: {"title": c.get("title", c["challenge_id"]), "icon": c.get("icon", "🎯")}
+            for c in challenges_collection.find({}, {"challenge_id": 1, "title": 1, "icon": 1})
+            if c.get("challenge_id")
+        }
+        _challenge_catalog_cache.set("catalog", catalog)
+    return catalog
+
+def invalidate_challenge_catalog():
+    _challenge_catalog_cache.clear()
+
+def daily_checkin_counts(days: int, challenge_ids: List[str] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Number of check-ins on each of the last `days` UTC days, from a range scan
+    of the challenge_checkins event log: {challenge_id or "all": {date: count}}
+    """
+    today = datetime.now(pytz.UTC)
+    dates = [(today - timedelta(days=i)).strftime(DATE_FORMAT) for i in range(days)]
+    
+    match = {"date": {"$gte": dates[-1], "$lte": dates[0]}}
+    if challenge_ids is not None:
+        match["challenge_id"] = {"$in": challenge_ids}
+    group_key = "$challenge_id" if challenge_ids is not None else "all"
+    
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": {"key": group_key, "date": "$date"}, "count": {"$sum": 1}}}
+    ]
+    
+    keys = challenge_ids if challenge_ids is not None else ["all"]
+    counts = {key: {date: 0 for date in dates} for key in keys}
+    for row in challenge_checkins_collection.aggregate(pipeline):
+        counts[row["_id"]["key"]][row["_id"]["date"]] = row["count"]
+    return counts
+
+def _empty_statistics() -> Dict[str, Any]:
+    return {
+        "total_participants": 0,
+        "active_participants": 0,
+        "completed_participants": 0,
+        "completion_rate": 0,
+        "avg_streak": 0,
+        "total_points_awarded": 0,
+        "avg_completion_time": 0,
+        "daily_participation": {}
+    }
+
+def get_challenges_statistics(challenge_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Participation statistics for many challenges with one $group and one check-in pipeline"""
+    if not challenge_ids:
+        return {}
+    
+    is_completed = {"$in": ["$status", ["completed", "claimed"]]}
+    has_streak = {"$gt": [{"$ifNull": ["$current_streak", 0]}, 0]}
+    has_duration = {"$and": [
+        is_completed,
+        {"$eq": [{"$type": "$started_at"}, "date"]},
+        {"$eq": [{"$type": "$completed_at"}, "date"]}
+    ]}
+    
+    pipeline = [
+        {"$match": {"challenge_id": {"$in": challenge_ids}}},
+        {"$group": {
+            "_id": "$challenge_id",
+            "total": {"$sum": 1},
+            "active": {"$sum": {"$cond": [{"$eq": ["$status", "in_progress"]}, 1, 0]}},
+            "completed": {"$sum": {"$cond": [is_completed, 1, 0]}},
+            "streak_total": {"$sum": {"$cond": [has_streak, "$current_streak", 0]}},
+            "streak_count": {"$sum": {"$cond": [has_streak, 1, 0]}},
+            "points": {"$sum": {"$cond": [
+                {"$and": [{"$eq": ["$status", "claimed"]}, {"$eq": ["$reward_claimed", True]}]},
+                {"$ifNull": ["$reward_points", 0]},
+                0
+            ]}},
+            "duration_days_total": {"$sum": {"$cond": [
+                has_duration,
+                {"$floor": {"$divide": [{"$subtract": ["$completed_at", "$started_at"]}, 86400000]}},
+                0
+            ]}},
+            "duration_count": {"$sum": {"$cond": [has_duration, 1, 0]}}
+        }}
+    ]
+    
+    daily = daily_checkin_counts(7, challenge_ids)
+    statistics = {challenge_id: _empty_statistics() for challenge_id in challenge_ids}
+    for challenge_id in challenge_ids:
+        statistics[challenge_id]["daily_participation"] = daily.get(challenge_id, {})
+    
+    for row in user_challenges_collection.aggregate(pipeline):
+        total = row["total"]
+        statistics[row["_id"]].update({
+            "total_participants": total,
+            "active_participants": row["active"],
+            "completed_participants": row["completed"],
+            "completion_rate": round(row["completed"] / total * 100, 1) if total > 0 else 0,
+            "avg_streak": round(row["streak_total"] / row["streak_count"], 1) if row["streak_count"] else 0,
+            "total_points_awarded": row["points"],
+            "avg_completion_time": round(row["duration_days_total"] / row["duration_count"], 1) if row["duration_count"] else 0
+        })
+    
+    return statistics
+
 # Get challenge statistics
 async def get_challenge_statistics(challenge_id: str) -> Dict[str, Any]:
     """Get detailed statistics for a challenge"""
     try:
-        # Get all user challenges for this challenge
-        user_challenges = list(user_challenges_collection.find({"challenge_id": challenge_id}))
-        
-        total_participants = len(user_challenges)
-        active_participants = len([uc for uc in user_challenges if uc.get("status") == "in_progress"])
-        completed_participants = len([uc for uc in user_challenges if uc.get("status") in ["completed", "claimed"]])
-        
-        completion_rate = (completed_participants / total_participants * 100) if total_participants > 0 else 0
-        
-        # Calculate average streak
-        streaks = [uc.get("current_streak", 0) for uc in user_challenges if uc.get("current_streak", 0) > 0]
-        avg_streak = sum(streaks) / len(streaks) if streaks else 0
-        
-        # Calculate total points awarded
-        total_points_awarded = sum([
-            uc.get("reward_points", 0) for uc in user_challenges 
-            if uc.get("status") == "claimed" and uc.get("reward_claimed", False)
-        ])
-        
-        # Calculate average completion time (for completed challenges)
-        completion_times = []
-        for uc in user_challenges:
-            if uc.get("status") in ["completed", "claimed"] and uc.get("started_at") and uc.get("completed_at"):
-                start_time = uc["started_at"]
-                end_time = uc.get("completed_at") or uc.get("claimed_at")
-                if end_time:
-                    duration = (end_time - start_time).days
-                    completion_times.append(duration)
-        
-        avg_completion_time = sum(completion_times) / len(completion_times) if completion_times else 0
-        
-        # Daily participation (last 7 days)
-        daily_participation = {}
-        for i in range(7):
-            date = (datetime.now(pytz.UTC) - timedelta(days=i)).strftime("%Y-%m-%d")
-            count = user_challenges_collection.count_documents({
-                "challenge_id": challenge_id,
-                "check_ins": {
-                    "$elemMatch": {
-                        "date": date,
-                        "checked_in": True
-                    }
-                }
-            })
-            daily_participation[date] = count
-        
-        return {
-            "total_participants": total_participants,
-            "active_participants": active_participants,
-            "completed_participants": completed_participants,
-            "completion_rate": round(completion_rate, 1),
-            "avg_streak": round(avg_streak, 1),
-            "total_points_awarded": total_points_awarded,
-            "avg_completion_time": round(avg_completion_time, 1),
-            "daily_participation": daily_participation
-        }
-        
+        return get_challenges_statistics([challenge_id])[challenge_id]
     except Exception as e:
         print(f"Error calculating challenge statistics: {str(e)}")
-        return {
-            "total_participants": 0,
-            "active_participants": 0,
-            "completed_participants": 0,
-            "completion_rate": 0,
-            "avg_streak": 0,
-            "total_points_awarded": 0,
-            "avg_completion_time": 0,
-            "daily_participation": {}
-        }
+        return _empty_statistics()
 
 # Get challenge participants
 @router.get("/admin/challenges/{challenge_id}/participants")
@@ -1371,51 +1369,44 @@ async def unlock_challenge_for_all_users(
 ):
     """Unlock a challenge for all users who have completed it (reset cooldown for everyone)"""
     try:
-        # Find all users who have completed/claimed this challenge
-        completed_challenges = user_challenges_collection.find({
+        completed_filter = {
             "challenge_id": challenge_id,
             "status": {"$in": ["completed", "claimed"]}
-        })
+        }
+        
+        # Users to notify, read before the update changes nothing they match on
+        user_ids = user_challenges_collection.distinct("user_id", completed_filter)
         
+        # Move existing claimed_at/completed_at 8 days back (past the 7-day cooldown) in one update
         past_date = datetime.now(pytz.UTC) - timedelta(days=8)
-        unlock_count = 0
-        
-        for user_challenge in completed_challenges:
-            update_data = {}
-            if user_challenge.get("claimed_at"):
-                update_data["claimed_at"] = past_date
-            if user_challenge.get("completed_at"):
-                update_data["completed_at"] = past_date
-            
-            update_data["unlocked_by_admin"] = True
-            update_data["unlocked_at"] = datetime.now(pytz.UTC)
-            update_data["unlocked_by"] = admin_data.get("username", "admin")
+        def backdate(field):
+            return {"$cond": [{"$ifNull": ["$" + field, False]}, past_date, "$" + field]}
+        
+        result = user_challenges_collection.update_many(completed_filter, [{"$set": {
+            "claimed_at": backdate("claimed_at"),
+            "completed_at": backdate("completed_at"),
+            "unlocked_by_admin": True,
+            "unlocked_at": datetime.now(pytz.UTC),
+            "unlocked_by": admin_data.get("username", "admin")
+        }}])
+        unlock_count = result.modified_count
+        
+        # Notify every affected user with one bulk insert
+        try:
+            from routes.notifications import create_notifications
             
-            user_challenges_collection.update_one(
-                {"_id": user_challenge["_id"]},
-                {"$set": update_data}
+            challenge_title = get_challenge_catalog().get(challenge_id, {}).get("title", "Challenge")
+            create_notifications(
+                user_ids,
+                notification_type="challenge_unlocked",
+                title="Challenge Unlocked! 🔓",
+                message=f"Admin has unlocked '{challenge_title}'. You can now restart this challenge!",
+                data={
+                    "challenge_id": challenge_id
+                }
             )
-            
-            unlock_count += 1
-            
-            # Send notification to each user
-            try:
-                from routes.notifications import create_notification
-                
-                challenge = challenges_collection.find_one({"challenge_id": challenge_id})
-                challenge_title = challenge.get("title", "Challenge") if challenge else "Challenge"
-                
-                create_notification(
-                    user_id=user_challenge["user_id"],
-                    notification_type="challenge_unlocked",
-                    title="Challenge Unlocked! 🔓",
-                    message=f"Admin has unlocked '{challenge_title}'. You can now restart this challenge!",
-                    data={
-                        "challenge_id": challenge_id
-                    }
-                )
-            except Exception as e:
-                print(f"Error sending unlock notification to {user_challenge['user_id']}: {e}")
+        except Exception as e:
+            print(f"Error sending unlock notifications: {e}")
         
         return {
             "success": True,
@@ -3,7 +3,13 @@ from database import eco_locations_collection
 from models import EcoLocationCreate, EcoLocationUpdate
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 from typing import Optional
+from config import ECO_LOCATION_INDEX_ENABLED
+from utils.nearby_locations import (
+    find_nearby, locations_in_city, refresh_locations, index_location, remove_location, locations_in_viewport,
+    cluster_locations, CLUSTER_MAX_ZOOM
+)
 
 router = APIRouter()
 
@@ -11,10 +17,14 @@ router = APIRouter()
 async def get_eco_locations(
     city: Optional[str] = Query(None, description="Filter by city (Kathmandu, Bhaktapur, Lalitpur)"),
     category: Optional[str] = Query(None, description="Filter by category"),
-    status: Optional[str] = Query(None, description="Filter by status (for events)")
+    status: Optional[str] = Query(None, description="Filter by status (for events)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (default: all)"),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size (default: all matches)")
 ):
     """
     Get all eco-locations with optional filtering
+    Event statuses are kept current by the scheduled lifecycle job (utils/event_lifecycle.py)
     """
     try:
         # Build query filter
@@ -29,29 +39,33 @@ async def get_eco_locations(
         if status:
             query_filter["status"] = status
         
-        # Fetch locations from database
-        locations = list(eco_locations_collection.find(query_filter))
-        
-        # Convert ObjectId to string
-        for location in locations:
-            if "_id" in location:
-                location["_id"] = str(location["_id"])
-        
-        # Auto-update event status for plantation events
-        current_date = datetime.now().date()
-        for location in locations:
-            if location.get("category") == "plantation_event" and location.get("eventDate"):
-                try:
-                    event_date = datetime.fromisoformat(location["eventDate"].replace('Z', '+00:00')).date()
-                    if event_date < current_date and location.get("status") != "completed":
-                        # Update status in database
-                        eco_locations_collection.update_one(
-                            {"name": location["name"], "city": location["city"]},
-                            {"$set": {"status": "completed"}}
-                        )
-                        location["status"] = "completed"
-                except:
-                    pass
+        projection = None
+        if fields:
+            projection = {field.strip(): 1 for field in fields.split(",") if field.strip()}
+        
+        if city and ECO_LOCATION_INDEX_ENABLED:
+            # Served from the in-process index (kept current by admin writes and the lifecycle job)
+            locations = [
+                location for location in locations_in_city(city, category)
+                if not status or location.get("status") == status
+            ]
+            locations = locations[skip:skip + limit] if limit else locations[skip:]
+            if projection:
+                locations = [
+                    {field: value for field, value in location.items() if field == "_id" or field in projection}
+                    for location in locations
+                ]
+        else:
+            # Fetch locations from database, in _id order so pages are stable
+            cursor = eco_locations_collection.find(query_filter, projection).sort("_id", 1).skip(skip)
+            if limit:
+                cursor = cursor.limit(limit)
+            locations = list(cursor)
+            
+            # Convert ObjectId to string
+            for location in locations:
+                if "_id" in location:
+                    location["_id"] = str(location["_id"])
         
         return {
             "success": True,
@@ -65,71 +79,61 @@ async def get_eco_locations(
 
 @router.get("/eco-locations/nearby")
 async def get_nearby_locations(
-    lat: float = Query(..., description="User's latitude"),
-    lng: float = Query(..., description="User's longitude"),
-    radius: int = Query(10, description="Search radius in kilometers"),
-    category: Optional[str] = Query(None, description="Filter by category")
+    lat: float = Query(..., ge=-90, le=90, description="User's latitude"),
+    lng: float = Query(..., ge=-180, le=180, description="User's longitude"),
+    radius: int = Query(10, ge=1, le=50, description="Search radius in kilometers"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200)
 ):
     """
-    Get eco-locations near user's coordinates using geospatial query
+    Get eco-locations near user's coordinates, nearest first
+    Candidates come from a per-tile cache of geospatial queries (utils/nearby_locations.py)
     """
     try:
-        # Build query filter
-        query_filter = {
-            "location": {
-                "$near": {
-                    "$geometry": {
-                        "type": "Point",
-                        "coordinates": [lng, lat]  # GeoJSON uses [longitude, latitude]
-                    },
-                    "$maxDistance": radius * 1000  # Convert km to meters
-                }
-            }
-        }
+        locations = find_nearby(lat, lng, radius, category)
+        page = locations[skip:skip + limit]
         
-        if category:
-            query_filter["category"] = category
-        
-        # Fetch nearby locations
-        locations = list(eco_locations_collection.find(query_filter))
-        
-        # Convert ObjectId to string
-        for location in locations:
-            if "_id" in location:
-                location["_id"] = str(location["_id"])
-        
-        # Calculate distances for each location
-        from math import radians, sin, cos, sqrt, atan2
-        
-        def calculate_distance(lat1, lon1, lat2, lon2):
-            """Calculate distance using Haversine formula"""
-            R = 6371  # Earth's radius in kilometers
-            
-            lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-            dlat = lat2 - lat1
-            dlon = lon2 - lon1
-            
-            a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-            c = 2 * atan2(sqrt(a), sqrt(1-a))
-            distance = R * c
-            
-            return round(distance, 2)
-        
-        # Add distance to each location
-        for location in locations:
-            loc_lat = location.get("latitude")
-            loc_lng = location.get("longitude")
-            if loc_lat and loc_lng:
-                distance = calculate_distance(lat, lng, loc_lat, loc_lng)
-                location["distance"] = distance
+        return {
+            "success": True,
+            "count": len(page),
+            "total": len(locations),
+            "skip": skip,
+            "limit": limit,
+            "locations": page
+        }
         
-        # Sort by distance
-        locations.sort(key=lambda x: x.get("distance", float('inf')))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/eco-locations/viewport")
+async def get_viewport_locations(
+    sw_lat: float = Query(..., ge=-90, le=90, description="South-west corner latitude"),
+    sw_lng: float = Query(..., ge=-180, le=180, description="South-west corner longitude"),
+    ne_lat: float = Query(..., ge=-90, le=90, description="North-east corner latitude"),
+    ne_lng: float = Query(..., ge=-180, le=180, description="North-east corner longitude"),
+    zoom: int = Query(..., ge=0, le=22, description="Map zoom level"),
+    category: Optional[str] = Query(None, description="Filter by category")
+):
+    """
+    Get map pins inside the visible map area
+    Below CLUSTER_MAX_ZOOM nearby pins are merged into cluster markers.
+    """
+    if sw_lat > ne_lat or sw_lng > ne_lng:
+        raise HTTPException(status_code=400, detail="South-west corner must be below and left of the north-east corner")
+    
+    try:
+        pins = locations_in_viewport(sw_lat, sw_lng, ne_lat, ne_lng, category)
+        clustered = zoom < CLUSTER_MAX_ZOOM
+        markers = cluster_locations(pins, zoom) if clustered else [{"type": "location", **pin} for pin in pins]
         
         return {
             "success": True,
-            "count": len(locations),
-            "locations": locations
+            "clustered": clustered,
+            "total": len(pins),
+            "count": len(markers),
+            "markers": markers
         }
         
     except Exception as e:
@@ -217,6 +221,7 @@ async def add_eco_location(location: EcoLocationCreate):
         
         # Insert into database
         result = eco_locations_collection.insert_one(location_doc)
+        refresh_locations({"_id": result.inserted_id})
         
         return {
             "success": True,
@@ -288,21 +293,18 @@ async def update_eco_location(location_id: str, location: EcoLocationUpdate):
         # Add updated timestamp
         update_doc["updatedAt"] = int(datetime.now().timestamp())
         
-        # Update in database
-        try:
-            result = eco_locations_collection.update_one(
-                {"_id": ObjectId(location_id)},
-                {"$set": update_doc}
-            )
-        except:
-            # Try by name if ObjectId fails
-            result = eco_locations_collection.update_one(
-                {"name": location_id},
-                {"$set": update_doc}
-            )
+        # Update in database (by name if location_id is not an ObjectId)
+        location_filter = {"_id": ObjectId(location_id)} if ObjectId.is_valid(location_id) else {"name": location_id}
+        # The updated document goes straight into the index: re-running a name filter misses a rename
+        updated = eco_locations_collection.find_one_and_update(
+            location_filter,
+            {"$set": update_doc},
+            return_document=ReturnDocument.AFTER
+        )
         
-        if result.matched_count == 0:
+        if updated is None:
             raise HTTPException(status_code=404, detail="Location not found")
+        index_location(updated)
         
         return {
             "success": True,
@@ -323,15 +325,13 @@ async def delete_eco_location(location_id: str):
     Admin endpoint to delete an eco-location
     """
     try:
-        # Try to delete by ObjectId first
-        try:
-            result = eco_locations_collection.delete_one({"_id": ObjectId(location_id)})
-        except:
-            # Try by name if ObjectId fails
-            result = eco_locations_collection.delete_one({"name": location_id})
+        # Delete by ObjectId, or by name if location_id is not an ObjectId
+        location_filter = {"_id": ObjectId(location_id)} if ObjectId.is_valid(location_id) else {"name": location_id}
+        deleted = eco_locations_collection.find_one_and_delete(location_filter, projection={"_id": 1})
         
-        if result.deleted_count == 0:
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Location not found")
+        remove_location(deleted["_id"])
         
         return {
             "success": True,
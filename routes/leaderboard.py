@@ -1,5 +1,7 @@
 from fastapi import APIRouter, HTTPException, Query
 from database import users_collection, posts_collection
+from utils.identity import find_user
+from utils.rank_index import count_users_ahead, count_ranked_users
 from typing import Optional
 from datetime import datetime, timedelta
 
@@ -145,18 +147,16 @@ async def get_user_rank(identifier: str, period: Optional[str] = Query("all", re
     """
     Get a specific user's rank and stats in the leaderboard
     
+    The user's own points are read fresh; the number of users ahead comes
+    from the rank index in utils/rank_index.py.
+    
     Parameters:
     - identifier: User's mobile or email
     - period: Filter by time period (week, month, all)
     """
     try:
         # Get user info
-        user = users_collection.find_one({
-            "$or": [
-                {"mobile": identifier},
-                {"email": identifier}
-            ]
-        })
+        user = find_user(identifier)
         
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
@@ -167,9 +167,8 @@ async def get_user_rank(identifier: str, period: Optional[str] = Query("all", re
             co2_offset = user.get("totalCO2Offset", 0)
             post_count = posts_collection.count_documents({"identifier": identifier})
             
-            # Count users with more points
-            users_ahead = users_collection.count_documents({"ecoPoints": {"$gt": eco_points}})
-            rank = users_ahead + 1
+            # Count users with more points (in-memory rank index, O(log n))
+            rank = count_users_ahead("all", eco_points) + 1
             
             return {
                 "success": True,
@@ -207,30 +206,9 @@ async def get_user_rank(identifier: str, period: Optional[str] = Query("all", re
         
         user_data = list(posts_collection.aggregate(user_pipeline))
         
-        # If user has no posts in this period, they have 0 points
+        # If user has no posts in this period, they have 0 points and rank after everyone with posts
         if not user_data:
-            # Count total users with posts in this period
-            base_filter = {}
-            if period == "week":
-                week_ago = datetime.now() - timedelta(days=7)
-                base_filter = {"createdAt": {"$gte": int(week_ago.timestamp())}}
-            elif period == "month":
-                month_ago = datetime.now() - timedelta(days=30)
-                base_filter = {"createdAt": {"$gte": int(month_ago.timestamp())}}
-            
-            users_with_points_pipeline = [
-                {"$match": base_filter},
-                {
-                    "$group": {
-                        "_id": "$identifier",
-                        "totalEcoPoints": {"$sum": "$ecoPoints"}
-                    }
-                },
-                {"$count": "total"}
-            ]
-            
-            users_with_points = list(posts_collection.aggregate(users_with_points_pipeline))
-            rank = users_with_points[0]["total"] + 1 if users_with_points else 1
+            rank = count_ranked_users(period) + 1
             
             return {
                 "success": True,
@@ -247,32 +225,7 @@ async def get_user_rank(identifier: str, period: Optional[str] = Query("all", re
         user_points = user_data[0]["totalEcoPoints"]
         
         # Count how many users have more points (to determine rank)
-        base_filter = {}
-        if period == "week":
-            week_ago = datetime.now() - timedelta(days=7)
-            base_filter = {"createdAt": {"$gte": int(week_ago.timestamp())}}
-        elif period == "month":
-            month_ago = datetime.now() - timedelta(days=30)
-            base_filter = {"createdAt": {"$gte": int(month_ago.timestamp())}}
-        
-        rank_pipeline = [
-            {"$match": base_filter},
-            {
-                "$group": {
-                    "_id": "$identifier",
-                    "totalEcoPoints": {"$sum": "$ecoPoints"}
-                }
-            },
-            {
-                "$match": {
-                    "totalEcoPoints": {"$gt": user_points}
-                }
-            },
-            {"$count": "usersAhead"}
-        ]
-        
-        rank_result = list(posts_collection.aggregate(rank_pipeline))
-        rank = rank_result[0]["usersAhead"] + 1 if rank_result else 1
+        rank = count_users_ahead(period, user_points) + 1
         
         return {
             "success": True,
@@ -1,8 +1,26 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from bson import ObjectId
+import asyncio
+import json
 import time
 import logging
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from database import notifications_collection, users_collection
+from config import LIKE_NOTIFICATION_WINDOW_SECONDS
+from utils.notification_retention import read_expiry
+from utils.unread_counter import adjust_unread, adjust_unread_many, get_unread
+from utils.notification_hub import notification_hub, publish_notification, PRIVATE_DATA_FIELDS
+
+# Seconds between keep-alive comments on idle notification streams
+STREAM_HEARTBEAT_SECONDS = 25
+
+# Likers kept on a coalesced like notification so unlikes can be taken back out
+RECENT_LIKERS = 10
+
+# Projection keeping server-side notification data (e.g. likers' identifiers) out of responses
+PUBLIC_PROJECTION = {f"data.{field}": 0 for field in PRIVATE_DATA_FIELDS}
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -25,7 +43,7 @@ async def get_notifications(
         
         # Get notifications
         notifications = list(
-            notifications_collection.find(query)
+            notifications_collection.find(query, PUBLIC_PROJECTION)
             .sort("createdAt", -1)
             .skip(skip)
             .limit(limit)
@@ -35,11 +53,8 @@ async def get_notifications(
         for notification in notifications:
             notification["_id"] = str(notification["_id"])
         
-        # Get unread count
-        unread_count = notifications_collection.count_documents({
-            "userId": identifier,
-            "read": False
-        })
+        # Get unread count from the per-user counter
+        unread_count = get_unread(identifier)
         
         return {
             "success": True,
@@ -52,18 +67,58 @@ async def get_notifications(
         logger.error(f"Error fetching notifications: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch notifications")
 
+@router.get("/notifications/{identifier}/stream")
+async def stream_notifications(identifier: str, request: Request):
+    """
+    Server-Sent Events stream of a user's notifications
+
+    Sends the current unread count on connect, then an "unread" event whenever
+    the badge changes and a "notification" event for each new notification.
+    Clients that cannot hold a stream keep polling the endpoints above.
+    """
+    queue = notification_hub.subscribe(identifier)
+    
+    async def events():
+        try:
+            unread = await asyncio.to_thread(get_unread, identifier)
+            yield f"event: unread\ndata: {json.dumps({'unreadCount': unread})}\n\n"
+            
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                payload = {k: v for k, v in event.items() if k != "event"}
+                yield f"event: {event['event']}\ndata: {json.dumps(payload, default=str)}\n\n"
+        finally:
+            notification_hub.unsubscribe(identifier, queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.put("/notifications/{notification_id}/read")
 async def mark_notification_as_read(notification_id: str):
     """Mark a notification as read"""
     try:
-        result = notifications_collection.update_one(
+        # expireAt lets the TTL index remove it NOTIFICATION_READ_TTL_DAYS after reading
+        previous = notifications_collection.find_one_and_update(
             {"_id": ObjectId(notification_id)},
-            {"$set": {"read": True, "readAt": time.time()}}
+            {"$set": {"read": True, "readAt": time.time(), "expireAt": read_expiry()}},
+            projection={"userId": 1, "read": 1},
+            return_document=ReturnDocument.BEFORE
         )
         
-        if result.matched_count == 0:
+        if previous is None:
             raise HTTPException(status_code=404, detail="Notification not found")
         
+        if not previous.get("read"):
+            adjust_unread(previous.get("userId"), -1)
+        
         return {
             "success": True,
             "message": "Notification marked as read"
@@ -79,8 +134,9 @@ async def mark_all_as_read(identifier: str):
     try:
         result = notifications_collection.update_many(
             {"userId": identifier, "read": False},
-            {"$set": {"read": True, "readAt": time.time()}}
+            {"$set": {"read": True, "readAt": time.time(), "expireAt": read_expiry()}}
         )
+        adjust_unread(identifier, -result.modified_count)
         
         return {
             "success": True,
@@ -95,11 +151,17 @@ async def mark_all_as_read(identifier: str):
 async def delete_notification(notification_id: str):
     """Delete a notification"""
     try:
-        result = notifications_collection.delete_one({"_id": ObjectId(notification_id)})
+        deleted = notifications_collection.find_one_and_delete(
+            {"_id": ObjectId(notification_id)},
+            projection={"userId": 1, "read": 1}
+        )
         
-        if result.deleted_count == 0:
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Notification not found")
         
+        if not deleted.get("read"):
+            adjust_unread(deleted.get("userId"), -1)
+        
         return {
             "success": True,
             "message": "Notification deleted"
@@ -113,11 +175,14 @@ async def delete_notification(notification_id: str):
 async def clear_all_notifications(identifier: str):
     """Delete all notifications for a user"""
     try:
-        result = notifications_collection.delete_many({"userId": identifier})
+        # Unread ones separately so the counter drops by exactly what was removed
+        unread_deleted = notifications_collection.delete_many({"userId": identifier, "read": False}).deleted_count
+        read_deleted = notifications_collection.delete_many({"userId": identifier}).deleted_count
+        adjust_unread(identifier, -unread_deleted)
         
         return {
             "success": True,
-            "message": f"Deleted {result.deleted_count} notifications"
+            "message": f"Deleted {unread_deleted + read_deleted} notifications"
         }
         
     except Exception as e:
@@ -128,10 +193,7 @@ async def clear_all_notifications(identifier: str):
 async def get_unread_count(identifier: str):
     """Get count of unread notifications"""
     try:
-        count = notifications_collection.count_documents({
-            "userId": identifier,
-            "read": False
-        })
+        count = get_unread(identifier)
         
         return {
             "success": True,
@@ -167,6 +229,8 @@ def create_notification(
         }
         
         result = notifications_collection.insert_one(notification)
+        adjust_unread(user_id, 1)
+        publish_notification(notification)
         logger.info(f"Notification created for {user_id}: {title}")
         
         return str(result.inserted_id)
@@ -174,3 +238,166 @@ def create_notification(
     except Exception as e:
         logger.error(f"Error creating notification: {e}")
         return None
+
+def create_notifications(
+    user_ids: list,
+    notification_type: str,
+    title: str,
+    message: str,
+    data: dict = None,
+    batch_size: int = 1000
+) -> int:
+    """
+    Create the same notification for many users with batched insert_many calls
+    and one bulk unread counter update per batch. Returns the number created.
+    """
+    created = 0
+    now = time.time()
+    user_ids = [user_id for user_id in dict.fromkeys(user_ids) if user_id]
+    
+    for start in range(0, len(user_ids), batch_size):
+        batch = user_ids[start:start + batch_size]
+        notifications = [
+            {
+                "userId": user_id,
+                "type": notification_type,
+                "title": title,
+                "message": message,
+                "data": data or {},
+                "read": False,
+                "createdAt": now
+            }
+            for user_id in batch
+        ]
+        try:
+            notifications_collection.insert_many(notifications, ordered=False)
+        except Exception as e:
+            logger.error(f"Error creating {notification_type} notifications: {e}")
+            continue
+        
+        created += len(batch)
+        adjust_unread_many(batch, 1)
+        for notification in notifications:
+            publish_notification(notification)
+    
+    logger.info(f"Created {created} {notification_type} notifications: {title}")
+    return created
+
+def _like_window(liked_at: float) -> int:
+    """Start of the LIKE_NOTIFICATION_WINDOW_SECONDS window a like falls in"""
+    return int(liked_at // LIKE_NOTIFICATION_WINDOW_SECONDS) * LIKE_NOTIFICATION_WINDOW_SECONDS
+
+def _like_message_stage() -> dict:
+    """Pipeline stage building the message from data.likeCount and data.lastLikerName"""
+    name = "$data.lastLikerName"
+    others = {"$subtract": ["$data.likeCount", 1]}
+    return {"$set": {
+        "message": {"$switch": {
+            "branches": [
+                {"case": {"$eq": [others, 0]}, "then": {"$concat": [name, " liked your post"]}},
+                {"case": {"$eq": [others, 1]}, "then": {"$concat": [name, " and 1 other liked your post"]}}
+            ],
+            "default": {"$concat": [name, " and ", {"$toString": others}, " others liked your post"]}
+        }}
+    }}
+
+def create_like_notification(post_owner: str, post_id: str, liker_id: str, liker_name: str, liked_at: float = None):
+    """
+    Record a like on the owner's post, coalescing all likes on that post within
+    LIKE_NOTIFICATION_WINDOW_SECONDS into one upserted document, e.g.
+    "Ram and 24 others liked your post". Only called for a newly inserted like
+    document, so likeCount counts distinct likers; data.recentLikers keeps the
+    last RECENT_LIKERS of them for unlikes. Each like marks it unread again
+    and moves it to the top of the list (and off the read-notification TTL).
+    """
+    try:
+        now = time.time()
+        window_start = _like_window(liked_at or now)
+        liker = {"id": {"$literal": liker_id}, "name": {"$literal": liker_name}}
+        
+        previous = notifications_collection.find_one_and_update(
+            {
+                "userId": post_owner,
+                "type": "post_liked",
+                "data.postId": post_id,
+                "windowStart": window_start
+            },
+            [
+                {"$set": {
+                    "title": "New Like",
+                    "data.postId": post_id,
+                    "data.likeCount": {"$add": [{"$ifNull": ["$data.likeCount", 0]}, 1]},
+                    "data.lastLikerName": {"$literal": liker_name},
+                    "data.recentLikers": {"$slice": [
+                        {"$concatArrays": [{"$ifNull": ["$data.recentLikers", []]}, [liker]]},
+                        -RECENT_LIKERS
+                    ]},
+                    "read": False,
+                    "createdAt": now
+                }},
+                _like_message_stage(),
+                {"$unset": "expireAt"}
+            ],
+            projection={"read": 1},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+        
+        # New window, or an already-read one marked unread again, adds one unread
+        if previous is None or previous.get("read"):
+            adjust_unread(post_owner, 1)
+        
+        if notification_hub.has_subscribers(post_owner):
+            updated = notifications_collection.find_one({
+                "userId": post_owner,
+                "type": "post_liked",
+                "data.postId": post_id,
+                "windowStart": window_start
+            }, PUBLIC_PROJECTION)
+            if updated:
+                publish_notification(updated)
+        logger.info(f"Like notification updated for {post_owner} on post {post_id}")
+        
+    except DuplicateKeyError:
+        # A concurrent like created this window's document first - fold into it
+        create_like_notification(post_owner, post_id, liker_id, liker_name, liked_at)
+    except Exception as e:
+        logger.error(f"Error creating like notification: {e}")
+
+def remove_like_notification(post_owner: str, post_id: str, liker_id: str, liked_at: float):
+    """
+    Take an unlike back out of the like notification for the window the
+    removed like document was created in; one left with no likes is deleted.
+    """
+    if liked_at is None:
+        return
+    try:
+        remaining = {"$filter": {
+            "input": {"$ifNull": ["$data.recentLikers", []]},
+            "cond": {"$ne": ["$$this.id", {"$literal": liker_id}]}
+        }}
+        updated = notifications_collection.find_one_and_update(
+            {
+                "userId": post_owner,
+                "type": "post_liked",
+                "data.postId": post_id,
+                "windowStart": _like_window(liked_at)
+            },
+            [
+                {"$set": {
+                    "data.likeCount": {"$max": [0, {"$subtract": [{"$ifNull": ["$data.likeCount", 0]}, 1]}]},
+                    "data.recentLikers": remaining
+                }},
+                # Older likers fall off the capped list; name one only while it has any
+                {"$set": {"data.lastLikerName": {"$ifNull": [{"$arrayElemAt": ["$data.recentLikers.name", -1]}, "Someone"]}}},
+                _like_message_stage()
+            ],
+            projection={"read": 1, "data.likeCount": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if updated and updated["data"]["likeCount"] == 0:
+            deleted = notifications_collection.delete_one({"_id": updated["_id"], "data.likeCount": 0}).deleted_count
+            if deleted and not updated.get("read"):
+                adjust_unread(post_owner, -1)
+    except Exception as e:
+        logger.error(f"Error removing like notification: {e}")
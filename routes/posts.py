@@ -1,13 +1,20 @@
-from fastapi import APIRouter, HTTPException, File, UploadFile, Form, Query
+from fastapi import APIRouter, HTTPException, File, UploadFile, Form, Query, BackgroundTasks
 from bson import ObjectId
 import os
 import time
 import shutil
 import logging
+from pymongo import ReturnDocument
 from database import users_collection, posts_collection, likes_collection
 from config import UPLOAD_DIR
 from utils.image_verification import ImageVerificationService
 from utils.cloudinary_upload import upload_image_to_cloudinary, delete_image_from_cloudinary
+from utils.ttl_cache import TTLCache
+from utils.author_snapshot import build_author_snapshot
+from utils.identity import find_user
+from utils import rank_index, stats_rollup, achievement_engine
+from utils import like_engine
+from utils.like_counter import like_counter
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -15,6 +22,9 @@ router = APIRouter()
 # Initialize verification service
 verification_service = ImageVerificationService()
 
+# Identifiers already confirmed to exist (used by the like endpoint)
+_known_users = TTLCache(maxsize=50000, ttl=300)
+
 # CO2 Offset and Eco Points calculation
 def calculate_eco_impact(category: str, verification_score: float) -> tuple:
     """
@@ -131,8 +141,7 @@ async def create_post(
             "mobile": mobile if mobile else None,
             "email": email if email else None,
             "identifier": identifier,  # Store the identifier used
-            "userName": f"{user['firstName']} {user['lastName']}",
-            "userProfilePicture": user.get("profilePicture", None),
+            **build_author_snapshot(user),  # userName, userProfilePicture, firstName, lastName
             "caption": caption,
             "category": category,
             "categoryId": categoryId,
@@ -162,35 +171,27 @@ async def create_post(
         
         result = posts_collection.insert_one(post_data)
         post_data["_id"] = str(result.inserted_id)
+        rank_index.record_post_points(identifier, eco_points, post_data["createdAt"])
+        stats_rollup.record_post_change(after=post_data)
+        achievement_engine.record_post_created(identifier)
         
         # Update user's total eco points and CO2 offset (only if approved immediately)
         if verification_result["status"] == "approved":
-            if mobile:
-                users_collection.update_one(
-                    {"mobile": mobile},
-                    {
-                        "$inc": {
-                            "ecoPoints": eco_points,
-                            "totalCO2Offset": co2_offset
-                        }
-                    }
-                )
-                # Check for new achievements
-                from routes.achievements import check_and_award_achievements
-                await check_and_award_achievements(mobile)
-            else:
-                users_collection.update_one(
-                    {"email": email},
-                    {
-                        "$inc": {
-                            "ecoPoints": eco_points,
-                            "totalCO2Offset": co2_offset
-                        }
+            rank_index.record_user_points(identifier, eco_points)
+            updated_user = users_collection.find_one_and_update(
+                {"mobile": mobile} if mobile else {"email": email},
+                {
+                    "$inc": {
+                        "ecoPoints": eco_points,
+                        "totalCO2Offset": co2_offset
                     }
-                )
-                # Check for new achievements
-                from routes.achievements import check_and_award_achievements
-                await check_and_award_achievements(email)
+                },
+                projection={"ecoPoints": 1},
+                return_document=ReturnDocument.AFTER
+            )
+            # Achievements are evaluated in the background if a threshold was crossed
+            if updated_user:
+                achievement_engine.record_eco_points(identifier, updated_user.get("ecoPoints", 0), eco_points)
             
             logger.info(f"Post created and approved by {identifier}: +{eco_points} points, {co2_offset}kg CO2 offset")
             message = "Post created and approved successfully"
@@ -230,6 +231,7 @@ async def get_all_posts(skip: int = 0, limit: int = 20, userId: str = None):
         
         for post in posts:
             post["_id"] = str(post["_id"])
+            like_counter.merge_pending(post)
             
             # If userId provided, check if user liked this post
             if userId:
@@ -262,6 +264,7 @@ async def get_posts_by_category(category_id: str, skip: int = 0, limit: int = 20
         
         for post in posts:
             post["_id"] = str(post["_id"])
+            like_counter.merge_pending(post)
         
         return {
             "success": True,
@@ -277,14 +280,15 @@ async def get_posts_by_category(category_id: str, skip: int = 0, limit: int = 20
 async def get_user_posts(identifier: str, skip: int = 0, limit: int = 20):
     """Get user's posts (shows all statuses for their own posts)"""
     try:
-        # Search by identifier field or mobile field (for backward compatibility)
+        # Every post carries the canonical identifier (see migrate_identifiers.py)
         # Show all posts (pending, approved, rejected) for the user's own profile
         posts = list(posts_collection.find(
-            {"$or": [{"mobile": identifier}, {"email": identifier}, {"identifier": identifier}]}
+            {"identifier": identifier}
         ).sort("createdAt", -1).skip(skip).limit(limit))
         
         for post in posts:
             post["_id"] = str(post["_id"])
+            like_counter.merge_pending(post)
         
         return {
             "success": True,
@@ -362,6 +366,7 @@ async def get_post(post_id: str):
             raise HTTPException(status_code=404, detail="Post not found")
         
         post["_id"] = str(post["_id"])
+        like_counter.merge_pending(post)
         
         return {
             "success": True,
@@ -372,11 +377,54 @@ async def get_post(post_id: str):
         logger.error(f"Error fetching post: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch post")
 
+def _user_exists(mobile: str = None, email: str = None) -> bool:
+    """Check that the liker exists, caching positive lookups to keep likes off the users collection"""
+    identifier = mobile or email
+    if _known_users.get(identifier):
+        return True
+    
+    query = {"mobile": mobile} if mobile else {"email": email}
+    exists = users_collection.find_one(query, {"_id": 1}) is not None
+    if exists:
+        _known_users.set(identifier, True)
+    return exists
+
+def notify_post_liked(post_owner: str, liker_identifier: str, post_id: str, liked_at: float):
+    """Add the like to the owner's coalesced "X and N others liked your post" notification"""
+    from routes.notifications import create_like_notification
+    
+    try:
+        # Get the liker's name
+        liker = find_user(liker_identifier, {"firstName": 1, "lastName": 1})
+        liker_name = f"{liker.get('firstName', 'Someone')} {liker.get('lastName', '')}" if liker else "Someone"
+        
+        create_like_notification(post_owner, post_id, liker_identifier, liker_name.strip(), liked_at)
+    except Exception as notif_error:
+        # Don't fail the like if notification fails
+        logger.error(f"Failed to create notification: {notif_error}")
+
+def notify_post_unliked(post_owner: str, liker_identifier: str, post_id: str, liked_at: float):
+    """Take the unlike back out of the owner's coalesced like notification"""
+    from routes.notifications import remove_like_notification
+    
+    remove_like_notification(post_owner, post_id, liker_identifier, liked_at)
+
 @router.post("/posts/{post_id}/like")
-async def toggle_like(post_id: str, mobile: str = Form(None), email: str = Form(None)):
+async def toggle_like(
+    post_id: str,
+    background_tasks: BackgroundTasks,
+    mobile: str = Form(None),
+    email: str = Form(None)
+):
+    """
+    Like or unlike a post
+    
+    The like state lives in the likes collection (unique on postId+userId) and
+    the count is read back from the same atomic update that changes it, so
+    concurrent taps cannot drift likesCount. The owner notification is sent
+    as a background task after the response.
+    """
     try:
-        from routes.notifications import create_notification
-        
         # Get identifier (mobile or email)
         identifier = mobile if mobile else email
         if not identifier:
@@ -387,88 +435,31 @@ async def toggle_like(post_id: str, mobile: str = Form(None), email: str = Form(
             raise HTTPException(status_code=400, detail="Invalid post ID format")
         
         # SECURITY: Validate that the user exists
-        if mobile:
-            user = users_collection.find_one({"mobile": mobile})
-        else:
-            user = users_collection.find_one({"email": email})
-        
-        if not user:
+        if not _user_exists(mobile=mobile, email=email):
             raise HTTPException(status_code=404, detail="User not found. Please log in to like posts.")
         
-        post = posts_collection.find_one({"_id": ObjectId(post_id)})
+        result = like_engine.toggle_like(post_id, identifier)
+        post = result["post"]
         
         if not post:
             logger.error(f"Post not found with ID: {post_id}")
             raise HTTPException(status_code=404, detail="Post not found")
         
-        # Check if like already exists in likes collection
-        existing_like = likes_collection.find_one({
-            "postId": post_id,
-            "userId": identifier
-        })
-        
-        if existing_like:
-            # Unlike: Remove from likes collection
-            likes_collection.delete_one({"_id": existing_like["_id"]})
-            
-            # Decrement like count in post
-            posts_collection.update_one(
-                {"_id": ObjectId(post_id)},
-                {
-                    "$inc": {"likesCount": -1},
-                    "$set": {"updatedAt": time.time()}
-                }
-            )
-            liked = False
-        else:
-            # Like: Add to likes collection
-            likes_collection.insert_one({
-                "postId": post_id,
-                "userId": identifier,
-                "createdAt": time.time()
-            })
-            
-            # Increment like count in post
-            posts_collection.update_one(
-                {"_id": ObjectId(post_id)},
-                {
-                    "$inc": {"likesCount": 1},
-                    "$set": {"updatedAt": time.time()}
-                }
-            )
-            liked = True
-            
-            # Create notification for post owner (don't notify if user likes their own post)
+        # Notify post owner (don't notify if user likes their own post)
+        if result["changed"]:
             post_owner = post.get("identifier") or post.get("mobile") or post.get("email")
             if post_owner and post_owner != identifier:
-                try:
-                    # Get the liker's name
-                    liker = users_collection.find_one(
-                        {"$or": [{"mobile": identifier}, {"email": identifier}]}
-                    )
-                    liker_name = f"{liker.get('firstName', 'Someone')} {liker.get('lastName', '')}" if liker else "Someone"
-                    
-                    create_notification(
-                        user_id=post_owner,
-                        notification_type="post_liked",
-                        title="New Like",
-                        message=f"{liker_name.strip()} liked your post",
-                        data={
-                            "postId": post_id
-                        }
-                    )
-                except Exception as notif_error:
-                    # Don't fail the like if notification fails
-                    logger.error(f"Failed to create notification: {notif_error}")
-        
-        updated_post = posts_collection.find_one({"_id": ObjectId(post_id)})
+                notify = notify_post_liked if result["liked"] else notify_post_unliked
+                background_tasks.add_task(notify, post_owner, identifier, post_id, result["likedAt"])
         
         return {
             "success": True,
-            "liked": liked,
-            "likesCount": updated_post.get("likesCount", 0)
+            "liked": result["liked"],
+            "likesCount": result["likesCount"]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error toggling like: {e}")
         raise HTTPException(status_code=500, detail="Failed to toggle like")
@@ -516,9 +507,13 @@ async def delete_post(post_id: str, mobile: str = Query(None), email: str = Quer
         
         # Delete post from database
         posts_collection.delete_one({"_id": ObjectId(post_id)})
+        rank_index.record_post_points(post_owner, -eco_points, post.get("createdAt", 0))
+        stats_rollup.record_post_change(before=post)
+        achievement_engine.record_post_deleted(post_owner)
         
         # Deduct eco points and CO2 offset from user ONLY if post was approved
         if eco_points > 0 and post.get("verificationStatus") == "approved":
+            rank_index.record_user_points(post_owner, -eco_points)
             if mobile:
                 users_collection.update_one(
                     {"mobile": mobile},
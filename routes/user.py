@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, File, UploadFile, Form
+from fastapi import APIRouter, HTTPException, File, UploadFile, Form, BackgroundTasks
 import os
 import time
 import shutil
@@ -7,6 +7,7 @@ from database import users_collection
 from config import UPLOAD_DIR
 from utils.face_verifier_opencv import FaceVerifier
 from utils.cloudinary_upload import upload_image_to_cloudinary, delete_image_from_cloudinary
+from utils.author_snapshot import refresh_author_snapshot
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -107,7 +108,7 @@ async def update_steps(mobile: str, steps: int):
         raise HTTPException(status_code=500, detail="Failed to update steps.")
 
 @router.post("/upload-profile-picture")
-async def upload_profile_picture(file: UploadFile = File(...), mobile: str = Form(None), email: str = Form(None)):
+async def upload_profile_picture(background_tasks: BackgroundTasks, file: UploadFile = File(...), mobile: str = Form(None), email: str = Form(None)):
     try:
         logger.info(f"Upload request received - mobile: {mobile}, email: {email}, file: {file.filename if file else 'None'}")
         logger.info(f"File content type: {file.content_type if file else 'None'}")
@@ -194,6 +195,9 @@ async def upload_profile_picture(file: UploadFile = File(...), mobile: str = For
         
         logger.info(f"Profile picture and face encoding saved for user: {identifier}")
         
+        # Propagate the new picture to the author snapshot on the user's posts
+        background_tasks.add_task(refresh_author_snapshot, identifier)
+        
         return {
             "success": True,
             "message": "Profile picture uploaded and face verified successfully",
@@ -208,7 +212,7 @@ async def upload_profile_picture(file: UploadFile = File(...), mobile: str = For
         raise HTTPException(status_code=500, detail=f"Failed to upload profile picture: {str(e)}")
 
 @router.delete("/delete-profile-picture/{mobile}")
-async def delete_profile_picture(mobile: str):
+async def delete_profile_picture(mobile: str, background_tasks: BackgroundTasks):
     try:
         user = users_collection.find_one({"mobile": mobile})
         
@@ -242,6 +246,9 @@ async def delete_profile_picture(mobile: str):
         
         logger.info(f"Profile picture deleted for user: {mobile}")
         
+        # Clear the picture from the author snapshot on the user's posts
+        background_tasks.add_task(refresh_author_snapshot, mobile)
+        
         return {"success": True, "message": "Profile picture deleted successfully"}
         
     except Exception as e:
@@ -249,7 +256,8 @@ async def delete_profile_picture(mobile: str):
         raise HTTPException(status_code=500, detail="Failed to delete profile picture")
 
 @router.put("/update-profile")
-async def update_profile(mobile: str = Form(None), email: str = Form(None), 
+async def update_profile(background_tasks: BackgroundTasks,
+                        mobile: str = Form(None), email: str = Form(None), 
                         firstName: str = Form(...), lastName: str = Form(...), 
                         dateOfBirth: str = Form(...)):
     try:
@@ -292,6 +300,10 @@ async def update_profile(mobile: str = Form(None), email: str = Form(None),
         
         logger.info(f"Profile updated for user: {identifier}")
         
+        # Propagate the new name to the author snapshot on the user's posts
+        if firstName != user.get("firstName") or lastName != user.get("lastName"):
+            background_tasks.add_task(refresh_author_snapshot, identifier)
+        
         # Get updated user data
         updated_user = users_collection.find_one(query)
         updated_user["_id"] = str(updated_user["_id"])
@@ -6,24 +6,8 @@ Run this script to add initial eco-locations for testing
 from database import eco_locations_collection
 from datetime import datetime, timedelta
 
-def seed_eco_locations():
-    """Add sample eco-locations to the database"""
-    
-    # Clear existing data (optional - comment out if you want to keep existing data)
-    # eco_locations_collection.delete_many({})
-    
-    # Check if data already exists
-    if eco_locations_collection.count_documents({}) > 0:
-        print(f"Database already has {eco_locations_collection.count_documents({})} locations.")
-        response = input("Do you want to clear and reseed? (yes/no): ")
-        if response.lower() == 'yes':
-            eco_locations_collection.delete_many({})
-            print("Cleared existing data.")
-        else:
-            print("Keeping existing data. Exiting.")
-            return
-    
-    timestamp = int(datetime.now().timestamp())
+def build_sample_locations(timestamp):
+    """Return the sample (kathmandu, bhaktapur, lalitpur) location lists"""
     
     # Sample locations for Kathmandu
     kathmandu_locations = [
@@ -409,6 +393,29 @@ def seed_eco_locations():
         }
     ]
     
+    return kathmandu_locations, bhaktapur_locations, lalitpur_locations
+
+
+def seed_eco_locations():
+    """Add sample eco-locations to the database"""
+    
+    # Clear existing data (optional - comment out if you want to keep existing data)
+    # eco_locations_collection.delete_many({})
+    
+    # Check if data already exists
+    if eco_locations_collection.count_documents({}) > 0:
+        print(f"Database already has {eco_locations_collection.count_documents({})} locations.")
+        response = input("Do you want to clear and reseed? (yes/no): ")
+        if response.lower() == 'yes':
+            eco_locations_collection.delete_many({})
+            print("Cleared existing data.")
+        else:
+            print("Keeping existing data. Exiting.")
+            return
+    
+    timestamp = int(datetime.now().timestamp())
+    kathmandu_locations, bhaktapur_locations, lalitpur_locations = build_sample_locations(timestamp)
+    
     # Combine all locations
     all_locations = kathmandu_locations + bhaktapur_locations + lalitpur_locations
     
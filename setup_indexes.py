@@ -0,0 +1,218 @@
+"""
+Index manifest for every collection the API queries
+Applied idempotently on startup (ENSURE_INDEXES_ON_STARTUP) or by hand:
+    python setup_indexes.py            # create missing indexes
+    python setup_indexes.py --check    # create, then explain() representative queries and fail on COLLSCAN
+"""
+import sys
+import time
+import logging
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE
+from pymongo.errors import OperationFailure
+from database import user_db
+
+logger = logging.getLogger(__name__)
+
+# collection name -> [(keys, options)]; each entry notes the query shape it serves
+INDEX_MANIFEST = {
+    "user_data": [
+        # find_user / enrichment $in (utils/identity.py, utils/post_enrichment.py)
+        ([("identifier", ASCENDING)], {"unique": True, "partialFilterExpression": {"identifier": {"$type": "string"}}}),
+        # login, signup duplicate checks, profile routes
+        ([("mobile", ASCENDING)], {}),
+        ([("email", ASCENDING)], {}),
+        ([("firebaseUid", ASCENDING)], {"sparse": True}),
+        # all-time leaderboard sort and "users ahead" rank count
+        ([("ecoPoints", DESCENDING)], {}),
+    ],
+    "posts": [
+        # public feed, admin pending review
+        ([("verificationStatus", ASCENDING), ("createdAt", DESCENDING)], {}),
+        # category feed
+        ([("categoryId", ASCENDING), ("verificationStatus", ASCENDING), ("createdAt", DESCENDING)], {}),
+        # profile posts, post counts, author snapshot refresh
+        ([("identifier", ASCENDING), ("createdAt", DESCENDING)], {}),
+        # account deletion
+        ([("mobile", ASCENDING)], {"sparse": True}),
+        # duplicate image check
+        ([("imageHash", ASCENDING)], {"sparse": True}),
+        # announcements feed (pinned first)
+        ([("isAdminPost", ASCENDING), ("isPinned", DESCENDING), ("createdAt", DESCENDING)], {}),
+        # weekly / monthly leaderboard windows
+        ([("createdAt", DESCENDING)], {}),
+    ],
+    "likes": [
+        # like toggle upsert, "liked by me", per-post counts (postId prefix)
+        ([("postId", ASCENDING), ("userId", ASCENDING)], {"unique": True}),
+        ([("userId", ASCENDING)], {}),
+        ([("createdAt", DESCENDING)], {}),
+    ],
+    "notifications": [
+        # notification list and unread counts
+        ([("userId", ASCENDING), ("read", ASCENDING), ("createdAt", DESCENDING)], {}),
+        ([("userId", ASCENDING), ("createdAt", DESCENDING)], {}),
+        # coalesced like notification key (routes/notifications.create_like_notification)
+        ([("userId", ASCENDING), ("type", ASCENDING), ("data.postId", ASCENDING), ("windowStart", ASCENDING)],
+         {"unique": True, "partialFilterExpression": {"type": "post_liked"}, "name": "like_notification_window"}),
+        # one broadcast digest per user (utils/notification_retention.compact_broadcasts)
+        ([("userId", ASCENDING), ("type", ASCENDING)],
+         {"unique": True, "partialFilterExpression": {"type": "broadcast_digest"}, "name": "broadcast_digest_per_user"}),
+        # retention: TTL on read notifications, old broadcast compaction
+        ([("expireAt", ASCENDING)], {"expireAfterSeconds": 0}),
+        ([("type", ASCENDING), ("read", ASCENDING), ("createdAt", ASCENDING)], {}),
+    ],
+    "notification_counters": [
+        # users notified since the last per-user cap pass (utils/notification_retention.enforce_user_cap)
+        ([("notifiedAt", ASCENDING)], {}),
+    ],
+    "challenges": [
+        ([("challenge_id", ASCENDING)], {"unique": True}),
+        ([("type", ASCENDING), ("active", ASCENDING)], {}),
+    ],
+    "user_challenges": [
+        # my challenges, active / recent completion checks
+        ([("user_id", ASCENDING), ("challenge_id", ASCENDING), ("status", ASCENDING)], {}),
+        ([("user_id", ASCENDING), ("status", ASCENDING), ("started_at", DESCENDING)], {}),
+        # missed-challenge sweep and admin stats
+        ([("status", ASCENDING)], {}),
+        # admin challenge participants / analytics
+        ([("challenge_id", ASCENDING), ("status", ASCENDING)], {}),
+    ],
+    "challenge_checkins": [
+        # daily activity / participation range scans (routes/challenges.daily_checkin_counts)
+        ([("date", ASCENDING), ("challenge_id", ASCENDING)], {}),
+        # one event per user challenge day; rebuilding a user challenge from its events
+        ([("user_challenge_id", ASCENDING), ("day", ASCENDING)], {"unique": True}),
+    ],
+    "user_achievements": [
+        ([("identifier", ASCENDING), ("achievementId", ASCENDING)],
+         {"unique": True, "partialFilterExpression": {"identifier": {"$type": "string"}}}),
+    ],
+    "carbon_footprints": [
+        ([("identifier", ASCENDING), ("timestamp", DESCENDING)], {}),
+        ([("mobile", ASCENDING), ("timestamp", DESCENDING)], {}),
+    ],
+    "co2_questions": [
+        ([("active", ASCENDING), ("category", ASCENDING), ("order", ASCENDING)], {}),
+        ([("id", ASCENDING)], {}),
+    ],
+    "eco_locations": [
+        ([("location", GEOSPHERE)], {}),
+        ([("city", ASCENDING), ("category", ASCENDING), ("status", ASCENDING)], {}),
+        ([("eventDate", ASCENDING)], {}),
+        ([("name", ASCENDING)], {}),
+    ],
+}
+
+# Representative query shapes from routes/ that must be served by an index
+# (collection, filter, sort)
+REPRESENTATIVE_QUERIES = [
+    ("user_data", {"identifier": "9800000000"}, None),
+    ("user_data", {"mobile": "9800000000"}, None),
+    ("user_data", {"email": "someone@example.com"}, None),
+    ("user_data", {"ecoPoints": {"$gt": 100}}, None),
+    ("posts", {"verificationStatus": "approved"}, [("createdAt", -1)]),
+    ("posts", {"verificationStatus": {"$in": ["pending_review", "error"]}}, [("createdAt", -1)]),
+    ("posts", {"categoryId": "plantation", "verificationStatus": "approved"}, [("createdAt", -1)]),
+    ("posts", {"identifier": "9800000000"}, [("createdAt", -1)]),
+    ("posts", {"imageHash": {"$exists": True}}, None),
+    ("posts", {"isAdminPost": True}, [("isPinned", -1), ("createdAt", -1)]),
+    ("posts", {"createdAt": {"$gte": 0}}, None),
+    ("likes", {"postId": "000000000000000000000000", "userId": "9800000000"}, None),
+    ("likes", {"postId": {"$in": ["000000000000000000000000"]}}, None),
+    ("notifications", {"userId": "9800000000"}, [("createdAt", -1)]),
+    ("notifications", {"userId": "9800000000", "read": False}, None),
+    ("notifications", {"userId": "9800000000", "type": "post_liked",
+                       "data.postId": "000000000000000000000000", "windowStart": 0}, None),
+    ("notifications", {"type": {"$in": ["announcement", "new_eco_location"]}, "read": False,
+                       "createdAt": {"$lt": 0}}, None),
+    ("notification_counters", {"notifiedAt": {"$gte": 0}}, None),
+    ("challenges", {"challenge_id": "daily_walk"}, None),
+    ("challenges", {"type": "daily_checkin", "active": True}, None),
+    ("user_challenges", {"user_id": "9800000000", "challenge_id": "daily_walk", "status": "in_progress"}, None),
+    ("user_challenges", {"user_id": "9800000000", "status": {"$in": ["in_progress", "completed"]}}, [("started_at", -1)]),
+    ("user_challenges", {"status": "in_progress"}, None),
+    ("user_challenges", {"challenge_id": "daily_walk"}, None),
+    ("challenge_checkins", {"date": {"$gte": "2025-01-01", "$lte": "2025-01-30"}}, None),
+    ("challenge_checkins", {"user_challenge_id": "000000000000000000000000"}, None),
+    ("user_achievements", {"identifier": "9800000000"}, None),
+    ("carbon_footprints", {"identifier": "9800000000"}, [("timestamp", -1)]),
+    ("co2_questions", {"active": True, "category": "Transportation"}, None),
+    ("eco_locations", {"city": "Kathmandu", "category": "recycling"}, None),
+    ("eco_locations", {"eventDate": {"$lt": "2025-01-02"}, "category": "plantation_event",
+                       "status": {"$ne": "completed"}}, None),
+    ("eco_locations", {"location": {"$near": {"$geometry": {"type": "Point", "coordinates": [85.324, 27.7172]},
+                                              "$maxDistance": 5000}}}, None),
+    ("eco_locations", {"location": {"$geoWithin": {"$geometry": {"type": "Polygon", "coordinates": [
+        [[85.3, 27.7], [85.35, 27.7], [85.35, 27.75], [85.3, 27.75], [85.3, 27.7]]]}}}}, None),
+]
+
+
+def apply_indexes(collections=None) -> dict:
+    """
+    Create every manifest index that is missing (create_index is a no-op for
+    existing identical indexes). Conflicts with an existing index of the same
+    keys but different options are logged and reported, not raised.
+
+    Returns: {"created": n, "failed": [(collection, index, error)]}
+    """
+    started = time.time()
+    created = 0
+    failed = []
+
+    for collection_name, indexes in INDEX_MANIFEST.items():
+        if collections and collection_name not in collections:
+            continue
+        collection = user_db[collection_name]
+        for keys, options in indexes:
+            try:
+                collection.create_index(keys, **options)
+                created += 1
+            except OperationFailure as e:
+                logger.error(f"Index {collection_name}{keys} not created: {e}")
+                failed.append((collection_name, keys, str(e)))
+
+    logger.info(f"Ensured {created} indexes in {time.time() - started:.1f}s ({len(failed)} failed)")
+    return {"created": created, "failed": failed}
+
+
+def _plan_stages(plan: dict):
+    """Yield every stage name in an explain() plan tree"""
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    for key in ("inputStage", "queryPlan"):
+        yield from _plan_stages(plan.get(key))
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+def check_query_plans() -> list:
+    """explain() each representative query; returns the ones whose winning plan is a COLLSCAN"""
+    collscans = []
+    for collection_name, query, sort in REPRESENTATIVE_QUERIES:
+        cursor = user_db[collection_name].find(query).limit(20)
+        if sort:
+            cursor = cursor.sort(sort)
+        winning_plan = cursor.explain()["queryPlanner"]["winningPlan"]
+        if "COLLSCAN" in set(_plan_stages(winning_plan)):
+            collscans.append((collection_name, query, sort))
+    return collscans
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    result = apply_indexes()
+    for collection_name, keys, error in result["failed"]:
+        print(f"✗ {collection_name} {keys}: {error}")
+
+    if "--check" in sys.argv:
+        collscans = check_query_plans()
+        for collection_name, query, sort in collscans:
+            print(f"✗ COLLSCAN on {collection_name}: {query} sort={sort}")
+        if not collscans:
+            print(f"✓ All {len(REPRESENTATIVE_QUERIES)} representative queries use an index")
+        if collscans or result["failed"]:
+            sys.exit(1)
@@ -1,26 +1,14 @@
 from database import likes_collection
+from setup_indexes import apply_indexes
 
 def setup_likes_indexes():
     """
     Create indexes for the likes collection for better query performance
+    The index definitions live in setup_indexes.INDEX_MANIFEST
     """
     print("Setting up indexes for likes collection...")
     
-    # Create compound index on postId and userId for fast lookup
-    likes_collection.create_index([("postId", 1), ("userId", 1)], unique=True)
-    print("✓ Created compound index on (postId, userId)")
-    
-    # Create index on postId for getting all likes for a post
-    likes_collection.create_index([("postId", 1)])
-    print("✓ Created index on postId")
-    
-    # Create index on userId for getting all posts liked by a user
-    likes_collection.create_index([("userId", 1)])
-    print("✓ Created index on userId")
-    
-    # Create index on createdAt for sorting
-    likes_collection.create_index([("createdAt", -1)])
-    print("✓ Created index on createdAt")
+    apply_indexes(["likes"])
     
     print("\n✅ All indexes created successfully!")
     print("\nIndexes:")
@@ -0,0 +1,54 @@
+from datetime import date
+from bson.int64 import Int64
+from utils.checkins import new_checkin_fields, checkin_bit, mask_value, is_checked, checkin_progress, WORD_BITS
+
+
+def _user_challenge(target_days):
+    return {"target_days": target_days, **new_checkin_fields(date(2025, 1, 1), target_days)}
+
+
+def _check_in(user_challenge, index):
+    """What the check-in update does: $bit or, guarded by $bitsAllClear on the same word"""
+    field, bit = checkin_bit(index)
+    word = int(field.split(".")[1])
+    words = user_challenge["checkin_mask"]
+    if int(words[word]) & int(bit):
+        # $bitsAllClear no longer matches: the update is a no-op
+        return False
+    words[word] = Int64(int(words[word]) | int(bit))
+    return True
+
+
+def test_checkin_bit_addresses_word_and_bit():
+    assert checkin_bit(0) == ("checkin_mask.0", 1)
+    assert checkin_bit(WORD_BITS - 1) == ("checkin_mask.0", 1 << (WORD_BITS - 1))
+    assert checkin_bit(WORD_BITS) == ("checkin_mask.1", 1)
+    assert checkin_bit(40) == ("checkin_mask.1", 1 << 8)
+    assert all(isinstance(checkin_bit(index)[1], Int64) for index in (0, 31, 32, 63))
+
+
+def test_second_checkin_for_the_same_day_is_rejected():
+    user_challenge = _user_challenge(30)
+    assert _check_in(user_challenge, 4)
+    assert not _check_in(user_challenge, 4)
+    mask = mask_value(user_challenge)
+    assert is_checked(mask, 4)
+    assert bin(mask).count("1") == 1
+
+
+def test_checkins_across_words_never_touch_a_sign_bit():
+    user_challenge = _user_challenge(64)
+    for index in range(64):
+        assert _check_in(user_challenge, index)
+        assert not _check_in(user_challenge, index)
+    assert all(0 <= int(word) < 2 ** WORD_BITS for word in user_challenge["checkin_mask"])
+    assert mask_value(user_challenge) == (1 << 64) - 1
+
+
+def test_progress_counts_the_guarded_checkins():
+    user_challenge = _user_challenge(7)
+    for index in (0, 1, 3):
+        _check_in(user_challenge, index)
+    _check_in(user_challenge, 3)
+    progress = checkin_progress(user_challenge, mask_value(user_challenge), date(2025, 1, 4))
+    assert progress == {"current_streak": 3, "missed_days": 1, "completed": False}
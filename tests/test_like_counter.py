@@ -0,0 +1,70 @@
+from pymongo.errors import BulkWriteError
+import utils.like_counter as like_counter_module
+from utils.like_counter import WriteBehindLikeCounter
+
+POSTS = ["000000000000000000000001", "000000000000000000000002", "000000000000000000000003"]
+
+
+class _FakePosts:
+    def __init__(self, counter, failed_indexes=(), error=None):
+        self.counter = counter
+        self.failed_indexes = failed_indexes
+        self.error = error
+        self.seen_pending = {}
+        self.calls = 0
+
+    def bulk_write(self, operations, ordered=True):
+        self.calls += 1
+        # Deltas being written must still be visible to readers
+        self.seen_pending = {post_id: self.counter.pending(post_id) for post_id in POSTS}
+        if self.error:
+            raise self.error
+        if self.failed_indexes:
+            raise BulkWriteError({
+                "writeErrors": [{"index": index, "code": 121, "errmsg": "failed"} for index in self.failed_indexes],
+                "nModified": len(operations) - len(self.failed_indexes)
+            })
+
+
+def _counter(monkeypatch, **fake_options):
+    counter = WriteBehindLikeCounter(enabled=True)
+    posts = _FakePosts(counter, **fake_options)
+    monkeypatch.setattr(like_counter_module, "posts_collection", posts)
+    counter.record(POSTS[0], 3)
+    counter.record(POSTS[1], -1)
+    counter.record(POSTS[2], 2)
+    return counter, posts
+
+
+def test_flush_writes_and_clears_pending(monkeypatch):
+    counter, posts = _counter(monkeypatch)
+    assert counter.flush() == 3
+    assert [counter.pending(post_id) for post_id in POSTS] == [0, 0, 0]
+
+
+def test_in_flight_deltas_stay_visible_during_flush(monkeypatch):
+    counter, posts = _counter(monkeypatch)
+    counter.flush()
+    assert posts.seen_pending == {POSTS[0]: 3, POSTS[1]: -1, POSTS[2]: 2}
+
+
+def test_partial_bulk_write_error_requeues_only_failed_ops(monkeypatch):
+    counter, posts = _counter(monkeypatch, failed_indexes=(1,))
+    assert counter.flush() == 2
+    assert [counter.pending(post_id) for post_id in POSTS] == [0, -1, 0]
+
+
+def test_retried_op_merges_with_new_deltas(monkeypatch):
+    counter, posts = _counter(monkeypatch, failed_indexes=(0,))
+    counter.flush()
+    counter.record(POSTS[0], 1)
+    posts.failed_indexes = ()
+    assert counter.pending(POSTS[0]) == 4
+    assert counter.flush() == 1
+    assert counter.pending(POSTS[0]) == 0
+
+
+def test_other_errors_requeue_the_whole_batch(monkeypatch):
+    counter, posts = _counter(monkeypatch, error=ConnectionError("down"))
+    assert counter.flush() == 0
+    assert [counter.pending(post_id) for post_id in POSTS] == [3, -1, 2]
@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+from pymongo.errors import DuplicateKeyError
+import utils.like_engine as like_engine
+
+
+class _FakeLikes:
+    """likes_collection stand-in: update_one raises like a concurrent insert of the same like"""
+
+    def __init__(self, existing=None, duplicate=False):
+        self.existing = existing
+        self.duplicate = duplicate
+
+    def update_one(self, like_filter, update, upsert=False):
+        if self.duplicate:
+            raise DuplicateKeyError("E11000 duplicate key error")
+        if self.existing is None:
+            self.existing = {**like_filter, **update["$setOnInsert"]}
+            return SimpleNamespace(upserted_id="new")
+        return SimpleNamespace(upserted_id=None)
+
+    def find_one_and_delete(self, like_filter, projection=None):
+        deleted, self.existing = self.existing, None
+        return deleted
+
+
+def test_new_like_is_inserted(monkeypatch):
+    monkeypatch.setattr(like_engine, "likes_collection", _FakeLikes())
+    liked, delta, liked_at = like_engine.toggle_like_record("post", "user")
+    assert (liked, delta) == (True, 1)
+    assert liked_at is not None
+
+
+def test_existing_like_is_deleted(monkeypatch):
+    monkeypatch.setattr(like_engine, "likes_collection", _FakeLikes(existing={"createdAt": 123.0}))
+    assert like_engine.toggle_like_record("post", "user") == (False, -1, 123.0)
+
+
+def test_duplicate_key_on_insert_unlikes_the_concurrent_like(monkeypatch):
+    # A concurrent tap inserted the like first: this call treats it as existing and removes it
+    likes = _FakeLikes(existing={"createdAt": 456.0}, duplicate=True)
+    monkeypatch.setattr(like_engine, "likes_collection", likes)
+    assert like_engine.toggle_like_record("post", "user") == (False, -1, 456.0)
+    assert likes.existing is None
+
+
+def test_duplicate_key_after_a_concurrent_unlike_changes_nothing(monkeypatch):
+    # The like existed at insert time but another request already deleted it
+    monkeypatch.setattr(like_engine, "likes_collection", _FakeLikes(existing=None, duplicate=True))
+    assert like_engine.toggle_like_record("post", "user") == (False, 0, None)
@@ -0,0 +1,29 @@
+from utils.nearby_locations import LocationGridIndex
+
+
+def _index():
+    index = LocationGridIndex()
+    index.rebuild([
+        {"_id": "a", "latitude": 27.7172, "longitude": 85.3240, "city": "Kathmandu", "category": "park"},
+        {"_id": "b", "latitude": 27.6710, "longitude": 85.4298, "city": "Bhaktapur", "category": "recycling"},
+        {"_id": "c", "latitude": 27.6588, "longitude": 85.3247, "city": "Lalitpur", "category": "park"},
+    ])
+    return index
+
+
+def test_whole_world_box_returns_every_location():
+    index = _index()
+    locations = index.within_bbox(-90, -180, 90, 180)
+    assert sorted(location["_id"] for location in locations) == ["a", "b", "c"]
+
+
+def test_small_box_only_returns_locations_inside():
+    index = _index()
+    locations = index.within_bbox(27.70, 85.30, 27.73, 85.35)
+    assert [location["_id"] for location in locations] == ["a"]
+
+
+def test_whole_world_box_filters_by_category():
+    index = _index()
+    locations = index.within_bbox(-90, -180, 90, 180, category="park")
+    assert sorted(location["_id"] for location in locations) == ["a", "c"]
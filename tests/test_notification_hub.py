@@ -0,0 +1,55 @@
+from bson import ObjectId
+import utils.notification_hub as notification_hub_module
+from utils.notification_hub import notification_hub, _watch_changes
+
+
+class _FakeStream:
+    def __init__(self, changes):
+        self._changes = changes
+
+    def __enter__(self):
+        return iter(self._changes)
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _FakeDatabase:
+    def __init__(self, changes):
+        self._changes = changes
+
+    def watch(self, pipeline, full_document=None):
+        return _FakeStream(self._changes)
+
+
+def _like_notification():
+    return {
+        "_id": ObjectId(),
+        "userId": "9800000000",
+        "type": "post_liked",
+        "title": "New Like",
+        "message": "Ram and 1 other liked your post",
+        "data": {
+            "postId": "000000000000000000000000",
+            "likeCount": 2,
+            "lastLikerName": "Ram",
+            "recentLikers": [{"id": "9800000001", "name": "Sita"}, {"id": "9800000002", "name": "Ram"}]
+        },
+        "read": False,
+        "createdAt": 0
+    }
+
+
+def test_change_stream_event_hides_likers(monkeypatch):
+    change = {"ns": {"coll": notification_hub_module.notifications_collection.name}, "fullDocument": _like_notification()}
+    published = []
+    monkeypatch.setattr(notification_hub_module, "user_db", _FakeDatabase([change]))
+    monkeypatch.setattr(notification_hub, "has_subscribers", lambda user_id: True)
+    monkeypatch.setattr(notification_hub, "publish", lambda user_id, event: published.append(event))
+
+    _watch_changes()
+
+    assert len(published) == 1
+    data = published[0]["notification"]["data"]
+    assert "recentLikers" not in data
+    assert data["likeCount"] == 2 and data["lastLikerName"] == "Ram"
@@ -0,0 +1,52 @@
+from utils.rank_index import RankIndex
+
+
+def _index(scores):
+    index = RankIndex()
+    index.rebuild(scores)
+    return index
+
+
+def test_count_greater_orders_by_score():
+    index = _index({"a": 50, "b": 200, "c": 120})
+    assert index.count_greater(200) == 0
+    assert index.count_greater(120) == 1
+    assert index.count_greater(50) == 2
+    assert index.count_greater(0) == 3
+
+
+def test_tied_scores_share_a_rank():
+    index = _index({"a": 100, "b": 100, "c": 300, "d": 40})
+    # Rank is 1 + users strictly ahead, so both 100s are ranked 2nd
+    assert index.count_greater(100) == 1
+    assert index.count_greater(40) == 3
+
+
+def test_add_moves_an_existing_score():
+    index = _index({"a": 100, "b": 150})
+    index.add("a", 100)
+    assert index.count_greater(200) == 0
+    assert index.count_greater(150) == 1
+    assert len(index) == 2
+
+
+def test_add_inserts_a_new_user():
+    index = _index({"a": 100})
+    index.add("b", 30)
+    assert len(index) == 2
+    assert index.count_greater(30) == 1
+
+
+def test_add_ignores_zero_delta_and_missing_identifier():
+    index = _index({"a": 100})
+    index.add("b", 0)
+    index.add(None, 10)
+    assert len(index) == 1
+
+
+def test_remove_drops_one_of_several_equal_scores():
+    index = _index({"a": 100, "b": 100, "c": 20})
+    index.remove("a")
+    index.remove("missing")
+    assert len(index) == 2
+    assert index.count_greater(20) == 1
@@ -0,0 +1,323 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError, BulkWriteError
+from database import users_collection, posts_collection, user_achievements_collection
+from utils.identity import find_user, user_identifier
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Achievement definitions (could be moved to a config or seeded)
+ACHIEVEMENTS = [
+    {
+        "id": "eco_starter",
+        "name": "Eco Starter",
+        "description": "Earn 200 eco points",
+        "iconUrl": "/assets/badges/eco_starter.svg",
+        "condition": {"type": "eco_points", "value": 200}
+    },
+    {
+        "id": "eco_enthusiast",
+        "name": "Eco Enthusiast",
+        "description": "Earn 500 eco points",
+        "iconUrl": "/assets/badges/eco_enthusiast.svg",
+        "condition": {"type": "eco_points", "value": 500}
+    },
+    {
+        "id": "eco_champion",
+        "name": "Eco Champion",
+        "description": "Earn 1000 eco points",
+        "iconUrl": "/assets/badges/eco_champion.svg",
+        "condition": {"type": "eco_points", "value": 1000}
+    },
+    {
+        "id": "first_step",
+        "name": "First Step",
+        "description": "Create your first post",
+        "iconUrl": "/assets/badges/first_step.svg",
+        "condition": {"type": "posts", "value": 1}
+    },
+    {
+        "id": "eco_contributor",
+        "name": "Eco Contributor",
+        "description": "Create 10 posts",
+        "iconUrl": "/assets/badges/eco_contributor.svg",
+        "condition": {"type": "posts", "value": 10}
+    },
+    {
+        "id": "eco_influencer",
+        "name": "Eco Influencer",
+        "description": "Create 50 posts",
+        "iconUrl": "/assets/badges/eco_influencer.svg",
+        "condition": {"type": "posts", "value": 50}
+    }
+]
+
+# Condition type -> user document counter it is measured against
+COUNTER_FIELDS = {"eco_points": "ecoPoints", "posts": "postCount"}
+
+# Condition type -> ascending thresholds, so a counter change only triggers
+# evaluation when it reaches the next one
+THRESHOLDS = {
+    condition_type: sorted({a["condition"]["value"] for a in ACHIEVEMENTS if a["condition"]["type"] == condition_type})
+    for condition_type in COUNTER_FIELDS
+}
+
+# User fields evaluate_achievements reads
+EVALUATION_PROJECTION = {"identifier": 1, "mobile": 1, "email": 1, "ecoPoints": 1, "postCount": 1}
+
+# Evaluation runs here, off the request path
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="achievements")
+
+# identifier -> {achievementId: unlockedAt}; cleared on award, other workers' awards show up after the TTL
+_unlocks_cache = TTLCache(maxsize=50000, ttl=300)
+
+
+def get_unlocks(identifier: str) -> dict:
+    """The user's unlocked achievements as {achievementId: unlockedAt} (one indexed read on a miss)"""
+    unlocks = _unlocks_cache.get(identifier)
+    if unlocks is None:
+        unlocks = {
+            ua["achievementId"]: ua.get("unlockedAt")
+            for ua in user_achievements_collection.find({"identifier": identifier}, {"_id": 0, "achievementId": 1, "unlockedAt": 1})
+        }
+        _unlocks_cache.set(identifier, unlocks)
+    return unlocks
+
+
+def next_threshold(condition_type: str, value: float):
+    """Smallest threshold of the type above value, or None once all are reached"""
+    for threshold in THRESHOLDS.get(condition_type, []):
+        if threshold > value:
+            return threshold
+    return None
+
+
+def crossed_threshold(condition_type: str, old: float, new: float) -> bool:
+    threshold = next_threshold(condition_type, old)
+    return threshold is not None and new >= threshold
+
+
+def award_achievement(user: dict, achievement: dict) -> bool:
+    """
+    Record the unlock and notify the user; False if it was already awarded
+    The unique (identifier, achievementId) index makes concurrent awards a no-op.
+    """
+    identifier = user_identifier(user)
+    identifier_field = "mobile" if user.get("mobile") else "email"
+    try:
+        result = user_achievements_collection.update_one(
+            {"identifier": identifier, "achievementId": achievement["id"]},
+            {"$setOnInsert": {
+                identifier_field: identifier,
+                "identifier": identifier,
+                "achievementId": achievement["id"],
+                "unlockedAt": datetime.utcnow()
+            }},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    if result.upserted_id is None:
+        return False
+    _unlocks_cache.delete(identifier)
+
+    # Create notification for achievement unlock
+    try:
+        from routes.notifications import create_notification
+        create_notification(
+            user_id=identifier,
+            notification_type="achievement",
+            title="🏆 Achievement Unlocked!",
+            message=f"You've earned the '{achievement['name']}' badge! {achievement['description']}",
+            data={
+                "achievementId": achievement["id"],
+                "achievementName": achievement["name"]
+            }
+        )
+        logger.info(f"Created achievement notification for {identifier}: {achievement['name']}")
+    except Exception as e:
+        logger.error(f"Failed to create achievement notification: {e}")
+    return True
+
+
+def _post_count(user: dict) -> int:
+    """The user's postCount counter, initialized from posts on first use"""
+    if "postCount" in user:
+        return user["postCount"]
+    count = posts_collection.count_documents({"identifier": user_identifier(user)})
+    users_collection.update_one({"_id": user["_id"], "postCount": {"$exists": False}}, {"$set": {"postCount": count}})
+    return count
+
+
+def evaluate_achievements(identifier: str, condition_types=None, user: dict = None) -> list:
+    """
+    Award every achievement of the given condition types (default: all) whose
+    threshold the user's counters have reached; returns the new unlocks.
+    Pass user (read with EVALUATION_PROJECTION) when the caller already looked it up.
+    """
+    if user is None:
+        user = find_user(identifier, EVALUATION_PROJECTION)
+    if not user:
+        return []
+
+    counters = {"eco_points": user.get("ecoPoints", 0), "posts": _post_count(user)}
+    new_unlocks = []
+    for achievement in ACHIEVEMENTS:
+        condition = achievement["condition"]
+        if condition_types and condition["type"] not in condition_types:
+            continue
+        if counters.get(condition["type"], 0) >= condition["value"] and award_achievement(user, achievement):
+            new_unlocks.append(achievement)
+    return new_unlocks
+
+
+def _evaluate_safely(identifier: str, condition_types):
+    try:
+        evaluate_achievements(identifier, condition_types)
+    except Exception as e:
+        logger.error(f"Error evaluating achievements for {identifier}: {e}")
+
+
+def schedule_evaluation(identifier: str, condition_types=None):
+    _executor.submit(_evaluate_safely, identifier, condition_types)
+
+
+def record_eco_points(identifier: str, new_total: float, delta: float):
+    """The user's ecoPoints changed by delta to new_total (value read back from the $inc)"""
+    if delta > 0 and crossed_threshold("eco_points", new_total - delta, new_total):
+        schedule_evaluation(identifier, ["eco_points"])
+
+
+def record_post_created(identifier: str):
+    """Count a new post on the author's postCount and evaluate post achievements if a threshold is reached"""
+    user = users_collection.find_one_and_update(
+        {"identifier": identifier, "postCount": {"$exists": True}},
+        {"$inc": {"postCount": 1}},
+        projection={"postCount": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if user is None:
+        # Counter not initialized yet (or legacy user): evaluation counts the posts once
+        schedule_evaluation(identifier, ["posts"])
+    elif crossed_threshold("posts", user["postCount"] - 1, user["postCount"]):
+        schedule_evaluation(identifier, ["posts"])
+
+
+def record_post_deleted(identifier: str):
+    """Post achievements are never revoked; only the counter goes down"""
+    if identifier:
+        users_collection.update_one(
+            {"identifier": identifier, "postCount": {"$gt": 0}},
+            {"$inc": {"postCount": -1}}
+        )
+
+
+def _notify_unlocks(unlocks: dict):
+    """achievementId -> [identifier]: one bulk notification per achievement"""
+    from routes.notifications import create_notifications
+    by_id = {achievement["id"]: achievement for achievement in ACHIEVEMENTS}
+    for achievement_id, identifiers in unlocks.items():
+        achievement = by_id[achievement_id]
+        create_notifications(
+            identifiers,
+            notification_type="achievement",
+            title="🏆 Achievement Unlocked!",
+            message=f"You've earned the '{achievement['name']}' badge! {achievement['description']}",
+            data={
+                "achievementId": achievement["id"],
+                "achievementName": achievement["name"]
+            }
+        )
+
+
+def _write_backfill_batch(awards: list, counters: list, unlocks: dict) -> int:
+    inserted = 0
+    if awards:
+        try:
+            inserted = len(user_achievements_collection.insert_many(awards, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            # Duplicates were awarded concurrently since the aggregation read them (the unique
+            # index rejected the copy); any other failed award is logged. Neither is notified.
+            inserted = e.details.get("nInserted", 0)
+            errors = e.details.get("writeErrors", [])
+            failed = {error["op"]["_id"] for error in errors}
+            other_errors = [error for error in errors if error.get("code") != 11000]
+            if other_errors:
+                logger.error(f"{len(other_errors)} achievement awards failed in backfill: {other_errors[0].get('errmsg')}")
+            awards = [award for award in awards if award["_id"] not in failed]
+        for award in awards:
+            unlocks.setdefault(award["achievementId"], []).append(award["identifier"])
+            _unlocks_cache.delete(award["identifier"])
+    if counters:
+        users_collection.bulk_write(counters, ordered=False)
+    return inserted
+
+
+def backfill_achievements(batch_size: int = 1000, notify: bool = True) -> dict:
+    """
+    Award every missing achievement for every user, e.g. after a rule in
+    ACHIEVEMENTS changed. One aggregation streams each user with their post
+    count and awarded achievement ids; missing unlocks are written with
+    insert_many and postCount counters are refreshed on the way.
+
+    Returns: {"users": n, "awarded": n, "seconds": s}
+    """
+    started = time.time()
+    pipeline = [
+        {"$project": {"identifier": {"$ifNull": ["$identifier", {"$ifNull": ["$mobile", "$email"]}]},
+                      "mobile": 1, "ecoPoints": 1, "postCount": 1}},
+        {"$match": {"identifier": {"$type": "string"}}},
+        {"$lookup": {"from": posts_collection.name, "localField": "identifier", "foreignField": "identifier",
+                     "pipeline": [{"$project": {"_id": 1}}], "as": "posts"}},
+        {"$lookup": {"from": user_achievements_collection.name, "localField": "identifier", "foreignField": "identifier",
+                     "pipeline": [{"$project": {"_id": 0, "achievementId": 1}}], "as": "awarded"}},
+        {"$project": {"identifier": 1, "mobile": 1, "ecoPoints": 1, "postCount": 1,
+                      "actualPostCount": {"$size": "$posts"}, "awarded": "$awarded.achievementId"}}
+    ]
+
+    users = 0
+    awarded = 0
+    awards = []
+    counters = []
+    unlocks = {}
+    now = datetime.utcnow()
+
+    for user in users_collection.aggregate(pipeline, allowDiskUse=True, batchSize=batch_size):
+        users += 1
+        identifier = user["identifier"]
+        identifier_field = "mobile" if user.get("mobile") else "email"
+        values = {"eco_points": user.get("ecoPoints", 0), "posts": user["actualPostCount"]}
+        already = set(user["awarded"])
+
+        for achievement in ACHIEVEMENTS:
+            condition = achievement["condition"]
+            if achievement["id"] not in already and values[condition["type"]] >= condition["value"]:
+                awards.append({
+                    "_id": ObjectId(),
+                    identifier_field: identifier,
+                    "identifier": identifier,
+                    "achievementId": achievement["id"],
+                    "unlockedAt": now
+                })
+        if user.get("postCount") != user["actualPostCount"]:
+            # Only if the counter is unchanged since the aggregation read it, so a
+            # concurrent record_post_created increment is not overwritten
+            counter_filter = {"_id": user["_id"], "postCount": user.get("postCount", {"$exists": False})}
+            counters.append(UpdateOne(counter_filter, {"$set": {"postCount": user["actualPostCount"]}}))
+
+        if len(awards) >= batch_size or len(counters) >= batch_size:
+            awarded += _write_backfill_batch(awards, counters, unlocks)
+            awards, counters = [], []
+
+    awarded += _write_backfill_batch(awards, counters, unlocks)
+    if notify:
+        _notify_unlocks(unlocks)
+
+    seconds = time.time() - started
+    logger.info(f"Backfilled {awarded} achievements for {users} users in {seconds:.1f}s")
+    return {"users": users, "awarded": awarded, "seconds": seconds}
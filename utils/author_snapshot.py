@@ -0,0 +1,71 @@
+import time
+import logging
+from pymongo import UpdateMany
+from database import users_collection, posts_collection
+from utils.identity import find_user, user_identifier
+
+logger = logging.getLogger(__name__)
+
+# Author fields copied onto every post so list endpoints never join users
+AUTHOR_SNAPSHOT_FIELDS = ("userName", "userProfilePicture", "firstName", "lastName")
+
+
+def build_author_snapshot(user: dict) -> dict:
+    """Build the denormalized author fields stored on a user's posts"""
+    first_name = user.get("firstName", "")
+    last_name = user.get("lastName", "")
+    return {
+        "userName": f"{first_name} {last_name}".strip(),
+        "userProfilePicture": user.get("profilePicture", None),
+        "firstName": first_name,
+        "lastName": last_name,
+        "authorSnapshotAt": time.time()
+    }
+
+
+def refresh_author_snapshot(identifier: str) -> int:
+    """
+    Re-copy the user's current name and profile picture onto all their posts
+    Called as a background task after profile changes; returns posts updated
+    """
+    try:
+        user = find_user(identifier, {"firstName": 1, "lastName": 1, "profilePicture": 1})
+        if not user:
+            logger.warning(f"Author snapshot refresh skipped, user not found: {identifier}")
+            return 0
+
+        result = posts_collection.update_many(
+            {"identifier": identifier},
+            {"$set": build_author_snapshot(user)}
+        )
+        logger.info(f"Refreshed author snapshot on {result.modified_count} posts for {identifier}")
+        return result.modified_count
+
+    except Exception as e:
+        logger.error(f"Error refreshing author snapshot for {identifier}: {e}")
+        return 0
+
+
+def refresh_all_author_snapshots(batch_size: int = 500) -> int:
+    """Rebuild the snapshot on every post, one bulk_write per batch of users"""
+    updated = 0
+    operations = []
+    users = users_collection.find(
+        {},
+        {"identifier": 1, "mobile": 1, "email": 1, "firstName": 1, "lastName": 1, "profilePicture": 1}
+    ).batch_size(batch_size)
+
+    for user in users:
+        identifier = user_identifier(user)
+        if not identifier:
+            continue
+        operations.append(UpdateMany({"identifier": identifier}, {"$set": build_author_snapshot(user)}))
+
+        if len(operations) >= batch_size:
+            updated += posts_collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+
+    if operations:
+        updated += posts_collection.bulk_write(operations, ordered=False).modified_count
+
+    return updated
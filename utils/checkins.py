@@ -0,0 +1,200 @@
+import logging
+from datetime import date, datetime, timedelta
+from bson.int64 import Int64
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from database import user_challenges_collection, challenge_checkins_collection
+
+logger = logging.getLogger(__name__)
+
+# Check-ins are a bitset over challenge days (bit i = day i + 1), stored as an
+# array of 32-bit words in Int64s so $bit never touches a sign bit
+WORD_BITS = 32
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def _parse(day: str) -> date:
+    return datetime.strptime(day, DATE_FORMAT).date()
+
+
+def new_checkin_fields(start: date, target_days: int) -> dict:
+    """Check-in fields for a newly accepted challenge: nothing checked in yet"""
+    words = (target_days + WORD_BITS - 1) // WORD_BITS
+    return {
+        "start_date": start.strftime(DATE_FORMAT),
+        "end_date": (start + timedelta(days=target_days - 1)).strftime(DATE_FORMAT),
+        "checkin_mask": [Int64(0)] * words,
+        # day number -> {"timestamp", "note"}, only for days that were checked in
+        "checkin_details": {}
+    }
+
+
+def mask_value(user_challenge: dict) -> int:
+    """The stored words as one integer bitset"""
+    mask = 0
+    for word_index, word in enumerate(user_challenge.get("checkin_mask", [])):
+        mask |= int(word) << (word_index * WORD_BITS)
+    return mask
+
+
+def day_index(user_challenge: dict, on: date) -> int:
+    """Zero-based challenge day that `on` falls on (negative before the start)"""
+    return (on - _parse(user_challenge["start_date"])).days
+
+
+def checked_before(mask: int, index: int) -> int:
+    """Number of days checked in among the first `index` days"""
+    if index <= 0:
+        return 0
+    return bin(mask & ((1 << index) - 1)).count("1")
+
+
+def is_checked(mask: int, index: int) -> bool:
+    return index >= 0 and bool(mask >> index & 1)
+
+
+def checkin_bit(index: int):
+    """(field, bit) addressing day `index` for $bit / $bitsAllClear"""
+    return f"checkin_mask.{index // WORD_BITS}", Int64(1 << (index % WORD_BITS))
+
+
+def checkin_progress(user_challenge: dict, mask: int, today: date) -> dict:
+    """current_streak, missed_days and completed derived from the bitset"""
+    target_days = user_challenge["target_days"]
+    index = day_index(user_challenge, today)
+    elapsed = max(0, min(index, target_days))
+    return {
+        # Days checked in up to and including today
+        "current_streak": checked_before(mask, min(index + 1, target_days)),
+        # Past days that weren't checked in
+        "missed_days": elapsed - checked_before(mask, elapsed),
+        "completed": mask == (1 << target_days) - 1
+    }
+
+
+def missed_days(user_challenge: dict, today: date) -> int:
+    return checkin_progress(user_challenge, mask_value(user_challenge), today)["missed_days"]
+
+
+def expand_check_ins(user_challenge: dict) -> list:
+    """The per-day check_ins list API clients render, built from the bitset"""
+    start = _parse(user_challenge["start_date"])
+    mask = mask_value(user_challenge)
+    details = user_challenge.get("checkin_details", {})
+    check_ins = []
+    for index in range(user_challenge["target_days"]):
+        detail = details.get(str(index + 1), {})
+        check_ins.append({
+            "day": index + 1,
+            "date": (start + timedelta(days=index)).strftime(DATE_FORMAT),
+            "checked_in": is_checked(mask, index),
+            "timestamp": detail.get("timestamp"),
+            "note": detail.get("note")
+        })
+    return check_ins
+
+
+def serialize_check_ins(user_challenge: dict) -> dict:
+    """Replace the stored bitset with the expanded check_ins list for a response"""
+    if "checkin_mask" in user_challenge:
+        user_challenge["check_ins"] = expand_check_ins(user_challenge)
+        user_challenge.pop("checkin_mask", None)
+        user_challenge.pop("checkin_details", None)
+    return user_challenge
+
+
+def compact_fields(user_challenge: dict) -> dict:
+    """Bitset fields equivalent to a legacy check_ins array"""
+    check_ins = user_challenge.get("check_ins", [])
+    if check_ins:
+        start = _parse(check_ins[0]["date"])
+    else:
+        start = (user_challenge.get("started_at") or datetime.utcnow()).date()
+
+    fields = new_checkin_fields(start, user_challenge["target_days"])
+    words = [0] * len(fields["checkin_mask"])
+    for index, checkin in enumerate(check_ins):
+        if not checkin.get("checked_in"):
+            continue
+        words[index // WORD_BITS] |= 1 << (index % WORD_BITS)
+        detail = {"timestamp": checkin.get("timestamp")}
+        if checkin.get("note"):
+            detail["note"] = checkin["note"]
+        fields["checkin_details"][str(index + 1)] = detail
+    fields["checkin_mask"] = [Int64(word) for word in words]
+    return fields
+
+
+def ensure_compact(user_challenge: dict) -> dict:
+    """Convert a legacy check_ins array in place (and in MongoDB); no-op for compact documents"""
+    if "checkin_mask" in user_challenge:
+        return user_challenge
+    fields = compact_fields(user_challenge)
+    user_challenges_collection.update_one(
+        {"_id": user_challenge["_id"], "checkin_mask": {"$exists": False}},
+        {"$set": fields, "$unset": {"check_ins": ""}}
+    )
+    user_challenge.pop("check_ins", None)
+    user_challenge.update(fields)
+    return user_challenge
+
+
+# Event log: one challenge_checkins document per check-in, keyed by
+# (user_challenge_id, day) and range-scanned by (date, challenge_id)
+
+def checkin_event(user_challenge: dict, index: int, detail: dict) -> dict:
+    event = {
+        "user_challenge_id": user_challenge["_id"],
+        "user_id": user_challenge["user_id"],
+        "challenge_id": user_challenge["challenge_id"],
+        "day": index + 1,
+        "date": (_parse(user_challenge["start_date"]) + timedelta(days=index)).strftime(DATE_FORMAT),
+        "timestamp": detail.get("timestamp")
+    }
+    if detail.get("note"):
+        event["note"] = detail["note"]
+    return event
+
+
+def record_checkin_event(user_challenge: dict, index: int, detail: dict):
+    """Append a check-in to the event log; the user challenge document stays the source of truth"""
+    try:
+        challenge_checkins_collection.insert_one(checkin_event(user_challenge, index, detail))
+    except DuplicateKeyError:
+        pass
+    except Exception as e:
+        # Missing events are restored by migrate_checkins.py
+        logger.error(f"Error logging check-in for {user_challenge['_id']} day {index + 1}: {e}")
+
+
+def checkin_event_operations(user_challenge: dict) -> list:
+    """Idempotent upserts logging every checked-in day of a compact user challenge"""
+    mask = mask_value(user_challenge)
+    details = user_challenge.get("checkin_details", {})
+    operations = []
+    for index in range(user_challenge["target_days"]):
+        if is_checked(mask, index):
+            event = checkin_event(user_challenge, index, details.get(str(index + 1), {}))
+            operations.append(UpdateOne(
+                {"user_challenge_id": event["user_challenge_id"], "day": event["day"]},
+                {"$setOnInsert": event},
+                upsert=True
+            ))
+    return operations
+
+
+def rebuild_from_events(user_challenge: dict, events: list) -> dict:
+    """Compact check-in fields for a user challenge recomputed from its logged events (day, timestamp, note)"""
+    fields = new_checkin_fields(_parse(user_challenge["start_date"]), user_challenge["target_days"])
+    words = [0] * len(fields["checkin_mask"])
+    for event in events:
+        index = event["day"] - 1
+        if not 0 <= index < user_challenge["target_days"]:
+            continue
+        words[index // WORD_BITS] |= 1 << (index % WORD_BITS)
+        detail = {"timestamp": event.get("timestamp")}
+        if event.get("note"):
+            detail["note"] = event["note"]
+        fields["checkin_details"][str(event["day"])] = detail
+    fields["checkin_mask"] = [Int64(word) for word in words]
+    return fields
@@ -0,0 +1,35 @@
+import logging
+from datetime import datetime, timedelta
+from database import eco_locations_collection
+from utils.nearby_locations import rebuild_location_index, invalidate_nearby_cache
+from config import ECO_LOCATION_INDEX_ENABLED
+
+logger = logging.getLogger(__name__)
+
+
+def advance_event_statuses(now: datetime = None) -> int:
+    """
+    Move plantation events along upcoming -> ongoing -> completed by their
+    eventDate with one update_many: events dated today become ongoing, earlier
+    ones completed. eventDate is an ISO string, so day boundaries are plain
+    string comparisons served by the eventDate index. Returns events changed.
+    """
+    today = (now or datetime.now()).date()
+    today_start = today.isoformat()
+    tomorrow_start = (today + timedelta(days=1)).isoformat()
+
+    result = eco_locations_collection.update_many(
+        {
+            "eventDate": {"$lt": tomorrow_start},
+            "category": "plantation_event",
+            "status": {"$ne": "completed"}
+        },
+        [{"$set": {"status": {"$cond": [{"$lt": ["$eventDate", today_start]}, "completed", "ongoing"]}}}]
+    )
+
+    if result.modified_count:
+        logger.info(f"Advanced {result.modified_count} plantation event statuses")
+        invalidate_nearby_cache()
+        if ECO_LOCATION_INDEX_ENABLED:
+            rebuild_location_index()
+    return result.modified_count
@@ -0,0 +1,29 @@
+import logging
+from database import users_collection
+
+logger = logging.getLogger(__name__)
+
+
+def user_identifier(user: dict):
+    """Canonical identifier of a user document: mobile for phone users, email otherwise"""
+    if not user:
+        return None
+    return user.get("identifier") or user.get("mobile") or user.get("email")
+
+
+def find_user(identifier: str, projection: dict = None):
+    """
+    Look up a user by the canonical identifier (single-key unique index)
+
+    Users created before migrate_identifiers.py was run have no identifier
+    field yet; those fall back to the legacy mobile/email lookup.
+    """
+    if not identifier:
+        return None
+
+    user = users_collection.find_one({"identifier": identifier}, projection)
+    if user is None:
+        user = users_collection.find_one({"$or": [{"mobile": identifier}, {"email": identifier}]}, projection)
+        if user is not None:
+            logger.warning(f"User {identifier} has no identifier field - run migrate_identifiers.py")
+    return user
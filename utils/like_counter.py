@@ -0,0 +1,97 @@
+import threading
+import time
+import logging
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from database import posts_collection
+from config import LIKE_COUNTER_WRITE_BEHIND, LIKE_COUNTER_FLUSH_MS
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindLikeCounter:
+    """
+    Coalesces like/unlike deltas in memory and flushes them to posts.likesCount
+    with one bulk $inc per post, so a viral post is written once per flush
+    interval instead of once per tap.
+
+    Pending deltas live in this process only: with several workers each worker
+    flushes (and merges into reads) its own share, so counts converge within
+    one flush interval.
+    """
+
+    def __init__(self, enabled: bool = False, flush_interval_ms: int = 500):
+        self.enabled = enabled
+        self.flush_interval = flush_interval_ms / 1000
+        self._pending = {}
+        # Deltas of the batch being written; still counted by reads until the write returns
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def record(self, post_id: str, delta: int):
+        if not delta:
+            return
+        with self._lock:
+            self._pending[post_id] = self._pending.get(post_id, 0) + delta
+
+    def pending(self, post_id: str) -> int:
+        with self._lock:
+            return self._pending.get(post_id, 0) + self._in_flight.get(post_id, 0)
+
+    def merge_pending(self, post: dict) -> dict:
+        """Add not-yet-flushed deltas to a post's likesCount (post["_id"] may be str or ObjectId)"""
+        if self.enabled and post:
+            delta = self.pending(str(post.get("_id")))
+            if delta:
+                post["likesCount"] = max(0, post.get("likesCount", 0) + delta)
+        return post
+
+    def _settle(self, retry: dict):
+        """Drop the in-flight batch, moving the deltas in retry back to pending"""
+        with self._lock:
+            self._in_flight = {}
+            for post_id, delta in retry.items():
+                self._pending[post_id] = self._pending.get(post_id, 0) + delta
+
+    def flush(self) -> int:
+        """Write all pending deltas; returns the number of posts updated"""
+        with self._flush_lock:
+            with self._lock:
+                batch = {post_id: delta for post_id, delta in self._pending.items() if delta}
+                self._pending, self._in_flight = {}, batch
+
+            post_ids = list(batch)
+            operations = [
+                UpdateOne(
+                    {"_id": ObjectId(post_id)},
+                    {"$inc": {"likesCount": batch[post_id]}, "$set": {"updatedAt": time.time()}}
+                )
+                for post_id in post_ids
+            ]
+            if not operations:
+                return 0
+
+            try:
+                posts_collection.bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                # Unordered: every op not listed in writeErrors was applied, so only those are retried
+                failed = [post_ids[error["index"]] for error in e.details.get("writeErrors", [])]
+                logger.error(f"Error flushing like counters for {len(failed)} posts: {e}")
+                self._settle({post_id: batch[post_id] for post_id in failed})
+                return len(operations) - len(failed)
+            except Exception as e:
+                # Nothing confirmed written: put the whole batch back so the next flush retries it
+                logger.error(f"Error flushing like counters: {e}")
+                self._settle(batch)
+                return 0
+
+            self._settle({})
+            return len(operations)
+
+
+like_counter = WriteBehindLikeCounter(
+    enabled=LIKE_COUNTER_WRITE_BEHIND,
+    flush_interval_ms=LIKE_COUNTER_FLUSH_MS
+)
@@ -0,0 +1,99 @@
+import time
+import logging
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from database import posts_collection, likes_collection
+from utils.like_counter import like_counter
+
+logger = logging.getLogger(__name__)
+
+# Fields needed from the post after a like/unlike (count + owner for notifications)
+POST_LIKE_PROJECTION = {"likesCount": 1, "identifier": 1, "mobile": 1, "email": 1}
+
+
+def toggle_like_record(post_id: str, user_id: str) -> tuple:
+    """
+    Flip the like state of (post_id, user_id) in the likes collection
+
+    Relies on the unique (postId, userId) index from setup_indexes.py:
+    the upsert either inserts the like (liked) or matches an existing one, in
+    which case the like is deleted (unliked).
+
+    Returns: (liked, delta, liked_at) where delta is +1/-1 when this call
+    changed the state and 0 when a concurrent request already made the same
+    change, and liked_at is the createdAt of the like inserted or deleted
+    (None when nothing changed).
+    """
+    like_filter = {"postId": post_id, "userId": user_id}
+    now = time.time()
+
+    try:
+        result = likes_collection.update_one(
+            like_filter,
+            {"$setOnInsert": {"createdAt": now}},
+            upsert=True
+        )
+        if result.upserted_id is not None:
+            return True, 1, now
+    except DuplicateKeyError:
+        # A concurrent tap inserted the same like first; treat it as existing
+        pass
+
+    deleted = likes_collection.find_one_and_delete(like_filter, projection={"createdAt": 1})
+    if deleted is None:
+        return False, 0, None
+    return False, -1, deleted.get("createdAt")
+
+
+def apply_likes_delta(post_id: str, delta: int):
+    """
+    Apply a like/unlike to the post's likesCount and return the updated post
+    (projected to POST_LIKE_PROJECTION), or None if the post does not exist
+
+    With the write-behind counter enabled the delta is buffered instead and
+    the post is only read, with pending deltas merged into likesCount.
+    """
+    if like_counter.enabled:
+        post = posts_collection.find_one({"_id": ObjectId(post_id)}, POST_LIKE_PROJECTION)
+        if post is not None:
+            like_counter.record(post_id, delta)
+        return like_counter.merge_pending(post)
+    
+    update = {"$set": {"updatedAt": time.time()}}
+    if delta:
+        update["$inc"] = {"likesCount": delta}
+
+    return posts_collection.find_one_and_update(
+        {"_id": ObjectId(post_id)},
+        update,
+        projection=POST_LIKE_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def toggle_like(post_id: str, user_id: str) -> dict:
+    """
+    Toggle a like in two round trips: one like upsert/delete and one
+    find_one_and_update on the post that returns the new likesCount
+
+    Returns: dict with liked, changed, likesCount, likedAt (see
+    toggle_like_record) and post (None if the post is missing,
+    in which case the like write is rolled back)
+    """
+    liked, delta, liked_at = toggle_like_record(post_id, user_id)
+    post = apply_likes_delta(post_id, delta)
+
+    if post is None:
+        # Post vanished (or never existed) - undo the like write we just made
+        if delta == 1:
+            likes_collection.delete_one({"postId": post_id, "userId": user_id})
+        return {"liked": False, "changed": False, "likesCount": 0, "likedAt": None, "post": None}
+
+    return {
+        "liked": liked,
+        "changed": delta != 0,
+        "likedAt": liked_at,
+        "likesCount": max(0, post.get("likesCount", 0)),
+        "post": post
+    }
@@ -0,0 +1,319 @@
+import math
+import threading
+import time
+import logging
+import numpy as np
+from database import eco_locations_collection
+from config import ECO_LOCATIONS_NEARBY_CACHE_SECONDS, ECO_LOCATION_INDEX_ENABLED
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371
+
+# Nearby queries are snapped to a grid of TILE_DEGREES (~1.1 km) tiles: every
+# user in a tile shares one cached candidate list for a given radius/category
+TILE_DEGREES = 0.01
+
+# Most locations a single candidate query may return, so dense areas stay bounded
+MAX_CANDIDATES = 2000
+
+_candidate_cache = TTLCache(maxsize=5000, ttl=ECO_LOCATIONS_NEARBY_CACHE_SECONDS)
+
+
+def haversine_km(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Great-circle distances in km from one point to arrays of points"""
+    lat1, lng1 = np.radians(lat), np.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def _tile(lat: float, lng: float):
+    return int(np.floor(lat / TILE_DEGREES)), int(np.floor(lng / TILE_DEGREES))
+
+
+def _candidates(lat: float, lng: float, radius_km: float, category: str = None) -> list:
+    """
+    Locations that can be within radius_km of any point in the tile containing
+    (lat, lng): a $near from the tile centre widened by the centre-to-corner distance
+    """
+    tile = _tile(lat, lng)
+    key = (tile, radius_km, category)
+    candidates = _candidate_cache.get(key)
+    if candidates is not None:
+        return candidates
+
+    center_lat, center_lng = (tile[0] + 0.5) * TILE_DEGREES, (tile[1] + 0.5) * TILE_DEGREES
+    corner_km = float(haversine_km(center_lat, center_lng, np.array([tile[0] * TILE_DEGREES]),
+                                   np.array([tile[1] * TILE_DEGREES]))[0])
+    query_filter = {
+        "location": {
+            "$near": {
+                "$geometry": {"type": "Point", "coordinates": [center_lng, center_lat]},  # GeoJSON uses [longitude, latitude]
+                "$maxDistance": (radius_km + corner_km) * 1000  # Convert km to meters
+            }
+        }
+    }
+    if category:
+        query_filter["category"] = category
+
+    candidates = list(eco_locations_collection.find(query_filter).limit(MAX_CANDIDATES))
+    for location in candidates:
+        location["_id"] = str(location["_id"])
+    _candidate_cache.set(key, candidates)
+    return candidates
+
+
+def _find_nearby_mongo(lat: float, lng: float, radius_km: float, category: str = None) -> list:
+    """$near fallback for find_nearby, through the per-tile candidate cache"""
+    candidates = [
+        location for location in _candidates(lat, lng, radius_km, category)
+        if location.get("latitude") is not None and location.get("longitude") is not None
+    ]
+    if not candidates:
+        return []
+
+    distances = haversine_km(
+        lat, lng,
+        np.fromiter((location["latitude"] for location in candidates), dtype=float, count=len(candidates)),
+        np.fromiter((location["longitude"] for location in candidates), dtype=float, count=len(candidates))
+    )
+    order = np.argsort(distances, kind="stable")
+    order = order[distances[order] <= radius_km]
+    # Copies: the cached candidates are shared between requests
+    return [{**candidates[i], "distance": round(float(distances[i]), 2)} for i in order]
+
+
+def invalidate_nearby_cache():
+    """Drop every cached tile; called after admin writes to eco_locations"""
+    _candidate_cache.clear()
+
+
+class LocationGridIndex:
+    """
+    In-process grid index over eco-locations (a small, mostly static dataset
+    bounded to the Kathmandu valley). Locations are bucketed into
+    CELL_DEGREES cells and by city; a query visits only the cells its circle
+    or box overlaps and computes exact distances with NumPy.
+    """
+
+    CELL_DEGREES = 0.05  # ~5.5 km
+
+    def __init__(self):
+        self._locations = {}
+        self._cells = {}
+        self._cities = {}
+        self._lock = threading.Lock()
+        self.built_at = None
+
+    def _cell(self, lat: float, lng: float):
+        return math.floor(lat / self.CELL_DEGREES), math.floor(lng / self.CELL_DEGREES)
+
+    def _add(self, location: dict):
+        location_id = location["_id"]
+        self._locations[location_id] = location
+        self._cities.setdefault(location.get("city"), set()).add(location_id)
+        if location.get("latitude") is not None and location.get("longitude") is not None:
+            self._cells.setdefault(self._cell(location["latitude"], location["longitude"]), set()).add(location_id)
+
+    def _discard(self, location_id: str):
+        location = self._locations.pop(location_id, None)
+        if location is None:
+            return
+        self._cities.get(location.get("city"), set()).discard(location_id)
+        if location.get("latitude") is not None and location.get("longitude") is not None:
+            self._cells.get(self._cell(location["latitude"], location["longitude"]), set()).discard(location_id)
+
+    def rebuild(self, locations: list):
+        with self._lock:
+            self._locations, self._cells, self._cities = {}, {}, {}
+            for location in locations:
+                self._add(location)
+            self.built_at = time.time()
+
+    def upsert(self, location: dict):
+        with self._lock:
+            self._discard(location["_id"])
+            self._add(location)
+
+    def remove(self, location_id: str):
+        with self._lock:
+            self._discard(location_id)
+
+    def _in_box(self, south: float, west: float, north: float, east: float) -> list:
+        (min_row, min_col), (max_row, max_col) = self._cell(south, west), self._cell(north, east)
+        with self._lock:
+            if (max_row - min_row + 1) * (max_col - min_col + 1) > len(self._cells):
+                # Box covers more cells than are occupied (e.g. a zoomed-out map): scan the occupied ones
+                cells = [
+                    location_ids for (row, col), location_ids in self._cells.items()
+                    if min_row <= row <= max_row and min_col <= col <= max_col
+                ]
+            else:
+                cells = [
+                    self._cells.get((row, col), ())
+                    for row in range(min_row, max_row + 1)
+                    for col in range(min_col, max_col + 1)
+                ]
+            return [self._locations[location_id] for location_ids in cells for location_id in location_ids]
+
+    def nearby(self, lat: float, lng: float, radius_km: float, category: str = None) -> list:
+        """Locations within radius_km, nearest first, each with its distance in km"""
+        lat_span = radius_km / 111.32
+        lng_span = radius_km / (111.32 * max(math.cos(math.radians(lat)), 0.01))
+        candidates = [
+            location for location in self._in_box(lat - lat_span, lng - lng_span, lat + lat_span, lng + lng_span)
+            if not category or location.get("category") == category
+        ]
+        if not candidates:
+            return []
+
+        distances = haversine_km(
+            lat, lng,
+            np.fromiter((location["latitude"] for location in candidates), dtype=float, count=len(candidates)),
+            np.fromiter((location["longitude"] for location in candidates), dtype=float, count=len(candidates))
+        )
+        order = np.argsort(distances, kind="stable")
+        order = order[distances[order] <= radius_km]
+        return [{**candidates[i], "distance": round(float(distances[i]), 2)} for i in order]
+
+    def within_bbox(self, south: float, west: float, north: float, east: float, category: str = None) -> list:
+        return [
+            dict(location) for location in self._in_box(south, west, north, east)
+            if south <= location["latitude"] <= north and west <= location["longitude"] <= east
+            and (not category or location.get("category") == category)
+        ]
+
+    def within_city(self, city: str, category: str = None) -> list:
+        with self._lock:
+            locations = [self._locations[location_id] for location_id in self._cities.get(city, ())]
+        return [dict(location) for location in locations if not category or location.get("category") == category]
+
+    def __len__(self):
+        return len(self._locations)
+
+
+location_index = LocationGridIndex()
+
+
+def _load(query: dict) -> list:
+    locations = list(eco_locations_collection.find(query))
+    for location in locations:
+        location["_id"] = str(location["_id"])
+    return locations
+
+
+def rebuild_location_index():
+    """Reload every eco-location; run at startup and every ECO_LOCATION_INDEX_REBUILD_SECONDS"""
+    started = time.time()
+    location_index.rebuild(_load({}))
+    logger.info(f"Rebuilt eco-location index in {time.time() - started:.2f}s ({len(location_index)} locations)")
+
+
+def _ensure_index():
+    if location_index.built_at is None:
+        # First request before the startup build finished
+        rebuild_location_index()
+
+
+def find_nearby(lat: float, lng: float, radius_km: float, category: str = None) -> list:
+    """Locations within radius_km of (lat, lng), nearest first, each with its distance in km"""
+    if not ECO_LOCATION_INDEX_ENABLED:
+        return _find_nearby_mongo(lat, lng, radius_km, category)
+    _ensure_index()
+    return location_index.nearby(lat, lng, radius_km, category)
+
+
+def locations_in_city(city: str, category: str = None) -> list:
+    """The city's locations from the index, in _id order (ECO_LOCATION_INDEX_ENABLED only)"""
+    _ensure_index()
+    return sorted(location_index.within_city(city, category), key=lambda location: location["_id"])
+
+
+def refresh_locations(query: dict):
+    """Re-read the eco-locations matching query into the index after an admin write"""
+    invalidate_nearby_cache()
+    if ECO_LOCATION_INDEX_ENABLED and location_index.built_at is not None:
+        for location in _load(query):
+            location_index.upsert(location)
+
+
+def index_location(location: dict):
+    """Put an eco-location document returned by an admin write into the index (no re-read)"""
+    invalidate_nearby_cache()
+    if ECO_LOCATION_INDEX_ENABLED and location_index.built_at is not None:
+        location_index.upsert({**location, "_id": str(location["_id"])})
+
+
+def remove_location(location_id: str):
+    """Drop a deleted eco-location from the index"""
+    invalidate_nearby_cache()
+    location_index.remove(str(location_id))
+
+
+# Fields the map screen needs to draw a pin
+PIN_FIELDS = ("_id", "name", "category", "city", "latitude", "longitude", "status", "eventDate")
+
+# Viewports zoomed out below this level are clustered server-side
+CLUSTER_MAX_ZOOM = 14
+
+# Approximate on-screen size of a cluster cell in pixels (256 px map tiles)
+CLUSTER_CELL_PIXELS = 60
+
+
+def _pin(location: dict) -> dict:
+    return {field: location[field] for field in PIN_FIELDS if field in location}
+
+
+def locations_in_viewport(south: float, west: float, north: float, east: float, category: str = None) -> list:
+    """Map pins for the locations inside the box, from the index or a $geoWithin query"""
+    if ECO_LOCATION_INDEX_ENABLED:
+        _ensure_index()
+        return [_pin(location) for location in location_index.within_bbox(south, west, north, east, category)]
+
+    query_filter = {
+        "location": {
+            "$geoWithin": {
+                "$geometry": {
+                    "type": "Polygon",
+                    "coordinates": [[[west, south], [east, south], [east, north], [west, north], [west, south]]]
+                }
+            }
+        }
+    }
+    if category:
+        query_filter["category"] = category
+    locations = list(eco_locations_collection.find(query_filter, {field: 1 for field in PIN_FIELDS}))
+    for location in locations:
+        location["_id"] = str(location["_id"])
+    return locations
+
+
+def cluster_locations(pins: list, zoom: int) -> list:
+    """
+    Merge pins sharing a screen-sized grid cell at this zoom into one cluster
+    marker (count, centroid, per-category counts); lone pins are returned as is
+    """
+    cell_degrees = 360 / (2 ** zoom) * CLUSTER_CELL_PIXELS / 256
+    cells = {}
+    for pin in pins:
+        key = (math.floor(pin["latitude"] / cell_degrees), math.floor(pin["longitude"] / cell_degrees))
+        cells.setdefault(key, []).append(pin)
+
+    markers = []
+    for members in cells.values():
+        if len(members) == 1:
+            markers.append({"type": "location", **members[0]})
+            continue
+        categories = {}
+        for member in members:
+            categories[member.get("category")] = categories.get(member.get("category"), 0) + 1
+        markers.append({
+            "type": "cluster",
+            "count": len(members),
+            "latitude": round(sum(member["latitude"] for member in members) / len(members), 6),
+            "longitude": round(sum(member["longitude"] for member in members) / len(members), 6),
+            "categories": categories
+        })
+    return markers
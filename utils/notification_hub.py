@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+import logging
+from database import user_db, notifications_collection, notification_counters_collection
+from config import NOTIFICATION_STREAM_SOURCE
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationHub:
+    """
+    In-process pub/sub for streaming clients (GET /notifications/{identifier}/stream)
+
+    Subscribers are asyncio queues owned by the event loop; publish() may be
+    called from any thread (sync route handlers run in the threadpool) and is a
+    no-op for users with no open stream, so it costs nothing for polling clients.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._loop = None
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue):
+        with self._lock:
+            queues = self._subscribers.get(user_id)
+            if queues:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    def has_subscribers(self, user_id: str) -> bool:
+        return user_id in self._subscribers
+
+    def publish(self, user_id: str, event: dict):
+        with self._lock:
+            queues = list(self._subscribers.get(user_id, ()))
+            loop = self._loop
+        for queue in queues:
+            loop.call_soon_threadsafe(self._offer, queue, event)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: dict):
+        # A slow client loses its oldest events rather than growing without bound
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+
+notification_hub = NotificationHub()
+
+# Fields under data that stay server-side: like notifications track their recent likers' identifiers
+PRIVATE_DATA_FIELDS = ("recentLikers",)
+
+
+def _notification_event(notification: dict) -> dict:
+    """Stream event for a notification, without expireAt or PRIVATE_DATA_FIELDS (local and change-stream paths)"""
+    notification = dict(notification)
+    notification["_id"] = str(notification["_id"])
+    notification.pop("expireAt", None)
+    if isinstance(notification.get("data"), dict):
+        notification["data"] = {
+            field: value for field, value in notification["data"].items() if field not in PRIVATE_DATA_FIELDS
+        }
+    return {"event": "notification", "notification": notification}
+
+
+def publish_notification(notification: dict):
+    """Push a new (or re-marked unread) notification to the owner's open streams"""
+    if NOTIFICATION_STREAM_SOURCE == "local" and notification_hub.has_subscribers(notification["userId"]):
+        notification_hub.publish(notification["userId"], _notification_event(notification))
+
+
+def publish_unread(user_id: str, unread: int):
+    """Push the user's new unread badge count to their open streams"""
+    if NOTIFICATION_STREAM_SOURCE == "local" and notification_hub.has_subscribers(user_id):
+        notification_hub.publish(user_id, {"event": "unread", "unreadCount": unread})
+
+
+def _watch_changes():
+    pipeline = [{"$match": {
+        "ns.coll": {"$in": [notifications_collection.name, notification_counters_collection.name]},
+        "operationType": {"$in": ["insert", "update", "replace"]}
+    }}]
+    with user_db.watch(pipeline, full_document="updateLookup") as stream:
+        for change in stream:
+            document = change.get("fullDocument")
+            if not document:
+                continue
+
+            if change["ns"]["coll"] == notifications_collection.name:
+                user_id = document.get("userId")
+                if not document.get("read") and notification_hub.has_subscribers(user_id):
+                    notification_hub.publish(user_id, _notification_event(document))
+            elif document.get("synced") and notification_hub.has_subscribers(document["_id"]):
+                notification_hub.publish(document["_id"], {"event": "unread", "unreadCount": document.get("unread", 0)})
+
+
+def start_change_stream_listener() -> threading.Thread:
+    """
+    Feed the hub from a MongoDB change stream (NOTIFICATION_STREAM_SOURCE=changestream)
+    so a stream opened on one worker sees notifications written by any worker.
+    Requires a replica set; reconnects after errors.
+    """
+    def run():
+        while True:
+            try:
+                _watch_changes()
+            except Exception as e:
+                logger.error(f"Notification change stream stopped: {e}")
+            time.sleep(5)
+
+    thread = threading.Thread(target=run, name="notification-change-stream", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,202 @@
+import os
+import socket
+import time
+import logging
+from datetime import datetime, timedelta
+from pymongo import UpdateOne, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from database import user_db, notifications_collection, notification_counters_collection, job_locks_collection
+from config import (
+    NOTIFICATION_READ_TTL_DAYS, NOTIFICATION_MAX_PER_USER, BROADCAST_COMPACT_AFTER_DAYS,
+    NOTIFICATION_RETENTION_INTERVAL_MINUTES
+)
+from utils.unread_counter import reconcile_unread
+
+logger = logging.getLogger(__name__)
+
+# Notification types that admin actions send to every user
+BROADCAST_TYPES = ["announcement", "new_eco_location", "challenge_available"]
+DIGEST_TYPE = "broadcast_digest"
+
+# job_locks document leasing the retention pass to one worker per interval
+RETENTION_LOCK_ID = "notification_retention"
+_HOLDER = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def read_expiry() -> datetime:
+    """
+    expireAt for a notification marked read now; the TTL index on expireAt
+    (setup_indexes.py) deletes it NOTIFICATION_READ_TTL_DAYS later
+    """
+    return datetime.utcnow() + timedelta(days=NOTIFICATION_READ_TTL_DAYS)
+
+
+def expire_legacy_read() -> int:
+    """Give read notifications from before the TTL index an expireAt based on when they were read"""
+    ttl_ms = NOTIFICATION_READ_TTL_DAYS * 86400 * 1000
+    result = notifications_collection.update_many(
+        {"read": True, "expireAt": {"$exists": False}},
+        [{"$set": {"expireAt": {"$toDate": {"$add": [
+            {"$multiply": [{"$ifNull": ["$readAt", "$createdAt"]}, 1000]},
+            ttl_ms
+        ]}}}}]
+    )
+    return result.modified_count
+
+
+def compact_broadcasts() -> int:
+    """
+    Collapse each user's unread broadcast copies older than
+    BROADCAST_COMPACT_AFTER_DAYS into one "N updates you missed" digest.
+    Read copies are left to the TTL index. Returns the number of copies removed.
+    """
+    cutoff = time.time() - BROADCAST_COMPACT_AFTER_DAYS * 86400
+    old_copies = {"type": {"$in": BROADCAST_TYPES}, "read": False, "createdAt": {"$lt": cutoff}}
+
+    groups = notifications_collection.aggregate([
+        {"$match": old_copies},
+        {"$group": {"_id": "$userId", "count": {"$sum": 1}, "latestAt": {"$max": "$createdAt"}}}
+    ], allowDiskUse=True)
+
+    operations = []
+    user_ids = []
+    for group in groups:
+        user_ids.append(group["_id"])
+        operations.append(UpdateOne(
+            {"userId": group["_id"], "type": DIGEST_TYPE},
+            [
+                {"$set": {
+                    "title": "Updates you missed",
+                    "data": {"count": {"$add": [{"$ifNull": ["$data.count", 0]}, group["count"]]}},
+                    "read": False,
+                    "createdAt": {"$max": [{"$ifNull": ["$createdAt", 0]}, group["latestAt"]]}
+                }},
+                {"$set": {"message": {"$concat": [
+                    {"$toString": "$data.count"},
+                    " announcements, new eco-locations and challenges were posted while you were away"
+                ]}}},
+                {"$unset": "expireAt"}
+            ],
+            upsert=True
+        ))
+
+    if not operations:
+        return 0
+
+    notifications_collection.bulk_write(operations, ordered=False)
+    # createdAt < cutoff is fixed, so no copy created after the aggregation is removed here
+    removed = notifications_collection.delete_many(old_copies).deleted_count
+
+    for user_id in user_ids:
+        reconcile_unread(user_id)
+    return removed
+
+
+def _cap_candidates(since) -> list:
+    """
+    Users who may hold more than NOTIFICATION_MAX_PER_USER: those notified
+    since the last pass (notifiedAt on their unread counter). Without a
+    previous pass the whole collection is grouped once.
+    """
+    if since is None:
+        over_cap = notifications_collection.aggregate([
+            {"$group": {"_id": "$userId", "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": NOTIFICATION_MAX_PER_USER}}}
+        ], allowDiskUse=True)
+        return [user["_id"] for user in over_cap]
+    return [
+        counter["_id"]
+        for counter in notification_counters_collection.find({"notifiedAt": {"$gte": since}}, {"_id": 1})
+    ]
+
+
+def enforce_user_cap(since: float = None) -> int:
+    """
+    Delete the oldest notifications of users holding more than
+    NOTIFICATION_MAX_PER_USER, checking only users notified since `since`
+    (every user when None)
+    """
+    removed = 0
+
+    for user_id in _cap_candidates(since):
+        # One (userId, createdAt) index probe; empty when the user is within the cap
+        oldest_kept = list(
+            notifications_collection.find({"userId": user_id}, {"createdAt": 1})
+            .sort("createdAt", -1)
+            .skip(NOTIFICATION_MAX_PER_USER - 1)
+            .limit(1)
+        )
+        if oldest_kept:
+            deleted = notifications_collection.delete_many({
+                "userId": user_id,
+                "createdAt": {"$lt": oldest_kept[0]["createdAt"]}
+            }).deleted_count
+            if deleted:
+                removed += deleted
+                reconcile_unread(user_id)
+
+    return removed
+
+
+def notification_storage_stats() -> dict:
+    """Size metrics for the notifications collection"""
+    stats = user_db.command("collStats", notifications_collection.name)
+    return {
+        "count": stats.get("count", 0),
+        "sizeBytes": stats.get("size", 0),
+        "storageSizeBytes": stats.get("storageSize", 0),
+        "totalIndexSizeBytes": stats.get("totalIndexSize", 0),
+        "avgObjSizeBytes": stats.get("avgObjSize", 0),
+        # Served by the expireAt TTL index
+        "pendingExpiry": notifications_collection.count_documents({"expireAt": {"$exists": True}})
+    }
+
+
+def _acquire_retention_lease(now: float):
+    """
+    Take the retention lease for one interval; returns the lock document, or
+    None while another worker holds it. Every worker runs the retention loop,
+    so this keeps two compactions from adding the same broadcast copies to a
+    digest twice.
+    """
+    try:
+        return job_locks_collection.find_one_and_update(
+            {"_id": RETENTION_LOCK_ID, "$or": [{"expiresAt": {"$lt": now}}, {"expiresAt": {"$exists": False}}]},
+            {"$set": {
+                "holder": _HOLDER,
+                "acquiredAt": now,
+                "expiresAt": now + NOTIFICATION_RETENTION_INTERVAL_MINUTES * 60
+            }},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # The lock document exists and has not expired
+        return None
+
+
+def run_retention():
+    """
+    One retention pass: legacy expiry backfill, broadcast compaction, per-user
+    cap, metrics. Returns None when another worker holds this interval's lease.
+    """
+    started = time.time()
+    lease = _acquire_retention_lease(started)
+    if lease is None:
+        logger.debug("Notification retention skipped: another worker holds the lease")
+        return None
+
+    summary = {
+        "legacyExpirySet": expire_legacy_read(),
+        "broadcastsCompacted": compact_broadcasts(),
+        "overCapRemoved": enforce_user_cap(lease.get("capCheckedAt")),
+    }
+    # Notifications created while this pass ran are picked up by the next one
+    job_locks_collection.update_one({"_id": RETENTION_LOCK_ID}, {"$set": {"capCheckedAt": started}})
+    summary["stats"] = notification_storage_stats()
+    logger.info(
+        f"Notification retention in {time.time() - started:.1f}s: {summary['broadcastsCompacted']} broadcast copies "
+        f"compacted, {summary['overCapRemoved']} over-cap removed, {summary['stats']['count']} stored "
+        f"({summary['stats']['storageSizeBytes'] / (1024 * 1024):.1f} MB)"
+    )
+    return summary
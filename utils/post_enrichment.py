@@ -0,0 +1,66 @@
+import logging
+from database import users_collection, likes_collection
+from utils.author_snapshot import build_author_snapshot
+from utils.identity import user_identifier
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_authors(identifiers) -> dict:
+    """Load many users in one $in query on the identifier index; returns {identifier: user}"""
+    identifiers = list({i for i in identifiers if i})
+    if not identifiers:
+        return {}
+
+    users = users_collection.find(
+        {"identifier": {"$in": identifiers}},
+        {"identifier": 1, "firstName": 1, "lastName": 1, "profilePicture": 1}
+    )
+    return {user["identifier"]: user for user in users}
+
+
+def count_likes(post_ids) -> dict:
+    """Count likes for many posts with one $group aggregation; returns {post_id: count}"""
+    post_ids = list(post_ids)
+    if not post_ids:
+        return {}
+
+    pipeline = [
+        {"$match": {"postId": {"$in": post_ids}}},
+        {"$group": {"_id": "$postId", "count": {"$sum": 1}}}
+    ]
+    return {row["_id"]: row["count"] for row in likes_collection.aggregate(pipeline)}
+
+
+def enrich_admin_posts(posts: list, like_counts: bool = True) -> list:
+    """
+    Prepare a page of posts for the admin panel with a fixed number of queries
+
+    - _id becomes a string and createdAt an int
+    - author fields come from the snapshot on the post; posts without one
+      (created before the snapshot existed) are filled from a single users query
+    - likesCount is recounted from the likes collection in one aggregation
+    """
+    missing_snapshot = [p for p in posts if "authorSnapshotAt" not in p]
+    authors = fetch_authors(user_identifier(p) for p in missing_snapshot)
+    counts = count_likes(str(p["_id"]) for p in posts) if like_counts else {}
+
+    for post in posts:
+        post_id = str(post["_id"])
+        post["_id"] = post_id
+        if "createdAt" in post:
+            post["createdAt"] = int(post["createdAt"])
+
+        if "authorSnapshotAt" not in post:
+            user = authors.get(user_identifier(post))
+            if user:
+                post.update(build_author_snapshot(user))
+            elif "userName" in post and "firstName" not in post:
+                name_parts = post["userName"].split(" ", 1)
+                post["firstName"] = name_parts[0]
+                post["lastName"] = name_parts[1] if len(name_parts) > 1 else ""
+
+        if like_counts:
+            post["likesCount"] = counts.get(post_id, 0)
+
+    return posts
@@ -2,6 +2,7 @@ import logging
 import firebase_admin
 from firebase_admin import credentials, messaging
 from database import users_collection
+from utils.identity import find_user
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +29,7 @@ def send_push_notification(user_id: str, title: str, message: str, data: dict =
     """
     try:
         # Get user's FCM token from database
-        user = users_collection.find_one({"$or": [{"mobile": user_id}, {"email": user_id}]})
+        user = find_user(user_id, {"fcmToken": 1, "pushEnabled": 1})
         
         if not user:
             logger.warning(f"User not found: {user_id}")
@@ -79,7 +80,7 @@ def send_push_notification(user_id: str, title: str, message: str, data: dict =
     except messaging.UnregisteredError:
         logger.warning(f"Invalid FCM token for {user_id}, removing from database")
         users_collection.update_one(
-            {"$or": [{"mobile": user_id}, {"email": user_id}]},
+            {"identifier": user_id},
             {"$unset": {"fcmToken": ""}}
         )
         return False
@@ -0,0 +1,120 @@
+import bisect
+import threading
+import time
+import logging
+from datetime import datetime, timedelta
+from database import users_collection, posts_collection
+from utils.identity import user_identifier
+
+logger = logging.getLogger(__name__)
+
+# Leaderboard period -> days of posts it covers (None = users.ecoPoints, all time)
+PERIOD_DAYS = {"all": None, "week": 7, "month": 30}
+
+
+class RankIndex:
+    """
+    Order-statistics index over per-user scores: a sorted list of scores kept
+    next to an identifier -> score map. count_greater() is a bisect (O(log n));
+    an update moves one score in the list.
+    """
+
+    def __init__(self):
+        self._scores = {}
+        self._sorted = []
+        self._lock = threading.Lock()
+        self.built_at = None
+
+    def rebuild(self, scores: dict):
+        with self._lock:
+            self._scores = dict(scores)
+            self._sorted = sorted(self._scores.values())
+            self.built_at = time.time()
+
+    def add(self, identifier: str, delta: float):
+        if not identifier or not delta:
+            return
+        with self._lock:
+            old = self._scores.get(identifier)
+            if old is not None:
+                del self._sorted[bisect.bisect_left(self._sorted, old)]
+            new = (old or 0) + delta
+            self._scores[identifier] = new
+            bisect.insort(self._sorted, new)
+
+    def remove(self, identifier: str):
+        with self._lock:
+            old = self._scores.pop(identifier, None)
+            if old is not None:
+                del self._sorted[bisect.bisect_left(self._sorted, old)]
+
+    def count_greater(self, score: float) -> int:
+        with self._lock:
+            return len(self._sorted) - bisect.bisect_right(self._sorted, score)
+
+    def __len__(self):
+        return len(self._sorted)
+
+
+rank_indexes = {period: RankIndex() for period in PERIOD_DAYS}
+_build_lock = threading.Lock()
+
+
+def _load_scores(period: str) -> dict:
+    days = PERIOD_DAYS[period]
+    if days is None:
+        users = users_collection.find({}, {"identifier": 1, "mobile": 1, "email": 1, "ecoPoints": 1})
+        return {user_identifier(user): user.get("ecoPoints", 0) for user in users if user_identifier(user)}
+
+    since = int((datetime.now() - timedelta(days=days)).timestamp())
+    pipeline = [
+        {"$match": {"createdAt": {"$gte": since}}},
+        {"$group": {"_id": "$identifier", "totalEcoPoints": {"$sum": "$ecoPoints"}}}
+    ]
+    return {row["_id"]: row["totalEcoPoints"] for row in posts_collection.aggregate(pipeline, allowDiskUse=True)}
+
+
+def rebuild_rank_indexes():
+    """
+    Reload all periods from MongoDB; run at startup and every
+    LEADERBOARD_RANK_REBUILD_SECONDS so week/month windows slide forward and
+    changes made by other workers are picked up
+    """
+    with _build_lock:
+        started = time.time()
+        for period, index in rank_indexes.items():
+            index.rebuild(_load_scores(period))
+        logger.info(f"Rebuilt leaderboard rank indexes in {time.time() - started:.1f}s "
+                    f"({len(rank_indexes['all'])} users)")
+
+
+def count_users_ahead(period: str, score: float) -> int:
+    index = rank_indexes[period]
+    if index.built_at is None:
+        # First request before the startup build finished
+        rebuild_rank_indexes()
+    return index.count_greater(score)
+
+
+def count_ranked_users(period: str) -> int:
+    index = rank_indexes[period]
+    if index.built_at is None:
+        rebuild_rank_indexes()
+    return len(index)
+
+
+def record_user_points(identifier: str, delta: float):
+    """A user's all-time ecoPoints changed by delta"""
+    rank_indexes["all"].add(identifier, delta)
+
+
+def record_post_points(identifier: str, delta: float, created_at: float):
+    """Points counted for a post created at created_at changed by delta (new, re-scored or deleted post)"""
+    for period, days in PERIOD_DAYS.items():
+        if days is not None and created_at >= (datetime.now() - timedelta(days=days)).timestamp():
+            rank_indexes[period].add(identifier, delta)
+
+
+def remove_user(identifier: str):
+    for index in rank_indexes.values():
+        index.remove(identifier)
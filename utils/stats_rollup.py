@@ -0,0 +1,155 @@
+import time
+import logging
+from datetime import datetime, timezone
+from pymongo import UpdateOne, ReplaceOne
+from database import users_collection, posts_collection, daily_stats_collection
+
+logger = logging.getLogger(__name__)
+
+TOTALS_ID = "totals"
+
+
+def day_key(timestamp: float) -> str:
+    """UTC day a createdAt timestamp falls on, e.g. "2025-01-31" (daily_stats _id)"""
+    return datetime.fromtimestamp(timestamp or 0, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _post_status(post: dict) -> str:
+    # Admin announcements have no verificationStatus
+    return post.get("verificationStatus") or "none"
+
+
+def _post_contribution(post: dict, sign: int) -> dict:
+    increments = {"posts": sign, f"postsByStatus.{_post_status(post)}": sign}
+    if _post_status(post) == "approved":
+        increments["co2Offset"] = sign * post.get("co2Offset", 0)
+        increments["ecoPoints"] = sign * post.get("ecoPoints", 0)
+    return increments
+
+
+def _apply(day: str, increments: dict):
+    """$inc the day's rollup and the running totals in one round trip"""
+    increments = {field: value for field, value in increments.items() if value}
+    if not increments:
+        return
+    try:
+        daily_stats_collection.bulk_write([
+            UpdateOne({"_id": day}, {"$inc": increments}, upsert=True),
+            UpdateOne({"_id": TOTALS_ID}, {"$inc": increments}, upsert=True)
+        ], ordered=False)
+    except Exception as e:
+        # Drift is corrected by the nightly reconcile
+        logger.error(f"Error updating stats rollup for {day}: {e}")
+
+
+def record_user(created_at: float, sign: int = 1):
+    """A user was created (+1) or deleted (-1)"""
+    _apply(day_key(created_at), {"users": sign})
+
+
+def record_post_change(before: dict = None, after: dict = None):
+    """
+    A post was created (before=None), deleted (after=None) or changed status /
+    points. Counters are attributed to the day the post was created.
+    """
+    post = after or before
+    increments = {}
+    for snapshot, sign in ((before, -1), (after, 1)):
+        if snapshot:
+            for field, value in _post_contribution(snapshot, sign).items():
+                increments[field] = increments.get(field, 0) + value
+    _apply(day_key(post.get("createdAt", 0)), increments)
+
+
+def record_posts_deleted(post_filter: dict) -> int:
+    """
+    Subtract every post matching post_filter from the rollups, grouped by day
+    and status in one aggregation; call right before deleting them in bulk.
+    Returns the number of posts subtracted.
+    """
+    days = {}
+    removed = 0
+    for row in posts_collection.aggregate([{"$match": post_filter}, _post_group_stage()]):
+        increments = days.setdefault(row["_id"]["day"] or day_key(0), {})
+        status = row["_id"]["status"]
+        removed += row["count"]
+        increments["posts"] = increments.get("posts", 0) - row["count"]
+        increments[f"postsByStatus.{status}"] = -row["count"]
+        if status == "approved":
+            increments["co2Offset"] = -row["co2Offset"]
+            increments["ecoPoints"] = -row["ecoPoints"]
+    for day, increments in days.items():
+        _apply(day, increments)
+    return removed
+
+
+def get_totals() -> dict:
+    totals = daily_stats_collection.find_one({"_id": TOTALS_ID})
+    if totals is None:
+        # First use: build the rollups from the source collections
+        reconcile_stats()
+        totals = daily_stats_collection.find_one({"_id": TOTALS_ID}) or {}
+    return totals
+
+
+def get_daily(since_day: str) -> list:
+    return list(daily_stats_collection.find({"_id": {"$gte": since_day, "$ne": TOTALS_ID}}).sort("_id", 1))
+
+
+def _day_expression():
+    return {"$dateToString": {"format": "%Y-%m-%d", "date": {"$toDate": {"$multiply": ["$createdAt", 1000]}}}}
+
+
+def _post_group_stage() -> dict:
+    """Posts grouped by creation day and status with their counts and approved totals"""
+    return {"$group": {
+        "_id": {"day": _day_expression(), "status": {"$ifNull": ["$verificationStatus", "none"]}},
+        "count": {"$sum": 1},
+        "co2Offset": {"$sum": "$co2Offset"},
+        "ecoPoints": {"$sum": "$ecoPoints"}
+    }}
+
+
+def reconcile_stats() -> int:
+    """
+    Recompute every daily rollup and the totals from users and posts, replacing
+    whatever the write-path counters drifted to. Returns the number of days written.
+    """
+    started = time.time()
+    days = {}
+
+    # Documents without createdAt land on 1970-01-01 so totals still count them
+    users = users_collection.aggregate([
+        {"$group": {"_id": _day_expression(), "count": {"$sum": 1}}}
+    ], allowDiskUse=True)
+    for row in users:
+        days.setdefault(row["_id"] or day_key(0), {})["users"] = row["count"]
+
+    posts = posts_collection.aggregate([_post_group_stage()], allowDiskUse=True)
+    for row in posts:
+        day = days.setdefault(row["_id"]["day"] or day_key(0), {})
+        status = row["_id"]["status"]
+        day["posts"] = day.get("posts", 0) + row["count"]
+        day.setdefault("postsByStatus", {})[status] = row["count"]
+        if status == "approved":
+            day["co2Offset"] = row["co2Offset"]
+            day["ecoPoints"] = row["ecoPoints"]
+
+    totals = {"users": 0, "posts": 0, "co2Offset": 0, "ecoPoints": 0, "postsByStatus": {}}
+    operations = []
+    for day, counters in days.items():
+        for field in ("users", "posts", "co2Offset", "ecoPoints"):
+            totals[field] += counters.get(field, 0)
+        for status, count in counters.get("postsByStatus", {}).items():
+            totals["postsByStatus"][status] = totals["postsByStatus"].get(status, 0) + count
+        operations.append(ReplaceOne({"_id": day}, counters, upsert=True))
+
+    totals["reconciledAt"] = time.time()
+    operations.append(ReplaceOne({"_id": TOTALS_ID}, totals, upsert=True))
+
+    # Replace: drop counters for days that no longer have any users or posts
+    daily_stats_collection.delete_many({"_id": {"$nin": list(days) + [TOTALS_ID]}})
+    daily_stats_collection.bulk_write(operations, ordered=False)
+
+    logger.info(f"Reconciled stats rollups for {len(days)} days in {time.time() - started:.1f}s")
+    return len(days)
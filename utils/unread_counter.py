@@ -0,0 +1,104 @@
+import time
+import logging
+from pymongo import ReturnDocument, UpdateOne
+from database import notifications_collection, notification_counters_collection
+from config import NOTIFICATION_UNREAD_CACHE_SECONDS
+from utils.ttl_cache import TTLCache
+from utils.notification_hub import notification_hub, publish_unread
+
+logger = logging.getLogger(__name__)
+
+# Optional per-process cache for badge polling; other workers' writes show up after the TTL
+_cache = TTLCache(maxsize=100000, ttl=NOTIFICATION_UNREAD_CACHE_SECONDS) if NOTIFICATION_UNREAD_CACHE_SECONDS > 0 else None
+
+
+def _invalidate(user_id: str):
+    if _cache is not None:
+        _cache.delete(user_id)
+
+
+def _counter_update(delta: int) -> list:
+    """Pipeline adding delta to unread; a positive delta also stamps notifiedAt"""
+    fields = {"unread": {"$max": [0, {"$add": [{"$ifNull": ["$unread", 0]}, delta]}]}}
+    if delta > 0:
+        # Lets the per-user cap (utils/notification_retention.py) visit only recently notified users
+        fields["notifiedAt"] = time.time()
+    return [{"$set": fields}]
+
+
+def adjust_unread(user_id: str, delta: int):
+    """
+    Atomically add delta to the user's unread counter (never below zero)
+
+    Counter documents live in notification_counters keyed by userId. A counter
+    created here before the user's first read is not yet synced; get_unread
+    recounts it once.
+    """
+    if not delta or not user_id:
+        return
+    try:
+        counter = notification_counters_collection.find_one_and_update(
+            {"_id": user_id},
+            _counter_update(delta),
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        if counter.get("synced"):
+            publish_unread(user_id, counter["unread"])
+    except Exception as e:
+        logger.error(f"Error updating unread counter for {user_id}: {e}")
+    _invalidate(user_id)
+
+
+def adjust_unread_many(user_ids: list, delta: int):
+    """adjust_unread for many users in one bulk write (fan-out notifications)"""
+    if not delta or not user_ids:
+        return
+    try:
+        notification_counters_collection.bulk_write([
+            UpdateOne({"_id": user_id}, _counter_update(delta), upsert=True)
+            for user_id in user_ids
+        ], ordered=False)
+
+        # Only users with an open stream need their new badge count read back
+        streaming = [user_id for user_id in user_ids if notification_hub.has_subscribers(user_id)]
+        if streaming:
+            for counter in notification_counters_collection.find({"_id": {"$in": streaming}, "synced": True}):
+                publish_unread(counter["_id"], counter["unread"])
+    except Exception as e:
+        logger.error(f"Error updating unread counters for {len(user_ids)} users: {e}")
+    if _cache is not None:
+        for user_id in user_ids:
+            _cache.delete(user_id)
+
+
+def reconcile_unread(user_id: str) -> int:
+    """Recount the user's unread notifications and store the result as the synced counter"""
+    count = notifications_collection.count_documents({"userId": user_id, "read": False})
+    notification_counters_collection.update_one(
+        {"_id": user_id},
+        {"$set": {"unread": count, "synced": True}},
+        upsert=True
+    )
+    _invalidate(user_id)
+    publish_unread(user_id, count)
+    return count
+
+
+def get_unread(user_id: str) -> int:
+    """Unread notification count from the counter document (one _id lookup)"""
+    if _cache is not None:
+        cached = _cache.get(user_id)
+        if cached is not None:
+            return cached
+
+    counter = notification_counters_collection.find_one({"_id": user_id})
+    if counter and counter.get("synced"):
+        count = counter.get("unread", 0)
+    else:
+        # First read for this user since counters were introduced
+        count = reconcile_unread(user_id)
+
+    if _cache is not None:
+        _cache.set(user_id, count)
+    return count